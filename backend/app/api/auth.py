@@ -1,11 +1,17 @@
 # backend/app/api/auth.py
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
 from ..models import schemas
 from ..core.supabase_client import supabase
+from ..core import http_client, metrics, username_index
+from ..core.cache import SharedCache
+from ..core.login_limiter import limiter as login_limiter
 from ..security.security import get_password_hash, verify_password, create_access_token
+import hashlib
 import os
+import time
+from typing import Set
+
 import httpx
-from datetime import datetime, timedelta, timezone
 
 # --- [NEW] MiTM Imports ---
 from ..security.mitm_tools import get_listeners, capture_packet, hash_data
@@ -17,54 +23,101 @@ router = APIRouter(
 )
 
 RECAPTCHA_SECRET_KEY = os.environ.get("RECAPTCHA_SECRET_KEY")
-CAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+# Remplaçable (RECAPTCHA_VERIFY_URL) pour pointer vers un vérificateur local en test
+CAPTCHA_VERIFY_URL = os.environ.get("RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify")
+# Le vérificateur répond en quelques centaines de ms : inutile d'attendre 60 s comme un upload
+CAPTCHA_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+# Un jeton reCAPTCHA n'est valable que 2 minutes et une seule fois : un refus est
+# gardé pour les nouvelles tentatives avec le même jeton (jamais une acceptation,
+# qui permettrait de rejouer le jeton)
+CAPTCHA_CACHE_SECONDS = 120
+# En-tête posé par le proxy frontal avec l'adresse réelle du client (Fly.io)
+CLIENT_IP_HEADER = os.environ.get("CLIENT_IP_HEADER", "fly-client-ip")
+
+# Jetons refusés, partagés entre les workers : une nouvelle tentative peut arriver sur un autre processus
+_captcha_rejections = SharedCache("captcha_rejections", max_size=10000, ttl=CAPTCHA_CACHE_SECONDS)
+# Jetons en cours de vérification : une requête simultanée portant le même jeton est refusée
+_captcha_in_flight: Set[bytes] = set()
+captcha_latency = metrics.histogram("captcha_verify_seconds", "Duration of a reCAPTCHA verification request")
+
+
+def client_ip(request: Request):
+    """Adresse du client : en-tête du proxy si présent, sinon l'adresse de la connexion."""
+    forwarded = request.headers.get(CLIENT_IP_HEADER)
+    if forwarded:
+        return forwarded.strip()
+    return request.client.host if request.client else None
+
+
+async def _request_captcha_verification(token: str) -> bool:
+    client = http_client.get_async_client()
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            CAPTCHA_VERIFY_URL,
+            data={"secret": RECAPTCHA_SECRET_KEY, "response": token},
+            timeout=CAPTCHA_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json().get("success", False)
+    finally:
+        captcha_latency.observe(time.perf_counter() - start)
+
 
 async def verify_captcha(token: str) -> bool:
     """Helper function to verify a reCAPTCHA token."""
     if not RECAPTCHA_SECRET_KEY:
         print("Warning: RECAPTCHA_SECRET_KEY is not set. Skipping CAPTCHA verification.")
         return True 
-        
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                CAPTCHA_VERIFY_URL,
-                data={"secret": RECAPTCHA_SECRET_KEY, "response": token}
-            )
-            response.raise_for_status()
-            return response.json().get("success", False)
-        except Exception as e:
-            print(f"CAPTCHA verification HTTP request failed: {e}")
-            return False
 
-@router.post("/signup", response_model=schemas.User)
-async def signup(user: schemas.UserCreate):
-    
-    # --- [NEW] MiTM Capture for Signup ---
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    # Jeton déjà refusé, ou déjà présenté par une requête en cours (usage unique) :
+    # refusé sans interroger le vérificateur
+    if key in _captcha_in_flight or _captcha_rejections.get(key):
+        return False
+
+    _captcha_in_flight.add(key)
+    is_valid = False
+    try:
+        is_valid = await _request_captcha_verification(token)
+        # Seuls les refus du vérificateur sont gardés (pas les erreurs réseau)
+        if not is_valid:
+            _captcha_rejections.set(key, True)
+    except Exception as e:
+        print(f"CAPTCHA verification HTTP request failed: {e}")
+    finally:
+        _captcha_in_flight.discard(key)
+    return is_valid
+
+# Code PostgreSQL d'une violation de contrainte d'unicité (nom d'utilisateur déjà pris)
+UNIQUE_VIOLATION = "23505"
+
+
+def _capture_signup(username: str, password: str):
+    """MiTM capture of a signup, run as a background task once the response is sent."""
     # We capture the *plaintext* password here as it's what's sent over the network
     # But we hash it for the demo, as requested by the user.
     try:
         listeners = get_listeners()
         if listeners:
-            hashed_pass_for_mitm = hash_data(user.password) # Hash plaintext for demo
-            mitm_data = {"username": user.username, "password_hash_capture": hashed_pass_for_mitm}
+            hashed_pass_for_mitm = hash_data(password) # Hash plaintext for demo
+            mitm_data = {"username": username, "password_hash_capture": hashed_pass_for_mitm}
             capture_packet(packet_type="signup", data=mitm_data, listeners=listeners)
     except Exception as e:
         print(f"MiTM Signup Capture Error: {e}") # Don't fail signup if MiTM fails
-    # --- End MiTM Capture ---
 
-    # 1. Check if username already exists
-    response = supabase.table("users").select("id").eq("username", user.username).execute()
-    if response.data:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered",
-        )
 
-    # 2. Hash the password (using the *fixed* security function)
+@router.post("/signup", response_model=schemas.User)
+def signup(user: schemas.UserCreate, background_tasks: BackgroundTasks):
+    
+    # --- [NEW] MiTM Capture for Signup (off the critical path) ---
+    background_tasks.add_task(_capture_signup, user.username, user.password)
+
+    # 1. Hash the password (using the *fixed* security function)
     hashed_password = get_password_hash(user.password)
 
-    # 3. Insert the new user into the public.users table
+    # 2. Insert the new user into the public.users table in a single round trip:
+    #    the unique constraint on 'username' rejects duplicates atomically
     new_user_data = {
         "username": user.username,
         "password_hash": hashed_password, # Store the secure hash
@@ -78,9 +131,15 @@ async def signup(user: schemas.UserCreate):
             raise HTTPException(status_code=500, detail="Could not create user.")
             
         created_user = insert_response.data[0]
+        username_index.add_user(created_user['id'], created_user['username'])
         return schemas.User(id=created_user['id'], username=created_user['username'])
 
     except Exception as e:
+        if getattr(e, "code", None) == UNIQUE_VIOLATION:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already registered",
+            )
         if "username_length_check" in str(e):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -93,7 +152,7 @@ async def signup(user: schemas.UserCreate):
 
 
 @router.post("/login", response_model=schemas.Token)
-async def login(form_data: schemas.UserLogin):
+async def login(form_data: schemas.UserLogin, request: Request):
     
     # --- [NEW] MiTM Capture for Login ---
     # form_data.password is *already hashed* by the client (as per auth.js)
@@ -107,15 +166,38 @@ async def login(form_data: schemas.UserLogin):
         print(f"MiTM Login Capture Error: {e}") # Don't fail login if MiTM fails
     # --- End MiTM Capture ---
 
-    # --- Part 1: CAPTCHA Verification ---
     if not form_data.captcha_token:
         raise HTTPException(status_code=400, detail="CAPTCHA token is required.")
-        
+
+    # --- Part 1: Rate limiting by IP and lockout check (no CAPTCHA call, no DB access) ---
+    wait_seconds = login_limiter.throttle_ip(client_ip(request))
+    if wait_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many login attempts. Please wait {wait_seconds} seconds."
+        )
+
+    wait_seconds = login_limiter.locked_for(form_data.username)
+    if wait_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many failed attempts. Please wait {wait_seconds} seconds."
+        )
+
+    # --- Part 2: CAPTCHA Verification ---
     is_captcha_valid = await verify_captcha(form_data.captcha_token)
     if not is_captcha_valid:
         raise HTTPException(status_code=400, detail="CAPTCHA verification failed. Please try again.")
+
+    # Per-account bucket only after a valid CAPTCHA: junk tokens cannot lock an account out
+    wait_seconds = login_limiter.throttle_username(form_data.username)
+    if wait_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many login attempts. Please wait {wait_seconds} seconds."
+        )
     
-    # --- Part 2: Rate Limiting and Login Logic ---
+    # --- Part 3: Login Logic ---
     
     # 1. Find the user
     try:
@@ -132,21 +214,14 @@ async def login(form_data: schemas.UserLogin):
         )
     
     user_data = response.data[0]
-    now = datetime.now(timezone.utc)
-
-    # 2. Check for existing lockout
-    if user_data.get("lockout_until"):
-        try:
-            lockout_time = datetime.fromisoformat(user_data["lockout_until"])
-        except ValueError:
-            lockout_time = now - timedelta(seconds=1)
 
-        if lockout_time > now:
-            wait_seconds = (lockout_time - now).total_seconds()
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Too many failed attempts. Please wait {int(wait_seconds)} seconds."
-            )
+    # 2. Check for existing lockout (state persisted by another worker or before a restart)
+    wait_seconds = login_limiter.remember(form_data.username, user_data)
+    if wait_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many failed attempts. Please wait {wait_seconds} seconds."
+        )
 
     # 3. Verify the password (using the *fixed* security function)
     # form_data.password is the hash from the client
@@ -154,42 +229,16 @@ async def login(form_data: schemas.UserLogin):
     is_password_correct = verify_password(form_data.password, user_data["password_hash"])
     
     if not is_password_correct:
-        # --- Password is WRONG: Apply lockout ---
-        
-        current_attempts = user_data.get("failed_login_attempts", 0) + 1
-        lockout_duration_seconds = 0
-        
-        if current_attempts == 1:
-            lockout_duration_seconds = 30
-        elif current_attempts == 2:
-            lockout_duration_seconds = 60
-        else:
-            lockout_duration_seconds = 300
-            
-        new_lockout_until = now + timedelta(seconds=lockout_duration_seconds)
-        
-        try:
-            supabase.table("users").update({
-                "failed_login_attempts": current_attempts,
-                "lockout_until": new_lockout_until.isoformat()
-            }).eq("id", user_data["id"]).execute()
-        except Exception as e:
-            print(f"Failed to update lockout: {e}")
+        # --- Password is WRONG: Apply lockout (persisted in batches, see core/login_limiter.py) ---
+        lockout_duration_seconds = login_limiter.record_failure(form_data.username)
 
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Incorrect username or password. Please wait {lockout_duration_seconds} seconds."
         )
 
-    # 4. Password is CORRECT: Reset attempts and create token
-    try:
-        if user_data.get("failed_login_attempts", 0) > 0 or user_data.get("lockout_until") is not None:
-            supabase.table("users").update({
-                "failed_login_attempts": 0,
-                "lockout_until": None
-            }).eq("id", user_data["id"]).execute()
-    except Exception as e:
-        print(f"Failed to reset lockout on success: {e}")
+    # 4. Password is CORRECT: Reset attempts (write-behind) and create token
+    login_limiter.record_success(form_data.username)
 
     token_data = {"id": str(user_data["id"]), "username": user_data["username"]}
     access_token = create_access_token(data=token_data)
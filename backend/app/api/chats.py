@@ -1,17 +1,24 @@
 # backend/app/api/chats.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.security import HTTPAuthorizationCredentials
+import asyncio
 import uuid
 import os
 import json
+import hashlib
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
 from ..core.supabase_client import supabase
-from ..security.security import get_current_user_id, oauth2_scheme
+from ..core import chat_hub, responses
+from ..core.cache import SharedCache, TTLCache
+from ..security.security import get_current_user_id, oauth2_scheme, decode_user_id, credentials_exception
 from ..models import schemas
-from typing import List
+from ..security.crypto_algorithms import registry
+from typing import Dict, List, Optional, Tuple
 
 # --- [NEW] MiTM Imports ---
-from ..security.mitm_tools import get_listeners, capture_packet, hash_data
+from ..security.mitm_tools import get_listeners, capture_packet, capture_packets, hash_data
 # --- End MiTM Imports ---
 
 
@@ -37,6 +44,22 @@ def get_supabase_url():
         raise HTTPException(status_code=500, detail="SUPABASE_URL not configured")
     return url
 
+def _is_chat_participant(chat_id: uuid.UUID, user_id: str, token: str) -> bool:
+    """Vérifie (avec le jeton de l'utilisateur) que le chat est accepté et qu'il y participe."""
+    supabase_url = get_supabase_url()
+    response = supabase.postgrest.session.get(
+        f"{supabase_url}/rest/v1/chat_requests",
+        headers={"Authorization": f"Bearer {token}"},
+        params={
+            "id": f"eq.{str(chat_id)}",
+            "status": "eq.accepted",
+            "or": f"(sender_id.eq.{user_id},receiver_id.eq.{user_id})",
+            "select": "id"
+        }
+    )
+    response.raise_for_status()
+    return bool(responses.loads(response.content))
+
 # --- Chat Request Creation Endpoint ---
 
 @router.post("/request", response_model=schemas.ChatRequest)
@@ -61,26 +84,11 @@ async def create_chat_request(
     method = request_data.encryption_method
 
     try:
-        if method == "caesar":
-            if "shift" not in params or not isinstance(params["shift"], int):
-                raise ValueError("The 'shift' parameter (integer) is required for Caesar.")
-        elif method == "playfair":
-            if "key" not in params or not isinstance(params["key"], str):
-                raise ValueError("The 'key' parameter (string) is required for Playfair.")
-            if "size" not in params or not isinstance(params["size"], int):
-                raise ValueError("The 'size' parameter (integer) is required for Playfair.")
-            if params["size"] not in [5, 6]:
-                raise ValueError("Size for Playfair must be 5 or 6.")
-        elif method == "hill":
-            if "key" not in params or not isinstance(params["key"], str):
-                raise ValueError("The 'key' parameter (string) is required for Hill.")
-            if "size" not in params or not isinstance(params["size"], int):
-                raise ValueError("The 'size' parameter (integer) is required for Hill.")
-            if params["size"] not in [2, 3]:
-                raise ValueError("Size for Hill must be 2 or 3.")
-        else:
-            raise ValueError(f"Encryption method '{method}' not supported.")
-            
+        # Validation (et compilation de la clé) par le registre des algorithmes
+        registry.compile_cipher(method, params)
+        # Le client de chat (chat.js) ne sait inverser que les matrices 2x2 et 3x3
+        if method == "hill" and params.get("size") not in (2, 3):
+            raise ValueError("Size for Hill must be 2 or 3.")
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -128,12 +136,14 @@ async def create_chat_request(
         response = supabase.postgrest.session.post(
             f"{supabase_url}/rest/v1/chat_requests",
             headers=headers,
-            data=json.dumps(new_request_data)
+            content=responses.dumps(new_request_data)
         )
         
         response.raise_for_status() 
+
+        invalidate_chat_requests(sender_id, request_data.receiver_id)
             
-        return response.json()[0] 
+        return responses.loads(response.content)[0] 
 
     except Exception as e:
         error_detail = f"An error occurred: {str(e)}"
@@ -150,54 +160,105 @@ async def create_chat_request(
 
 # --- Other Endpoints (Unchanged) ---
 
+# --- Chat Request Listing (cached, usernames resolved locally) ---
+
+CHAT_REQUEST_STATUSES = ("pending", "accepted", "rejected")
+MAX_CHAT_REQUESTS_PAGE = 200
+
+# Demandes de chaque utilisateur (lignes brutes) ; invalidé à la création et à la réponse.
+# Partagé entre les workers (core/shared_state.py) : l'invalidation est vue par tous.
+chat_requests_cache = SharedCache("chat_requests", max_size=2048, ttl=30)
+# id utilisateur -> nom d'utilisateur, à la place de la jointure PostgREST
+usernames_cache = TTLCache("usernames", max_size=20000, ttl=600)
+
+
+def invalidate_chat_requests(*user_ids):
+    chat_requests_cache.delete(*[str(user_id) for user_id in user_ids])
+
+
+def _fetch_chat_requests(user_id: str, token: str) -> List[dict]:
+    supabase_url = get_supabase_url()
+    response = supabase.postgrest.session.get(
+        f"{supabase_url}/rest/v1/chat_requests",
+        headers={"Authorization": f"Bearer {token}"},
+        params={
+            "select": "id,sender_id,receiver_id,status,encryption_method,encryption_params",
+            "or": f"(sender_id.eq.{user_id},receiver_id.eq.{user_id})",
+            "order": "id.asc"
+        }
+    )
+    response.raise_for_status()
+    return responses.loads(response.content)
+
+
+def resolve_usernames(user_ids: List[str], token: str) -> Dict[str, str]:
+    """Noms d'utilisateur depuis le cache ; les absents sont chargés en une seule requête."""
+    found = usernames_cache.get_many(user_ids)
+    missing = sorted(set(user_ids) - set(found))
+    if missing:
+        supabase_url = get_supabase_url()
+        response = supabase.postgrest.session.get(
+            f"{supabase_url}/rest/v1/users",
+            headers={"Authorization": f"Bearer {token}"},
+            params={"select": "id,username", "id": f"in.({','.join(missing)})"}
+        )
+        response.raise_for_status()
+        for row in responses.loads(response.content):
+            usernames_cache.set(row["id"], row["username"])
+            found[row["id"]] = row["username"]
+    return found
+
+
 @router.get("/requests", response_model=List[schemas.ChatRequestDetails])
 async def get_chat_requests(
+    status_filter: Optional[str] = Query(None, alias="status", description="pending, accepted or rejected"),
+    after: Optional[uuid.UUID] = Query(None, description="Cursor: only requests with an id greater than this one"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_CHAT_REQUESTS_PAGE),
     user_id: str = Depends(get_current_user_id),
     creds: HTTPAuthorizationCredentials = Depends(oauth2_scheme)
 ):
     """
-    Retrieves all chat requests for the logged-in user.
+    Retrieves the chat requests of the logged-in user (sent and received), ordered by id.
+    Optional filters: 'status', and 'after' + 'limit' for cursor pagination
+    ('X-Next-Cursor' holds the cursor of the next page when 'limit' cut the list).
     """
+    if status_filter is not None and status_filter not in CHAT_REQUEST_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status must be 'pending', 'accepted' or 'rejected'"
+        )
+
     try:
-        supabase_url = get_supabase_url()
         token = creds.credentials
-        headers = {"Authorization": f"Bearer {token}"} 
-        
-        params = {
-            "select": "*,sender:users!sender_id(username),receiver:users!receiver_id(username)",
-            "or": f"(sender_id.eq.{user_id},receiver_id.eq.{user_id})"
-        }
-        
-        response = supabase.postgrest.session.get(
-            f"{supabase_url}/rest/v1/chat_requests",
-            headers=headers,
-            params=params
+        rows = chat_requests_cache.get(user_id)
+        headers = {"X-Cache": "HIT" if rows is not None else "MISS"}
+        if rows is None:
+            rows = _fetch_chat_requests(user_id, token)
+            chat_requests_cache.set(user_id, rows)
+
+        if status_filter is not None:
+            rows = [row for row in rows if row["status"] == status_filter]
+        if after is not None:
+            rows = [row for row in rows if uuid.UUID(row["id"]) > after]
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = rows[-1]["id"]
+
+        usernames = resolve_usernames(
+            list({row["sender_id"] for row in rows} | {row["receiver_id"] for row in rows}), token
+        )
+        # Lignes de la base déjà conformes au schéma : pas de re-validation par response_model
+        return responses.FastJSONResponse(
+            [
+                {
+                    **row,
+                    "sender_username": usernames.get(row["sender_id"], "Unknown"),
+                    "receiver_username": usernames.get(row["receiver_id"], "Unknown")
+                }
+                for row in rows
+            ],
+            headers=headers
         )
-        
-        response.raise_for_status()
-        
-        data = response.json()
-        if not data:
-            return []
-
-        formatted_data = []
-        for item in response.json():
-            sender_username = item.get('sender', {}).get('username', 'Unknown')
-            receiver_username = item.get('receiver', {}).get('username', 'Unknown')
-
-            details = schemas.ChatRequestDetails(
-                id=item['id'],
-                sender_id=item['sender_id'],
-                receiver_id=item['receiver_id'], 
-                sender_username=sender_username,
-                receiver_username=receiver_username, 
-                status=item['status'],
-                encryption_method=item['encryption_method'],
-                encryption_params=item['encryption_params']
-            )
-            formatted_data.append(details)
-            
-        return formatted_data
 
     except Exception as e:
         error_detail = f"An error occurred: {str(e)}"
@@ -241,17 +302,19 @@ async def respond_to_chat_request(
             f"{supabase_url}/rest/v1/chat_requests",
             headers=headers,
             params=params,
-            data=json.dumps(payload)
+            content=responses.dumps(payload)
         )
         
         response.raise_for_status()
         
-        data = response.json()
+        data = responses.loads(response.content)
         if not data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Pending request not found or permission denied."
             )
+
+        invalidate_chat_requests(data[0]["sender_id"], data[0]["receiver_id"])
             
         return data[0]
 
@@ -304,14 +367,17 @@ async def send_message(
         response = supabase.postgrest.session.post(
             f"{supabase_url}/rest/v1/messages",
             headers=headers,
-            data=json.dumps(new_message_data)
+            content=responses.dumps(new_message_data)
         )
 
         response.raise_for_status()
         
-        data = response.json()
+        data = responses.loads(response.content)
         if not data:
             raise HTTPException(status_code=500, detail="Could not send message.")
+
+        # Diffusion aux participants connectés en WebSocket
+        chat_hub.hub.publish(str(chat_id), data[0])
             
         return data[0]
 
@@ -322,39 +388,245 @@ async def send_message(
         raise HTTPException(status_code=500, detail=error_detail)
 
 
+MAX_BATCH_MESSAGES = 500
+
+@router.post("/{chat_id}/messages/batch", response_model=List[schemas.Message])
+async def send_messages_batch(
+    chat_id: uuid.UUID,
+    batch: schemas.MessageBatchCreate,
+    user_id: str = Depends(get_current_user_id),
+    creds: HTTPAuthorizationCredentials = Depends(oauth2_scheme)
+):
+    """
+    Sends several messages to an accepted chat in one call (bots, file chunks).
+    The chat is checked once, all rows are inserted with a single multi-row request
+    and MiTM packets are captured in one batch. Returns the created rows, in order.
+    """
+    if not batch.messages:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'messages' must not be empty.")
+    if len(batch.messages) > MAX_BATCH_MESSAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {MAX_BATCH_MESSAGES} messages."
+        )
+
+    token = creds.credentials
+    try:
+        is_participant = _is_chat_participant(chat_id, user_id, token)
+    except Exception as e:
+        error_detail = f"An error occurred: {str(e)}"
+        if hasattr(e, 'response'):
+             error_detail = f"Supabase error: {e.response.text}"
+        raise HTTPException(status_code=500, detail=error_detail)
+    if not is_participant:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found or not accepted.")
+
+    rows = [
+        {
+            "chat_id": str(chat_id),
+            "sender_id": user_id,
+            "encrypted_content": message.encrypted_content,
+            "content_type": message.content_type
+        }
+        for message in batch.messages
+    ]
+
+    # --- MiTM Capture (one listener lookup, one insert for the whole batch) ---
+    try:
+        listeners = get_listeners()
+        if listeners:
+            capture_packets(packet_type="chat_message", data_list=rows, listeners=listeners)
+    except Exception as e:
+        print(f"MiTM Chat Message Capture Error: {e}") # Don't fail message send
+    # --- End MiTM Capture ---
+
+    try:
+        supabase_url = get_supabase_url()
+        headers = get_supabase_headers(token)
+
+        response = supabase.postgrest.session.post(
+            f"{supabase_url}/rest/v1/messages",
+            headers=headers,
+            content=responses.dumps(rows)
+        )
+
+        response.raise_for_status()
+
+        data = responses.loads(response.content)
+        if len(data) != len(rows):
+            raise HTTPException(status_code=500, detail="Could not send all messages.")
+
+        for row in data:
+            chat_hub.hub.publish(str(chat_id), row)
+
+        return data
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_detail = f"An error occurred: {str(e)}"
+        if hasattr(e, 'response'):
+             error_detail = f"Supabase error: {e.response.text}"
+        raise HTTPException(status_code=500, detail=error_detail)
+
+
+# --- Message History (keyset pagination + ETag) ---
+
+MAX_MESSAGES_PAGE = 500
+# Colonnes renvoyées au client : celles de schemas.Message, rien de plus
+MESSAGE_COLUMNS = ",".join(schemas.Message.model_fields)
+
+def _message_filters(chat_id: uuid.UUID, before: Optional[int], after: Optional[int],
+                     since: Optional[datetime], limit: Optional[int]) -> Tuple[List[Tuple[str, str]], bool]:
+    """
+    Filtres PostgREST (liste de couples : une même colonne peut être filtrée deux fois)
+    et indicateur de tri décroissant.
+    """
+    filters = [("chat_id", f"eq.{str(chat_id)}")]
+    if after is not None:
+        filters.append(("id", f"gt.{after}"))
+    if before is not None:
+        filters.append(("id", f"lt.{before}"))
+    if since is not None:
+        filters.append(("created_at", f"gt.{since.isoformat()}"))
+    # 'before' seul : la page la plus récente avant le curseur (tri inverse, remis dans l'ordre ensuite)
+    descending = before is not None and after is None and since is None
+    filters.append(("order", "id.desc" if descending else "id.asc"))
+    if limit is not None:
+        filters.append(("limit", str(limit + 1)))  # +1 pour savoir s'il reste des messages
+    return filters, descending
+
+
+def _messages_etag(filters: List[Tuple[str, str]], ids: List[int]) -> str:
+    """Les messages ne sont jamais modifiés : leurs ids suffisent à identifier le résultat."""
+    digest = hashlib.sha1(json.dumps([filters, ids]).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
 @router.get("/{chat_id}/messages", response_model=List[schemas.Message])
 async def get_messages(
     chat_id: uuid.UUID,
+    before: Optional[int] = Query(None, description="Only messages with an id lower than this one"),
+    after: Optional[int] = Query(None, description="Only messages with an id greater than this one"),
+    since: Optional[datetime] = Query(None, description="Only messages created after this timestamp"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MESSAGES_PAGE),
+    if_none_match: Optional[str] = Header(None),
     user_id: str = Depends(get_current_user_id),
     creds: HTTPAuthorizationCredentials = Depends(oauth2_scheme)
 ):
     """
-    Retrieves all messages from an accepted chat.
+    Retrieves messages from an accepted chat, oldest first.
+    - No parameters: the whole history (previous behaviour).
+    - 'after' / 'since': only newer messages (incremental polling).
+    - 'before' + 'limit': the page of older messages just before a message id.
+    'X-Has-More' tells whether 'limit' cut the page. If 'If-None-Match' matches the
+    current ETag, 304 is returned without transferring the messages.
     """
     
     try:
         supabase_url = get_supabase_url()
         token = creds.credentials
         headers = {"Authorization": f"Bearer {token}"}
-        
-        params = {
-            "chat_id": f"eq.{str(chat_id)}",
-            "select": "*",
-            "order": "created_at.asc" 
-        }
+        filters, descending = _message_filters(chat_id, before, after, since, limit)
 
-        response = supabase.postgrest.session.get(
-            f"{supabase_url}/rest/v1/messages",
-            headers=headers,
-            params=params
-        )
-        
-        response.raise_for_status()
-        
-        return response.json()
+        def fetch(select: str):
+            res = supabase.postgrest.session.get(
+                f"{supabase_url}/rest/v1/messages",
+                headers=headers,
+                params=filters + [("select", select)]
+            )
+            res.raise_for_status()
+            rows = responses.loads(res.content)
+            has_more = limit is not None and len(rows) > limit
+            rows = rows[:limit] if limit is not None else rows
+            if descending:
+                rows.reverse()
+            return rows, has_more
+
+        # Requête légère (ids seulement) pour vérifier l'ETag du client
+        if if_none_match:
+            id_rows, _ = fetch("id")
+            etag = _messages_etag(filters, [row["id"] for row in id_rows])
+            if etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        messages, has_more = fetch(MESSAGE_COLUMNS)
+        # Colonnes du schéma seulement : les lignes sont renvoyées sans re-validation par response_model
+        return responses.FastJSONResponse(messages, headers={
+            "ETag": _messages_etag(filters, [row["id"] for row in messages]),
+            "X-Has-More": "true" if has_more else "false"
+        })
 
     except Exception as e:
         error_detail = f"An error occurred: {str(e)}"
         if hasattr(e, 'response'):
              error_detail = f"Supabase error: {e.response.text}"
         raise HTTPException(status_code=500, detail=error_detail)
+
+
+# --- Real-time Delivery (WebSocket) ---
+
+WS_AUTH_TIMEOUT_SECONDS = 10
+
+@router.websocket("/{chat_id}/ws")
+async def chat_websocket(websocket: WebSocket, chat_id: uuid.UUID):
+    """
+    Pushes the new messages of an accepted chat as soon as they are sent.
+    The first frame must be {"token": "<access token>"}. The server then answers
+    {"type": "subscribed"} and sends {"type": "message", "message": {...}} per new message.
+    Frames sent by the client afterwards (keep-alive pings) are ignored.
+    """
+    await websocket.accept()
+
+    # --- Authentication & membership ---
+    try:
+        auth = await asyncio.wait_for(websocket.receive_json(), WS_AUTH_TIMEOUT_SECONDS)
+        token = auth.get("token") if isinstance(auth, dict) else None
+        if not isinstance(token, str):
+            raise credentials_exception
+        user_id = decode_user_id(token)
+        if not await run_in_threadpool(_is_chat_participant, chat_id, user_id, token):
+            raise credentials_exception
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, HTTPException, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    except Exception as e:
+        print(f"Chat WebSocket authentication error: {e}")
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    # --- Subscription ---
+    subscription = chat_hub.hub.subscribe(str(chat_id), user_id)
+
+    async def push_messages():
+        while True:
+            message = await subscription.get()
+            await websocket.send_text(responses.dumps({"type": "message", "message": message}).decode())
+
+    async def ignore_pings():
+        while True:
+            await websocket.receive_text()
+
+    tasks = []
+    try:
+        await websocket.send_json({"type": "subscribed", "chat_id": str(chat_id)})
+        sender = asyncio.create_task(push_messages())
+        tasks = [sender, asyncio.create_task(ignore_pings())]
+        # La connexion s'arrête dès que l'une des deux boucles s'arrête
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done and not isinstance(sender.exception(), WebSocketDisconnect):
+            print(f"Chat WebSocket send error: {sender.exception()!r}")
+            try:
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            except Exception:
+                pass  # Socket déjà fermé
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Récupère les exceptions des tâches (sinon "Task exception was never retrieved")
+        await asyncio.gather(*tasks, return_exceptions=True)
+        chat_hub.hub.unsubscribe(subscription)
@@ -1,45 +1,37 @@
-from fastapi import APIRouter, HTTPException, Body
+import codecs
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Body, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from ..models import schemas
-from ..security.crypto_algorithms import caesar, playfair, hill 
+from ..security.crypto_algorithms import registry, batch
+from ..security.attack_tools.workers import resolve_workers
+from ..core import jobs
+from ..core.lazy import lazy_import
+from ..core.responses import DuplexStreamingResponse
+
+# Attack tools (numpy): imported on first use, see core/lazy.py
+hill_attack = lazy_import("..security.attack_tools.hill_attack", __package__)
+playfair_attack = lazy_import("..security.attack_tools.playfair_attack", __package__)
 
 router = APIRouter(
     prefix="/crypto",
     tags=["Crypto Operations"]
 )
 
+def _compile(request: schemas.CryptoRequest):
+    """Clé compilée (depuis le cache du registre) pour les paramètres de la requête."""
+    return registry.compile_cipher(request.method, registry.field_params(key=request.key, shift=request.shift, size=request.size))
+
+
 @router.post("/encrypt", response_model=schemas.CryptoResponse)
 async def simple_encrypt(request: schemas.CryptoRequest):
     """
     Encrypts the plaintext using the specified method and parameters.
     """
     try:
-        if request.method == "caesar":
-            if request.shift is None:
-                raise ValueError("A 'shift' is required for Caesar.")
-            res = caesar.encrypt(request.text, request.shift)
-            return {"result_text": res}
-        
-        elif request.method == "playfair":
-            if request.key is None or request.size is None:
-                raise ValueError("A 'key' and 'size' [5 or 6] are required for Playfair.")
-            if request.size not in [5, 6]:
-                raise ValueError("Size for Playfair must be 5 or 6.")
-            
-            res = playfair.encrypt(request.text, request.key, request.size)
-            return {"result_text": res}
-            
-        elif request.method == "hill":
-            if request.key is None or request.size is None:
-                raise ValueError("A 'key' and 'size' [2 or 3] are required for Hill.")
-            if request.size not in [2, 3]:
-                raise ValueError("Size for Hill must be 2 or 3.")
-
-            res = hill.encrypt(request.text, request.key, request.size)
-            return {"result_text": res}
-            
-        else:
-            raise HTTPException(status_code=400, detail="Invalid method. Must be 'caesar', 'playfair', or 'hill'.")
-    
+        return {"result_text": _compile(request).encrypt(request.text)}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -52,34 +44,199 @@ async def simple_decrypt(request: schemas.CryptoRequest):
     Decrypts the ciphertext using the specified method and parameters.
     """
     try:
-        if request.method == "caesar":
-            if request.shift is None:
-                raise ValueError("A 'shift' is required for Caesar.")
-            res = caesar.decrypt(request.text, request.shift)
-            return {"result_text": res}
-        
-        elif request.method == "playfair":
-            if request.key is None or request.size is None:
-                raise ValueError("A 'key' and 'size' [5 or 6] are required for Playfair.")
-            if request.size not in [5, 6]:
-                raise ValueError("Size for Playfair must be 5 or 6.")
-
-            res = playfair.decrypt(request.text, request.key, request.size)
-            return {"result_text": res}
-            
-        elif request.method == "hill":
-            if request.key is None or request.size is None:
-                raise ValueError("A 'key' and 'size' [2 or 3] are required for Hill.")
-            if request.size not in [2, 3]:
-                raise ValueError("Size for Hill must be 2 or 3.")
-
-            res = hill.decrypt(request.text, request.key, request.size)
-            return {"result_text": res}
-            
+        return {"result_text": _compile(request).decrypt(request.text)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+# --- Batch Endpoints ---
+
+MAX_BATCH_ITEMS = 10_000
+
+def _stream_batch(mode: str, request: schemas.CryptoBatchRequest) -> StreamingResponse:
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {MAX_BATCH_ITEMS} items.")
+
+    items = [(item.text, item.method, item.key, item.shift, item.size) for item in request.items]
+
+    def lines():
+        for index, ok, value in batch.run_batch(mode, items):
+            line = {"index": index, "result_text": value} if ok else {"index": index, "error": value}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/batch/encrypt")
+async def batch_encrypt(request: schemas.CryptoBatchRequest):
+    """
+    Encrypts many texts in one call. Items may mix methods and keys; each distinct key
+    is compiled once. Results stream back as NDJSON, one line per item, in input order:
+    {"index": i, "result_text": ...} or {"index": i, "error": ...}.
+    """
+    return _stream_batch("encrypt", request)
+
+
+@router.post("/batch/decrypt")
+async def batch_decrypt(request: schemas.CryptoBatchRequest):
+    """
+    Decrypts many texts in one call (same format as /crypto/batch/encrypt).
+    """
+    return _stream_batch("decrypt", request)
+
+
+# --- Streaming Endpoints ---
+
+def _stream_transform(mode: str, http_request: Request, method: str, key: Optional[str],
+                      shift: Optional[int], size: Optional[int]) -> StreamingResponse:
+    try:
+        compiled = registry.compile_cipher(method, registry.field_params(key=key, shift=shift, size=size))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    transform = compiled.encryptor() if mode == "encrypt" else compiled.decryptor()
+    # Un caractère UTF-8 peut être coupé entre deux morceaux ; les octets invalides
+    # deviennent U+FFFD, qui n'est pas une lettre et est donc ignoré par les algorithmes.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def body():
+        async for chunk in http_request.stream():
+            out = await run_in_threadpool(transform.update, decoder.decode(chunk))
+            if out:
+                yield out
+        yield transform.update(decoder.decode(b"", final=True)) + transform.finalize()
+
+    return DuplexStreamingResponse(body(), media_type="text/plain; charset=utf-8")
+
+
+@router.post("/stream/encrypt")
+async def stream_encrypt(http_request: Request, method: str, key: Optional[str] = None,
+                         shift: Optional[int] = None, size: Optional[int] = None):
+    """
+    Encrypts a raw UTF-8 request body (text or file upload) chunk by chunk and streams the
+    ciphertext back, so memory stays bounded whatever the payload size.
+    Parameters are passed in the query string: ?method=hill&key=HILL&size=2
+    """
+    return _stream_transform("encrypt", http_request, method, key, shift, size)
+
+
+@router.post("/stream/decrypt")
+async def stream_decrypt(http_request: Request, method: str, key: Optional[str] = None,
+                         shift: Optional[int] = None, size: Optional[int] = None):
+    """
+    Decrypts a raw request body chunk by chunk (same parameters as /crypto/stream/encrypt).
+    """
+    return _stream_transform("decrypt", http_request, method, key, shift, size)
+
+
+# --- Cryptanalysis Endpoints ---
+
+@router.post("/cryptanalysis/hill", response_model=schemas.HillCryptanalysisResponse)
+async def cryptanalysis_hill(request: schemas.HillCryptanalysisRequest):
+    """
+    Recovers a Hill key.
+    - With 'pairs' (plaintext/ciphertext, e.g. intercepted MiTM chat packets):
+      known-plaintext attack, K = C * P^-1 mod 26, for any 'size'.
+    - With 'ciphertext' only: exhaustive search of all 2x2 keys scored by quadgram fitness.
+    """
+    try:
+        if request.pairs:
+            if request.size < 2:
+                raise ValueError("Size for Hill must be at least 2.")
+            pairs = [(p.plaintext, p.ciphertext) for p in request.pairs]
+            result = await run_in_threadpool(hill_attack.recover_key_known_plaintext, pairs, request.size)
+            return {"mode": "known_plaintext", **result}
+
+        elif request.ciphertext:
+            if request.size != 2:
+                raise ValueError("Ciphertext-only search is only supported for 2x2 keys.")
+            workers = resolve_workers(request.workers)
+            # Pool de processus : compte parmi les MAX_JOBS jobs simultanés
+            result = await run_in_threadpool(jobs.run, hill_attack.crack_ciphertext_only, request.ciphertext, workers)
+            return {"mode": "ciphertext_only", **result}
+
         else:
-            raise HTTPException(status_code=400, detail="Invalid method. Must be 'caesar', 'playfair', or 'hill'.")
-    
+            raise ValueError("Provide 'pairs' (known-plaintext) or 'ciphertext' (ciphertext-only).")
+
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@router.post("/cryptanalysis/hill/benchmark")
+async def cryptanalysis_hill_benchmark(request: schemas.HillCryptanalysisRequest):
+    """
+    Reports the 2x2 ciphertext-only search throughput (keys/sec), single-core and multi-core.
+    """
+    if not request.ciphertext:
+        raise HTTPException(status_code=400, detail="A 'ciphertext' is required for the benchmark.")
+    try:
+        workers = resolve_workers(request.workers)
+        return await run_in_threadpool(
+            jobs.run, hill_attack.benchmark, request.ciphertext, hill_attack.KEYSPACE_2X2, workers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/cryptanalysis/playfair", response_model=schemas.CryptanalysisJob, status_code=202)
+async def cryptanalysis_playfair(request: schemas.PlayfairCryptanalysisRequest):
+    """
+    Starts a ciphertext-only Playfair attack (parallel simulated annealing over 5x5 or 6x6 grids).
+    Returns a job; poll GET /crypto/cryptanalysis/jobs/{job_id} for progress and the result.
+    """
+    try:
+        playfair_attack.prepare_ciphertext(request.ciphertext, request.size)
+        restarts = request.restarts or playfair_attack.DEFAULT_RESTARTS
+        steps = request.steps or playfair_attack.DEFAULT_STEPS
+        if not 1 <= restarts <= 64:
+            raise ValueError("'restarts' must be between 1 and 64.")
+        if not 1 <= steps <= 20000:
+            raise ValueError("'steps' must be between 1 and 20000.")
+        workers = resolve_workers(request.workers)
+
+        job = jobs.submit(
+            "playfair", playfair_attack.crack, request.ciphertext, request.size,
+            restarts=restarts, steps=steps, workers=workers
+        )
+        return job.to_dict()
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/cryptanalysis/jobs/{job_id}", response_model=schemas.CryptanalysisJob)
+async def get_cryptanalysis_job(job_id: str):
+    """
+    Returns the status, progress and (once finished) the result of a cryptanalysis job.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job.to_dict()
+
+
+@router.post("/cryptanalysis/playfair/benchmark")
+async def cryptanalysis_playfair_benchmark(request: schemas.PlayfairCryptanalysisRequest):
+    """
+    Reports the Playfair annealing throughput (candidate decryptions/sec), single-core and multi-core.
+    """
+    try:
+        workers = resolve_workers(request.workers)
+        return await run_in_threadpool(
+            jobs.run, playfair_attack.benchmark, request.ciphertext, request.size,
+            min(request.steps or 200, 2000), workers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
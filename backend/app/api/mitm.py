@@ -5,7 +5,9 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Body
 from ..core.supabase_client import supabase
+from ..core.responses import FastJSONResponse
 from ..security.security import get_current_user_id, oauth2_scheme
+from ..security.mitm_tools import invalidate_listeners
 from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List
@@ -32,6 +34,7 @@ async def start_mitm_attack(
             {"attacker_username": request.attacker_username, "status": "listening"},
             on_conflict="attacker_username" 
         ).execute()
+        invalidate_listeners()
         
         if response.data:
             return {"status": "success", "message": "MiTM attack listener started."}
@@ -53,6 +56,7 @@ async def stop_mitm_attack(
         response = supabase.table("mitm_listeners").delete().eq(
             "attacker_username", request.attacker_username
         ).execute()
+        invalidate_listeners()
         
         return {"status": "success", "message": "MiTM attack listener stopped."}
 
@@ -106,8 +110,8 @@ async def get_mitm_packets(
         packet_ids = [p['id'] for p in packets]
         supabase.table("intercepted_packets").delete().in_("id", packet_ids).execute()
 
-        # 4. Return the packets
-        return packets
+        # 4. Return the packets (serialized as-is, no jsonable_encoder pass)
+        return FastJSONResponse(packets)
 
     except Exception as e:
         supabase.postgrest.auth(os.environ.get("SUPABASE_KEY")) # Reset auth on failure
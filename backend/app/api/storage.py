@@ -1,16 +1,23 @@
 import os
 import uuid
-import base64
+import functools
+import json
 from typing import Optional, List # <-- [FIXED] Import Optional and List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Body
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form, Body, Header
 from fastapi.security import HTTPAuthorizationCredentials
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from ..security.security import oauth2_scheme, get_current_user_id
-from ..core.supabase_client import supabase
+from ..core import storage_upload, content_store, zipstream, downloads, columnar
+from ..core.lazy import lazy_import
 from ..models import schemas
 
-# Import all steganography tools
-from ..security.steganography_tools import image_steg, audio_steg, video_steg
+# Steganography tools (numpy, PIL, scipy): imported on first use, see core/lazy.py
+image_steg = lazy_import("..security.steganography_tools.image_steg", __package__)
+audio_steg = lazy_import("..security.steganography_tools.audio_steg", __package__)
+video_steg = lazy_import("..security.steganography_tools.video_steg", __package__)
+steg_batch = lazy_import("..security.steganography_tools.batch", __package__)
+carrier_cache = lazy_import("..core.carrier_cache", __package__)
 
 router = APIRouter(
     prefix="/storage",
@@ -19,17 +26,51 @@ router = APIRouter(
 
 BUCKET_NAME = "steganography_files"
 
+
+def _public_url(file_path: str) -> str:
+    return f"{storage_upload.storage_url()}/object/public/{BUCKET_NAME}/{file_path}"
+
 # --- EXISTING /upload ENDPOINT (Keep) ---
 
-@router.post("/upload", response_model=schemas.FileUploadResponse)
+@router.post(
+    "/upload",
+    response_model=schemas.FileUploadResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": ["file"],
+        "properties": {"file": {"type": "string", "format": "binary"}},
+    }}}}},
+)
 async def upload_file(
-    file: UploadFile = File(...),
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     creds: HTTPAuthorizationCredentials = Depends(oauth2_scheme)
 ):
     """
     Uploads a file to the user's private folder in Supabase Storage.
+    The multipart body is streamed to Storage as it arrives (resumable upload for large files).
+    A file whose content (SHA-256) was already uploaded by the user is not sent again.
     """
+    content_length = request.headers.get("content-length")
+    expected_size = int(content_length) if content_length else None
+
+    # Empreinte annoncée par le client : fichier déjà stocké, le corps n'est même pas lu
+    claimed = content_store.parse_sha256(request.headers.get(content_store.SHA256_HEADER))
+    if claimed:
+        existing = content_store.lookup(user_id, claimed)
+        if existing:
+            content_store.record_hit(expected_size or 0)
+            response.headers["X-Deduplicated"] = "true"
+            return {"file_url": _public_url(existing)}
+
+    try:
+        file = await storage_upload.MultipartFileStream(
+            request.stream(), request.headers.get("content-type", "")
+        ).open()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     if not (
         file.content_type.startswith("image/") or
         file.content_type.startswith("audio/") or
@@ -41,30 +82,32 @@ async def upload_file(
         )
 
     try:
-        contents = await file.read()
         file_path = f"{user_id}/{uuid.uuid4()}-{file.filename}"
         token = creds.credentials
-        
-        supabase_url = os.environ.get("SUPABASE_URL")
-        if not supabase_url:
-            raise HTTPException(status_code=500, detail="SUPABASE_URL not configured in .env")
-        upload_url = f"{supabase_url}/storage/v1/object/{BUCKET_NAME}/{file_path}"
-        
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": file.content_type
-        }
-        
-        response = supabase.postgrest.session.post(
-            upload_url, headers=headers, data=contents
+        hashed = content_store.HashingStream(file)
+
+        if expected_size is not None and expected_size <= storage_upload.RESUMABLE_THRESHOLD:
+            # Petit fichier : lu en entier (borné) pour connaître l'empreinte avant l'envoi
+            contents = b"".join([data async for data in hashed])
+            existing = content_store.lookup(user_id, hashed.hexdigest())
+            if existing:
+                content_store.record_hit(len(contents))
+                response.headers["X-Deduplicated"] = "true"
+                return {"file_url": _public_url(existing)}
+            stream = storage_upload.iter_bytes(contents)
+        else:
+            stream = hashed
+
+        await storage_upload.upload_stream(
+            token, BUCKET_NAME, file_path, file.content_type, stream,
+            expected_size=expected_size,
         )
-        
-        response.raise_for_status()
+        content_store.remember(user_id, hashed.hexdigest(), file_path)
 
-        public_url = f"{supabase_url}/storage/v1/object/public/{BUCKET_NAME}/{file_path}"
-            
-        return {"file_url": public_url}
+        return {"file_url": _public_url(file_path)}
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         error_detail = f"An unexpected error occurred: {str(e)}"
         if hasattr(e, 'response'):
@@ -74,6 +117,14 @@ async def upload_file(
 
 # --- EXISTING FUNCTIONAL STEGANOGRAPHY ENDPOINTS (Keep) ---
 
+# Les images déjà décodées sont relues depuis le cache .npy (pas de nouveau décodage PIL).
+# Les WAV ne passent pas par le cache : leur lecture par scipy est déjà une simple copie.
+
+def _encode_image(image_bytes: bytes, secret_message: str) -> bytes:
+    pixels, _ = carrier_cache.load("image", image_bytes, image_steg.load_pixels)
+    return image_steg.encode_pixels(pixels, secret_message)
+
+
 @router.post("/steganography/image/encode", response_class=Response)
 async def steganography_image_encode(
     secret_message: str = Form(...),
@@ -85,7 +136,7 @@ async def steganography_image_encode(
         raise HTTPException(status_code=400, detail="File must be an image.")
     try:
         image_bytes = await file.read()
-        encoded_image_bytes = image_steg.encode_message(image_bytes, secret_message)
+        encoded_image_bytes = await run_in_threadpool(_encode_image, image_bytes, secret_message)
         return Response(
             content=encoded_image_bytes,
             media_type="image/png", # Force PNG for LSB
@@ -128,7 +179,7 @@ async def steganography_audio_encode(
         raise HTTPException(status_code=400, detail="File must be a WAV audio file (.wav).")
     try:
         audio_bytes = await file.read()
-        encoded_audio_bytes = audio_steg.encode_message(audio_bytes, secret_message)
+        encoded_audio_bytes = await run_in_threadpool(audio_steg.encode_message, audio_bytes, secret_message)
         return Response(
             content=encoded_audio_bytes,
             media_type="audio/wav",
@@ -198,74 +249,224 @@ async def steganography_video_decode(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+# --- BATCH ENCODING ---
+
+MAX_BATCH_STEGO_ITEMS = 100
+
+# Type MIME attendu et message d'erreur par type de support
+_BATCH_MEDIA = {
+    "image": ("image/", "File must be an image."),
+    "audio": ("audio/wav", "File must be a WAV audio file (.wav)."),
+    "video": ("video/", "File must be a video file."),
+}
+
+
+def _load_carrier(media_type: str, data: bytes):
+    """Support décodé une seule fois pour tout le lot."""
+    if media_type == "image":
+        return carrier_cache.load("image", data, image_steg.load_pixels)
+    if media_type == "audio":
+        return audio_steg.load_samples(data)
+    return data, {}
+
+
+def _batch_filename(media_type: str, index: int, filename: str) -> str:
+    stem = os.path.basename(filename or f"file{index}")
+    if media_type == "image":
+        return f"encoded_{index:03d}_{os.path.splitext(stem)[0]}.png"
+    return f"encoded_{index:03d}_{stem}"
+
+
+@router.post("/steganography/{media_type}/encode/batch")
+async def steganography_encode_batch(
+    media_type: str,
+    secret_messages: List[str] = Form(...),
+    files: List[UploadFile] = File(...),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Hides many messages in one file (e.g. one watermark per recipient), one message
+    in many files, or pairs files and messages one to one. Each file is decoded once
+    and the encodes run in parallel workers.
+    Returns a ZIP archive, streamed as the files are ready, with a manifest.json
+    mapping each output to its file and message.
+    """
+    if media_type not in _BATCH_MEDIA:
+        raise HTTPException(status_code=400, detail="Invalid media type.")
+    expected_type, type_error = _BATCH_MEDIA[media_type]
+    for file in files:
+        if not (file.content_type or "").startswith(expected_type):
+            raise HTTPException(status_code=400, detail=type_error)
+
+    try:
+        jobs = steg_batch.pair_jobs(len(files), len(secret_messages))
+        if len(jobs) > MAX_BATCH_STEGO_ITEMS:
+            raise ValueError(f"A batch may produce at most {MAX_BATCH_STEGO_ITEMS} files.")
+
+        carriers, metas = [], []
+        for file in files:
+            carrier, meta = await run_in_threadpool(_load_carrier, media_type, await file.read())
+            carriers.append(carrier)
+            metas.append(meta)
+        steg_batch.check_capacity(media_type, carriers, secret_messages, jobs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    names = [
+        _batch_filename(media_type, i + 1, files[carrier_index].filename)
+        for i, (carrier_index, _) in enumerate(jobs)
+    ]
+    tasks = [
+        functools.partial(
+            steg_batch.encode, media_type, carriers[carrier_index], metas[carrier_index],
+            secret_messages[message_index]
+        )
+        for carrier_index, message_index in jobs
+    ]
+
+    async def entries():
+        async for index, content in steg_batch.run(tasks):
+            yield names[index], content
+        manifest = [
+            {"file": names[i], "source_file": files[c].filename, "message_index": m}
+            for i, (c, m) in enumerate(jobs)
+        ]
+        yield "manifest.json", json.dumps(manifest, indent=2).encode("utf-8")
+
+    return StreamingResponse(
+        zipstream.zip_stream(entries()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=encoded_{media_type}_batch.zip"}
+    )
+
+
 # --- [NEW] VISUALIZATION ENDPOINT ---
 
+def _visualize(media_type: str, mode: str, file_bytes: bytes, secret_message: Optional[str]):
+    """
+    Étapes de visualisation et fichier encodé, avec un seul passage du codec : le support
+    est décodé une fois, les visualiseurs ne lisent que les premiers pixels / échantillons
+    affichés et le message décodé (ou le fichier encodé) est réutilisé.
+    """
+    if media_type == 'image':
+        if mode == 'encode':
+            pixels, _ = carrier_cache.load("image", file_bytes, image_steg.load_pixels)
+            steps = image_steg.visualize_encode_pixels(pixels, secret_message)
+            return steps, image_steg.encode_pixels(pixels, secret_message)
+        pixels, _ = image_steg.load_pixels(file_bytes)
+        return image_steg.visualize_decode_pixels(pixels, image_steg.decode_pixels(pixels)), None
+
+    if media_type == 'audio':
+        samples, meta = audio_steg.load_samples(file_bytes)
+        if mode == 'encode':
+            steps = audio_steg.visualize_encode_samples(samples, secret_message)
+            return steps, audio_steg.encode_samples(samples, meta["samplerate"], secret_message)
+        return audio_steg.visualize_decode_samples(samples, audio_steg.decode_samples(samples)), None
+
+    if mode == 'encode':
+        steps = video_steg.visualize_encode_append_video(file_bytes, secret_message)
+        return steps, video_steg.encode_message(file_bytes, secret_message)
+    return video_steg.visualize_decode_append_video(file_bytes, video_steg.decode_message(file_bytes)), None
+
+
 @router.post("/steganography/visualize/{media_type}/{mode}", response_model=schemas.StegoVisualizationResponse)
 async def steganography_visualize(
+    request: Request,
     media_type: str, # 'image', 'audio', 'video'
     mode: str, # 'encode', 'decode'
     secret_message: Optional[str] = Form(None),
     file: UploadFile = File(...),
+    accept: Optional[str] = Header(None),
     user_id: str = Depends(get_current_user_id)
 ):
     """
     Provides a step-by-step breakdown of the steganography process.
-    The file data is passed directly in the request body.
+    The file data is passed directly in the request body; for encoding, the encoded
+    file is returned by reference (a short-lived download URL).
+    With 'Accept: application/vnd.seko.columnar+json', 'steps' uses the compact
+    column-oriented format (see core/columnar.py).
     """
     
-    file_bytes = await file.read()
-
-    # 1. Validation and Dispatch
+    # 1. Validation
     if media_type == 'image':
-        steg_module = image_steg
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image.")
+        result_type = "image/png"
     elif media_type == 'audio':
-        steg_module = audio_steg
         if not file.content_type.startswith("audio/wav"):
             raise HTTPException(status_code=400, detail="File must be a WAV audio file.")
+        result_type = "audio/wav"
     elif media_type == 'video':
-        steg_module = video_steg
         if not file.content_type.startswith("video/"):
             raise HTTPException(status_code=400, detail="File must be a video file.")
+        result_type = file.content_type
     else:
         raise HTTPException(status_code=400, detail="Invalid media type.")
 
+    if mode not in ('encode', 'decode'):
+        raise HTTPException(status_code=400, detail="Invalid mode. Must be 'encode' or 'decode'.")
     if mode == 'encode' and not secret_message:
         raise HTTPException(status_code=400, detail="Secret message is required for encoding.")
         
     try:
-        # 2. Generate Steps (Logic is in the respective module)
-        if mode == 'encode':
-            # Dispatch to LSB or Append logic
-            func = getattr(steg_module, f"visualize_encode_lsb_{media_type}" if media_type in ['image', 'audio'] else "visualize_encode_append_video")
-            steps = func(file_bytes, secret_message)
-            
-            # For encoding, get the final encoded file and convert it to Base64
-            final_func = getattr(steg_module, 'encode_message')
-            final_bytes = final_func(file_bytes, secret_message)
-            final_data_url = f"data:{file.content_type};base64,{base64.b64encode(final_bytes).decode('utf-8')}"
-            
-        elif mode == 'decode':
-            # Dispatch to LSB or Append logic
-            func = getattr(steg_module, f"visualize_decode_lsb_{media_type}" if media_type in ['image', 'audio'] else "visualize_decode_append_video")
-            steps = func(file_bytes)
-            final_data_url = None
-            
-        else:
-            raise HTTPException(status_code=400, detail="Invalid mode. Must be 'encode' or 'decode'.")
+        file_bytes = await file.read()
+
+        # 2. Generate Steps and the final file (one codec pass, off the event loop)
+        steps, final_bytes = await run_in_threadpool(_visualize, media_type, mode, file_bytes, secret_message)
+
+        download_url = None
+        if final_bytes is not None:
+            stem, extension = os.path.splitext(os.path.basename(file.filename or "file"))
+            if media_type == 'image':
+                extension = ".png"
+            token = await run_in_threadpool(
+                downloads.store.put, user_id, final_bytes, result_type, f"{stem}_stego{extension}"
+            )
+            download_url = request.app.url_path_for("download_generated_file", token=token)
         
         # 3. Return Response
-        return schemas.StegoVisualizationResponse(
+        response = schemas.StegoVisualizationResponse(
             steps=steps,
             final_result_data={
-                "data_url": final_data_url,
-                "mime_type": file.content_type,
+                "download_url": download_url,
+                "expires_in": downloads.store.ttl if download_url else None,
+                "size": len(final_bytes) if final_bytes is not None else None,
+                "mime_type": result_type,
                 "original_filename": file.filename
             }
         )
+        if columnar.wants_columnar(accept):
+            payload = response.model_dump()
+            payload["steps"] = columnar.encode_steps(payload["steps"])
+            return columnar.ColumnarResponse(payload, headers={"Vary": "Accept"})
+        return response
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Steganography Error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@router.get("/downloads/{token}", response_class=Response, name="download_generated_file")
+async def download_generated_file(token: str, user_id: str = Depends(get_current_user_id)):
+    """Downloads a file produced by the server (link valid for a few minutes, owner only)."""
+    item = downloads.store.get(token, user_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Download link expired or not found.")
+    try:
+        content = await run_in_threadpool(_read_file, item.path)
+    except FileNotFoundError:
+        # Évincé entre la vérification et la lecture
+        raise HTTPException(status_code=404, detail="Download link expired or not found.")
+    return Response(
+        content=content,
+        media_type=item.media_type,
+        headers={"Content-Disposition": f"attachment; filename={item.filename}"}
+    )
@@ -0,0 +1,182 @@
+# backend/app/core/cache.py
+# Cache mémoire LRU avec expiration (TTL), partagé par les routers.
+# Chaque cache nommé publie ses compteurs de hits / misses dans core.metrics.
+# SharedCache a la même interface mais vit dans core.shared_state : avec plusieurs
+# workers, une invalidation faite par l'un est vue par tous.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from . import metrics, shared_state
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Dictionnaire borné : les entrées expirent après 'ttl' secondes et les moins
+    récemment utilisées sont évincées au-delà de 'max_size' entrées.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = metrics.counter(f"cache_{name}_hits", f"Hits of the '{name}' cache")
+        self._misses = metrics.counter(f"cache_{name}_misses", f"Misses of the '{name}' cache")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._hits.inc()
+                    return value
+                del self._data[key]
+        self._misses.inc()
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Valeurs présentes (et non expirées) parmi 'keys'."""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def delete(self, *keys: Hashable):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class BytesLRUCache:
+    """
+    Cache LRU de réponses déjà sérialisées, borné par la taille totale des valeurs
+    (en octets) plutôt que par le nombre d'entrées. Les valeurs trop grosses (plus
+    de 'max_entry_bytes') ne sont pas conservées pour ne pas vider le cache d'un coup.
+    """
+
+    def __init__(self, name: str, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self._data: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = metrics.counter(f"cache_{name}_hits", f"Hits of the '{name}' cache")
+        self._misses = metrics.counter(f"cache_{name}_misses", f"Misses of the '{name}' cache")
+        metrics.ratio(f"cache_{name}_hit_rate", f"Hit rate of the '{name}' cache", self._hits, self._misses)
+        self._bytes = metrics.gauge(f"cache_{name}_bytes", f"Bytes held by the '{name}' cache")
+        self._entries = metrics.gauge(f"cache_{name}_entries", f"Entries held by the '{name}' cache")
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        (self._hits if value is not None else self._misses).inc()
+        return value
+
+    def set(self, key: Hashable, value: bytes):
+        if len(value) > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._data[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+            self._bytes.set(self._size)
+            self._entries.set(len(self._data))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+            self._bytes.set(0)
+            self._entries.set(0)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCache:
+    """
+    TTLCache dont les entrées vivent dans l'état partagé (espace de noms 'cache:<name>').
+    Pour les valeurs qu'un worker modifie ou invalide et que les autres doivent voir.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.namespace = f"cache:{name}"
+        self.max_size = max_size
+        self.ttl = ttl
+        self._hits = metrics.counter(f"cache_{name}_hits", f"Hits of the '{name}' cache")
+        self._misses = metrics.counter(f"cache_{name}_misses", f"Misses of the '{name}' cache")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = shared_state.get_state().get(self.namespace, key, _MISSING)
+        if value is _MISSING:
+            self._misses.inc()
+            return default
+        self._hits.inc()
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        shared_state.get_state().set(self.namespace, key, value, self.ttl if ttl is None else ttl, self.max_size)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(keys)
+        found = shared_state.get_state().get_many(self.namespace, keys)
+        self._hits.inc(len(found))
+        self._misses.inc(len(keys) - len(found))
+        return found
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def delete(self, *keys: Hashable):
+        shared_state.get_state().delete(self.namespace, *keys)
+
+    def clear(self):
+        shared_state.get_state().clear(self.namespace)
+
+    def __len__(self) -> int:
+        return shared_state.get_state().size(self.namespace)
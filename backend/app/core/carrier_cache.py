@@ -0,0 +1,107 @@
+# backend/app/core/carrier_cache.py
+# Cache disque des supports de stéganographie déjà décodés.
+#
+# Décoder une image (PIL) ou un WAV (scipy) coûte bien plus cher que d'y cacher un
+# message. Les tableaux décodés (pixels / échantillons) sont donc conservés en .npy,
+# indexés par le SHA-256 du fichier d'origine, et relus en mémoire mappée (np.load
+# mmap_mode="r") : réencoder le même support ne refait pas le décodage.
+# La taille totale est bornée ; les entrées les moins récemment utilisées sont évincées.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+from . import metrics
+
+CACHE_DIR = os.environ.get("CARRIER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "seko-carriers"))
+MAX_BYTES = int(os.environ.get("CARRIER_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+Decoded = Tuple[np.ndarray, Dict[str, Any]]
+
+_hits = metrics.counter("carrier_cache_hits", "Carrier decodes served from the .npy cache")
+_misses = metrics.counter("carrier_cache_misses", "Carrier decodes that ran the codec")
+_lock = threading.Lock()
+
+
+def _paths(kind: str, key: str) -> Tuple[str, str]:
+    base = os.path.join(CACHE_DIR, f"{kind}-{key}")
+    return f"{base}.npy", f"{base}.json"
+
+
+def _evict(keep: str):
+    """Supprime les entrées les plus anciennes (date d'accès) au-delà de MAX_BYTES."""
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".npy"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        for stale in (path, path[:-4] + ".json"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+def _store(array_path: str, meta_path: str, array: np.ndarray, meta: Dict[str, Any]):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Écriture dans un fichier temporaire puis renommage : jamais de .npy partiel
+    for path, write in (
+        (meta_path, lambda f: f.write(json.dumps(meta).encode())),
+        (array_path, lambda f: np.save(f, array, allow_pickle=False)),
+    ):
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    with _lock:
+        _evict(keep=array_path)
+
+
+def load(kind: str, file_bytes: bytes, decoder: Callable[[bytes], Decoded]) -> Decoded:
+    """
+    Tableau décodé de 'file_bytes' (lecture seule) et ses métadonnées.
+    'decoder' n'est appelé que si ce contenu n'est pas déjà en cache.
+    """
+    key = hashlib.sha256(file_bytes).hexdigest()
+    array_path, meta_path = _paths(kind, key)
+    try:
+        with open(meta_path, "rb") as f:
+            meta = json.loads(f.read())
+        array = np.load(array_path, mmap_mode="r", allow_pickle=False)
+        os.utime(array_path)
+        _hits.inc()
+        return array, meta
+    except (FileNotFoundError, ValueError, OSError):
+        pass
+
+    _misses.inc()
+    array, meta = decoder(file_bytes)
+    if array.nbytes <= MAX_BYTES:
+        try:
+            _store(array_path, meta_path, array, meta)
+        except OSError as e:
+            print(f"Carrier cache write error: {e}")
+    return array, meta
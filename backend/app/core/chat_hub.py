@@ -0,0 +1,143 @@
+# backend/app/core/chat_hub.py
+# Diffusion en temps réel des messages de chat vers les WebSockets connectés.
+#
+# Le hub garde, dans chaque processus, les abonnés locaux de chaque chat (une file
+# bornée par connexion). La publication passe par un 'HubBackend' :
+#  - InMemoryBackend (défaut) : livre directement aux abonnés du processus courant ;
+#  - SharedStateBackend : publie via l'état partagé (core/shared_state.py) ; chaque
+#    worker reçoit toutes les publications et les remet à ses propres abonnés.
+# Le hub utilise le second dès que le lanceur a démarré un broker (plusieurs workers).
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from . import metrics, shared_state
+
+# Messages en attente par connexion ; au-delà, les nouveaux messages sont abandonnés
+SUBSCRIBER_QUEUE_SIZE = 100
+
+connections_gauge = metrics.gauge("chat_ws_connections", "Open chat WebSocket connections")
+published_counter = metrics.counter("chat_hub_published", "Messages published to the chat hub")
+delivered_counter = metrics.counter("chat_hub_delivered", "Messages pushed to a WebSocket")
+dropped_counter = metrics.counter("chat_hub_dropped", "Messages dropped because a subscriber queue was full")
+fanout_latency = metrics.histogram("chat_hub_fanout_seconds", "Time from publish to WebSocket send")
+
+Deliver = Callable[[str, Dict[str, Any]], None]
+
+
+class HubBackend:
+    """Transport des publications entre processus."""
+
+    def start(self, deliver: Deliver):
+        """Enregistre la fonction à appeler pour chaque publication reçue (dans la boucle du hub)."""
+        raise NotImplementedError
+
+    def publish(self, channel: str, payload: Dict[str, Any]):
+        raise NotImplementedError
+
+
+class InMemoryBackend(HubBackend):
+    """Un seul processus : la publication est livrée immédiatement aux abonnés locaux."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    def publish(self, channel: str, payload: Dict[str, Any]):
+        if self._deliver is not None:
+            self._deliver(channel, payload)
+
+
+class SharedStateBackend(HubBackend):
+    """Plusieurs workers : les publications passent par le sujet 'topic' de l'état partagé."""
+
+    def __init__(self, topic: str = "chat"):
+        self._topic = topic
+
+    def start(self, deliver: Deliver):
+        shared_state.get_state().subscribe(self._topic, lambda message: deliver(*message))
+
+    def publish(self, channel: str, payload: Dict[str, Any]):
+        shared_state.get_state().publish(self._topic, (channel, payload))
+
+
+class Subscription:
+    """Une connexion abonnée à un chat : file bornée vidée par la tâche d'envoi du WebSocket."""
+
+    def __init__(self, channel: str, user_id: str):
+        self.channel = channel
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def get(self) -> Dict[str, Any]:
+        """Prochain message ; la latence de diffusion est mesurée à sa remise."""
+        envelope = await self.queue.get()
+        fanout_latency.observe(time.perf_counter() - envelope["published_at"])
+        delivered_counter.inc()
+        return envelope["message"]
+
+
+class ChatHub:
+    def __init__(self, backend: Optional[HubBackend] = None):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._backend: HubBackend = InMemoryBackend()
+        self.set_backend(backend or InMemoryBackend())
+
+    def set_backend(self, backend: HubBackend):
+        self._backend = backend
+        backend.start(self.deliver)
+
+    # --- Abonnements (côté WebSocket, dans la boucle d'événements) ---
+
+    def subscribe(self, channel: str, user_id: str) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(channel, user_id)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        connections_gauge.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            connections_gauge.dec()
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+
+    def connection_count(self, channel: Optional[str] = None) -> int:
+        if channel is not None:
+            return len(self._subscribers.get(channel, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    # --- Publication ---
+
+    def publish(self, channel: str, message: Dict[str, Any]):
+        """Publie un message (appelable depuis la boucle ou depuis un thread)."""
+        published_counter.inc()
+        self._backend.publish(channel, {"message": message, "published_at": time.perf_counter()})
+
+    def deliver(self, channel: str, envelope: Dict[str, Any]):
+        """Remet une publication aux abonnés locaux du chat (appelé par le backend)."""
+        loop = self._loop
+        if loop is None or channel not in self._subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            loop.call_soon_threadsafe(self.deliver, channel, envelope)
+            return
+
+        for subscription in list(self._subscribers.get(channel, ())):
+            try:
+                subscription.queue.put_nowait(envelope)
+            except asyncio.QueueFull:
+                dropped_counter.inc()
+
+
+hub = ChatHub(SharedStateBackend() if shared_state.is_shared() else None)
@@ -0,0 +1,120 @@
+# backend/app/core/columnar.py
+# Format compact (par colonnes) des étapes de visualisation, négocié par l'en-tête
+# Accept. Au lieu d'une liste d'objets répétant les mêmes clés, chaque champ devient
+# une colonne ; les valeurs répétées (matrices, alphabet, chaînes identiques...) sont
+# stockées une seule fois dans le dictionnaire de la colonne.
+#
+# Forme d'une colonne (n = nombre d'étapes) :
+#   {"c": valeur}                      même valeur pour toutes les étapes
+#   {"v": [valeurs]}                   une valeur par étape
+#   {"d": [valeurs distinctes], "i": k}   dictionnaire ; la suite des indices (-1 si le
+#                                        champ est absent) est la k-ième de "indices"
+#   "m": [indices des étapes sans ce champ] (formes "c" / "v" uniquement, si besoin)
+# Les champs liés (ex. lettre, indice, titre de l'étape) ont la même suite d'indices :
+# elle n'est envoyée qu'une fois, dans la table "indices" partagée par les colonnes.
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi.responses import Response
+
+MEDIA_TYPE = "application/vnd.seko.columnar+json"
+FORMAT = "columnar-v1"
+
+_MISSING = object()
+
+
+def wants_columnar(accept: Optional[str]) -> bool:
+    return accept is not None and MEDIA_TYPE in accept
+
+
+def _fingerprint(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _column(values: List[Any], indices: Dict[str, int], index_table: List[List[int]]) -> Dict[str, Any]:
+    missing = [i for i, value in enumerate(values) if value is _MISSING]
+    present = [value for value in values if value is not _MISSING]
+
+    index: Dict[str, int] = {}
+    distinct: List[Any] = []
+    positions: List[int] = []
+    for value in values:
+        if value is _MISSING:
+            positions.append(-1)
+            continue
+        key = _fingerprint(value)
+        position = index.get(key)
+        if position is None:
+            position = index[key] = len(distinct)
+            distinct.append(value)
+        positions.append(position)
+
+    if len(distinct) == 1:
+        column: Dict[str, Any] = {"c": distinct[0]}
+    elif len(distinct) < len(present):
+        key = _fingerprint(positions)
+        reference = indices.get(key)
+        if reference is None:
+            reference = indices[key] = len(index_table)
+            index_table.append(positions)
+        return {"d": distinct, "i": reference}
+    else:
+        column = {"v": [None if value is _MISSING else value for value in values]}
+    if missing:
+        column["m"] = missing
+    return column
+
+
+def encode_steps(steps: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Étapes (dictionnaires {champ..., 'data': {...}}) -> représentation par colonnes."""
+    fields: List[str] = []
+    data_fields: List[str] = []
+    for step in steps:
+        for name in step:
+            if name != "data" and name not in fields:
+                fields.append(name)
+        for name in step["data"]:
+            if name not in data_fields:
+                data_fields.append(name)
+
+    indices: Dict[str, int] = {}
+    index_table: List[List[int]] = []
+    columns = {name: _column([step.get(name, _MISSING) for step in steps], indices, index_table)
+               for name in fields}
+    data = {name: _column([step["data"].get(name, _MISSING) for step in steps], indices, index_table)
+            for name in data_fields}
+    return {"format": FORMAT, "count": len(steps), "indices": index_table, "columns": columns, "data": data}
+
+
+def decode_steps(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse de 'encode_steps' (utilisé par les scripts de vérification)."""
+    count = payload["count"]
+
+    def expand(column: Dict[str, Any]) -> List[Any]:
+        if "d" in column:
+            return [_MISSING if i < 0 else column["d"][i] for i in payload["indices"][column["i"]]]
+        values = [column["c"]] * count if "c" in column else list(column["v"])
+        for i in column.get("m", ()):
+            values[i] = _MISSING
+        return values
+
+    steps: List[Dict[str, Any]] = [{} for _ in range(count)]
+    for name, column in payload["columns"].items():
+        for step, value in zip(steps, expand(column)):
+            if value is not _MISSING:
+                step[name] = value
+    for step in steps:
+        step["data"] = {}
+    for name, column in payload["data"].items():
+        for step, value in zip(steps, expand(column)):
+            if value is not _MISSING:
+                step["data"][name] = value
+    return steps
+
+
+class ColumnarResponse(Response):
+    media_type = MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,66 @@
+# backend/app/core/content_store.py
+# Déduplication des fichiers envoyés vers Supabase Storage par contenu (SHA-256).
+#
+# L'empreinte est calculée pendant la lecture du flux d'upload. Un fichier déjà
+# envoyé par le même utilisateur n'est pas renvoyé : on réutilise son chemin.
+# Le client peut annoncer l'empreinte (en-tête X-Content-SHA256) pour éviter
+# jusqu'à l'envoi du corps. L'index est par utilisateur : annoncer l'empreinte
+# d'un fichier ne donne accès qu'à ses propres fichiers.
+# L'index vit dans l'état partagé (core.shared_state) : un renvoi est reconnu quel
+# que soit le worker qui le reçoit.
+
+import hashlib
+import re
+from typing import AsyncIterator, Optional
+
+from . import metrics
+from .cache import SharedCache
+
+# Durée de vie d'une entrée de l'index (secondes)
+INDEX_TTL = 7 * 24 * 3600
+INDEX_SIZE = 100_000
+
+SHA256_HEADER = "x-content-sha256"
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_index = SharedCache("content_store", max_size=INDEX_SIZE, ttl=INDEX_TTL)
+saved_bytes = metrics.counter("content_store_saved_bytes", "Upload bytes skipped thanks to deduplication")
+
+
+class HashingStream:
+    """Laisse passer un flux d'octets en calculant son SHA-256 et sa taille."""
+
+    def __init__(self, stream: AsyncIterator[bytes]):
+        self._stream = stream
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for data in self._stream:
+            self._digest.update(data)
+            self.size += len(data)
+            yield data
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def parse_sha256(value: Optional[str]) -> Optional[str]:
+    """Empreinte annoncée par le client, ou None si absente / mal formée."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    return value if _SHA256_RE.match(value) else None
+
+
+def lookup(user_id: str, sha256: str) -> Optional[str]:
+    """Chemin (dans le bucket) d'un fichier de même contenu déjà envoyé par l'utilisateur."""
+    return _index.get((user_id, sha256))
+
+
+def remember(user_id: str, sha256: str, file_path: str):
+    _index.set((user_id, sha256), file_path)
+
+
+def record_hit(size: int):
+    saved_bytes.inc(size)
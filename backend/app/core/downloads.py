@@ -0,0 +1,111 @@
+# backend/app/core/downloads.py
+# Fichiers produits par le serveur (ex. résultat d'un encodage stéganographique),
+# servis par référence : un lien court et temporaire plutôt qu'un blob base64 dans
+# la réponse JSON. Chaque fichier est réservé à l'utilisateur qui l'a produit ;
+# le stockage est borné en octets (les plus anciens sont évincés) et en durée.
+#
+# Le contenu est écrit dans DOWNLOAD_DIR (disque commun aux workers) ; seules les
+# métadonnées (propriétaire, type, nom) passent par core.shared_state, si bien que le
+# lien fonctionne quel que soit le worker qui reçoit le téléchargement.
+
+import os
+import secrets
+import tempfile
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from . import metrics, shared_state
+
+TTL_SECONDS = int(os.environ.get("DOWNLOAD_TTL_SECONDS", 600))
+MAX_BYTES = int(os.environ.get("DOWNLOAD_STORE_MAX_BYTES", 256 * 1024 * 1024))
+DOWNLOAD_DIR = os.environ.get("DOWNLOAD_DIR", os.path.join(tempfile.gettempdir(), "seko-downloads"))
+
+_stored_bytes = metrics.gauge("download_store_bytes", "Bytes held by the short-lived download store")
+
+
+class Download(NamedTuple):
+    owner: str
+    path: str
+    media_type: str
+    filename: str
+    expires_at: float  # horloge murale (partagée par les workers)
+
+
+class DownloadStore:
+    def __init__(self, max_bytes: int = MAX_BYTES, ttl: float = TTL_SECONDS, directory: str = DOWNLOAD_DIR,
+                 namespace: str = "downloads"):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = directory
+        self._namespace = namespace
+        self._lock = threading.Lock()
+
+    def _purge(self, incoming: int):
+        """
+        Supprime les fichiers expirés, puis les plus anciens tant que le total (plus
+        'incoming' octets à venir) dépasse max_bytes. Les autres workers font de même :
+        un fichier déjà supprimé est ignoré.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime + self.ttl <= now:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total + incoming <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        _stored_bytes.set(total + incoming)
+
+    def put(self, owner: str, content: bytes, media_type: str, filename: str) -> str:
+        """Enregistre un fichier et retourne son jeton (imprévisible)."""
+        if len(content) > self.max_bytes:
+            raise ValueError("The generated file is too large to be kept for download.")
+        token = secrets.token_urlsafe(24)
+        path = os.path.join(self.directory, token)
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._purge(len(content))
+        # Écriture dans un fichier temporaire puis renommage : jamais de fichier partiel
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        # Tuple simple : le broker n'a pas à importer ce module pour le désérialiser
+        item = (owner, path, media_type, filename, time.time() + self.ttl)
+        shared_state.get_state().set(self._namespace, token, item, self.ttl)
+        return token
+
+    def get(self, token: str, owner: str) -> Optional[Download]:
+        """Fichier du jeton s'il appartient à 'owner' et n'a pas été évincé du disque."""
+        item = shared_state.get_state().get(self._namespace, token)
+        if item is None:
+            return None
+        item = Download(*item)
+        if item.owner != owner or not os.path.exists(item.path):
+            return None
+        return item
+
+
+store = DownloadStore()
@@ -0,0 +1,29 @@
+# backend/app/core/http_client.py
+# Client HTTP asynchrone partagé (pool de connexions réutilisé entre les requêtes).
+# Ouvert au démarrage de l'application et fermé à l'arrêt (voir main.py) ; les
+# appels ponctuels (vérification CAPTCHA) passent un délai plus court par requête.
+
+from typing import Optional
+
+import httpx
+
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+# Connexions inactives gardées 60 s (5 s par défaut) : les connexions, espacées,
+# réutilisent encore la connexion TLS au vérificateur CAPTCHA
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS)
+    return _client
+
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
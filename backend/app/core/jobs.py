@@ -0,0 +1,158 @@
+# backend/app/core/jobs.py
+# Minimal registry for long-running background jobs (cryptanalysis).
+# A job runs in a daemon thread of the worker that accepted it; the function
+# receives a 'progress(done, total)' callback and its return value becomes the
+# job result. Job records live in core.shared_state, so any worker can answer a
+# poll; finished jobs are forgotten after JOB_TTL_SECONDS.
+#
+# At most MAX_JOBS jobs run at once across all workers. Each running job holds a
+# leased slot (shared_state.acquire) that a heartbeat thread renews; if its worker
+# dies, the slot and the running record expire after RUNNING_TTL_SECONDS.
+
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from . import shared_state
+
+JOB_TTL_SECONDS = 3600
+# Each job may run its own process pool (one process per CPU): more concurrent jobs
+# than CPUs only makes all of them slower. The cap is shared by all workers.
+MAX_JOBS = int(os.environ.get("MAX_JOBS", os.cpu_count() or 1))
+# Lease of a running job (slot and record), renewed every HEARTBEAT_SECONDS
+RUNNING_TTL_SECONDS = 30
+HEARTBEAT_SECONDS = 10
+
+_NAMESPACE = "jobs"
+_SLOTS = "jobs:slots"
+
+# Jobs running in this process -> True if they have a record to keep alive
+_local: Dict[str, bool] = {}
+_local_lock = threading.Lock()
+_heartbeat: Optional[threading.Thread] = None
+
+class Job:
+    def __init__(self, kind: str, job_id: Optional[str] = None):
+        self.id = job_id or str(uuid.uuid4())
+        self.kind = kind
+        self.status = "pending"  # pending -> running -> done | failed
+        self.done = 0
+        self.total = 0
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @classmethod
+    def from_record(cls, job_id: str, record: Dict[str, Any]) -> "Job":
+        job = cls(record["kind"], job_id)
+        for field, value in record.items():
+            setattr(job, field, value)
+        return job
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.done / self.total, 4) if self.total else 0.0,
+            "done": self.done,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+
+
+def _beat():
+    state = shared_state.get_state()
+    while True:
+        time.sleep(HEARTBEAT_SECONDS)
+        # The lock is held while renewing: once _release returns, no heartbeat can
+        # bring a finished record's TTL back down to RUNNING_TTL_SECONDS
+        with _local_lock:
+            for job_id, has_record in _local.items():
+                try:
+                    state.set(_SLOTS, job_id, True, RUNNING_TTL_SECONDS)
+                    if has_record:
+                        state.update(_NAMESPACE, job_id, ttl=RUNNING_TTL_SECONDS)
+                except Exception as e:
+                    print(f"Job heartbeat error: {e!r}")
+
+
+def _acquire(job_id: str, has_record: bool):
+    global _heartbeat
+    if not shared_state.get_state().acquire(_SLOTS, job_id, MAX_JOBS, RUNNING_TTL_SECONDS):
+        raise RuntimeError("Too many jobs are running. Please try again later.")
+    with _local_lock:
+        _local[job_id] = has_record
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_beat, name="job-heartbeat", daemon=True)
+            _heartbeat.start()
+
+
+def _release(job_id: str):
+    with _local_lock:
+        _local.pop(job_id, None)
+    shared_state.get_state().delete(_SLOTS, job_id)
+
+
+def submit(kind: str, func: Callable[..., Any], *args, **kwargs) -> Job:
+    """Starts 'func(*args, progress=..., **kwargs)' in the background and returns its Job."""
+    state = shared_state.get_state()
+    job = Job(kind)
+    _acquire(job.id, has_record=True)
+    state.set(_NAMESPACE, job.id, job.record(), RUNNING_TTL_SECONDS)
+
+    def progress(done: int, total: int):
+        state.update(_NAMESPACE, job.id, values={"done": done, "total": total}, ttl=RUNNING_TTL_SECONDS)
+
+    def run():
+        state.update(_NAMESPACE, job.id, values={"status": "running"}, ttl=RUNNING_TTL_SECONDS)
+        try:
+            outcome = {"result": func(*args, progress=progress, **kwargs), "status": "done"}
+        except Exception as e:
+            outcome = {"error": str(e), "status": "failed"}
+        finally:
+            _release(job.id)
+        outcome["finished_at"] = time.time()
+        state.update(_NAMESPACE, job.id, values=outcome, ttl=JOB_TTL_SECONDS)
+
+    threading.Thread(target=run, name=f"job-{kind}-{job.id[:8]}", daemon=True).start()
+    return job
+
+
+def run(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Runs 'func(*args, **kwargs)' in the calling thread, holding a job slot: for
+    synchronous endpoints that are as heavy as a job. Raises RuntimeError if all
+    slots are taken.
+    """
+    job_id = str(uuid.uuid4())
+    _acquire(job_id, has_record=False)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _release(job_id)
+
+
+def get(job_id: str) -> Optional[Job]:
+    record = shared_state.get_state().get(_NAMESPACE, job_id)
+    # A record without 'kind' was recreated empty by a late update after expiring
+    if not record or "kind" not in record:
+        return None
+    return Job.from_record(job_id, record)
@@ -0,0 +1,67 @@
+# backend/app/core/lazy.py
+# Import différé des modules lourds (numpy, scipy, PIL...) utilisés par quelques
+# routers seulement. 'lazy_import' retourne un substitut du module : l'import réel a
+# lieu au premier accès à un attribut, et non au démarrage du processus. 'warm_up'
+# charge ensuite tous les modules différés en arrière-plan (voir main.py), pour que
+# le démarrage à froid réponde au plus vite sans pénaliser les requêtes suivantes.
+
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Callable, List, Optional
+
+from . import metrics
+
+_lock = threading.RLock()
+_modules: List["LazyModule"] = []
+
+warm_up_ms = metrics.gauge("lazy_warm_up_ms", "Time spent loading deferred modules in the background (ms)")
+
+
+class LazyModule:
+    def __init__(self, name: str, package: Optional[str] = None):
+        self._lazy_name = name
+        self._lazy_package = package
+        self._lazy_module: Optional[ModuleType] = None
+
+    def _lazy_load(self) -> ModuleType:
+        module = self._lazy_module
+        if module is None:
+            # Verrou réentrant commun : un module différé peut en importer un autre
+            with _lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self._lazy_name, self._lazy_package)
+                module = self._lazy_module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._lazy_load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module '{self._lazy_name}' ({state})>"
+
+
+def lazy_import(name: str, package: Optional[str] = None) -> LazyModule:
+    """Comme importlib.import_module(name, package), mais au premier usage."""
+    module = LazyModule(name, package)
+    with _lock:
+        _modules.append(module)
+    return module
+
+
+def warm_up(*extra: Callable[[], object]):
+    """Charge tous les modules différés puis appelle 'extra' (ex. construction de clients)."""
+    start = time.perf_counter()
+    for module in list(_modules):
+        try:
+            module._lazy_load()
+        except Exception as e:
+            print(f"Deferred import of '{module._lazy_name}' failed: {e}")
+    for load in extra:
+        try:
+            load()
+        except Exception as e:
+            print(f"Warm-up step failed: {e}")
+    warm_up_ms.set(round((time.perf_counter() - start) * 1000))
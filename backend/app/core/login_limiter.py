@@ -0,0 +1,229 @@
+# backend/app/core/login_limiter.py
+# Limitation des tentatives de connexion, tenue dans l'état partagé (core/shared_state.py :
+# en mémoire avec un seul worker, dans le broker avec plusieurs).
+#
+#  - seaux à jetons par adresse IP (avant toute requête : CAPTCHA, base) et par nom
+#    d'utilisateur (seulement après un CAPTCHA valide, sans quoi un client anonyme
+#    pourrait bloquer n'importe quel compte) ; un seau redevenu plein expire de lui-même ;
+#  - état de verrouillage (échecs consécutifs, fin du verrouillage) par utilisateur :
+#    chargé depuis la table 'users' à la première connexion, puis tenu à jour ici ;
+#    une tentative sur un compte verrouillé est refusée sans lire la base ;
+#  - persistance différée (write-behind) : les comptes modifiés sont notés dans une
+#    file partagée, vidée par lots toutes les FLUSH_INTERVAL_SECONDS par le premier
+#    worker qui la relève (et à l'arrêt, voir main.py). Plusieurs échecs d'un même
+#    compte entre deux vidages ne donnent qu'une écriture, et les comptes ayant le
+#    même nouvel état partagent un seul UPDATE.
+
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from . import metrics, shared_state
+
+# Seau par nom d'utilisateur : rafale tolérée et recharge (tentatives par minute)
+USERNAME_BURST = int(os.environ.get("LOGIN_USERNAME_BURST", 10))
+USERNAME_PER_MINUTE = float(os.environ.get("LOGIN_USERNAME_PER_MINUTE", 5))
+# Seau par adresse IP
+IP_BURST = int(os.environ.get("LOGIN_IP_BURST", 30))
+IP_PER_MINUTE = float(os.environ.get("LOGIN_IP_PER_MINUTE", 30))
+# Écriture différée de l'état de verrouillage
+FLUSH_INTERVAL_SECONDS = float(os.environ.get("LOGIN_FLUSH_INTERVAL_SECONDS", 2.0))
+FLUSH_BATCH_SIZE = 500          # vidage anticipé au-delà de ce nombre de comptes notés
+UPDATE_CHUNK_SIZE = 100         # identifiants par UPDATE ... WHERE id IN (...)
+# Un état inactif depuis cette durée est oublié : il sera relu en base
+STATE_IDLE_SECONDS = 900
+
+# Espaces de noms dans l'état partagé
+USERNAME_BUCKETS = "login:username"
+IP_BUCKETS = "login:ip"
+LOCKOUTS = "login:lockout"      # username -> {"user_id", "attempts", "until" (epoch, 0 = libre)}
+PENDING = "login:pending"       # user_id -> username, en attente d'écriture
+
+Pending = Tuple[int, Optional[str]]  # (failed_login_attempts, lockout_until ISO)
+
+
+def lockout_duration(attempts: int) -> int:
+    """Durée du verrouillage (secondes) après 'attempts' échecs consécutifs."""
+    if attempts == 1:
+        return 30
+    if attempts == 2:
+        return 60
+    return 300
+
+
+def _parse_lockout(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _remaining(record: Optional[dict]) -> int:
+    remaining = (record or {}).get("until", 0.0) - time.time()
+    return math.ceil(remaining) if remaining > 0 else 0
+
+
+class LoginLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._noted = 0  # comptes notés par ce worker depuis son dernier vidage
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+        self._throttled = metrics.counter("login_throttled", "Login attempts rejected by the username / IP token buckets")
+        self._locked = metrics.counter("login_locked_out", "Login attempts rejected by an active lockout")
+        self._failures = metrics.counter("login_failures", "Wrong passwords")
+        self._writes = metrics.counter("login_lockout_db_writes", "UPDATE requests issued to persist lockout state")
+        self._rows = metrics.counter("login_lockout_rows_persisted", "Lockout states written to the users table")
+        self._tracked = metrics.gauge("login_limiter_tracked", "Lockout states held in the shared state")
+
+    # --- Vérifications (avant toute requête externe) ---
+
+    def throttle_ip(self, client_ip: Optional[str]) -> int:
+        """Consomme un jeton pour l'IP ; retourne l'attente (secondes), 0 si acceptée."""
+        if not client_ip:
+            return 0
+        return self._take(IP_BUCKETS, client_ip, IP_BURST, IP_PER_MINUTE)
+
+    def throttle_username(self, username: str) -> int:
+        """Consomme un jeton pour le compte (à appeler après un CAPTCHA valide)."""
+        return self._take(USERNAME_BUCKETS, username, USERNAME_BURST, USERNAME_PER_MINUTE)
+
+    def _take(self, namespace: str, key: str, burst: int, per_minute: float) -> int:
+        wait = shared_state.get_state().take_token(namespace, key, burst, per_minute / 60.0)
+        if wait:
+            self._throttled.inc()
+        return math.ceil(wait)
+
+    def locked_for(self, username: str) -> int:
+        """Secondes de verrouillage restantes d'après l'état partagé (0 si inconnu ou libre)."""
+        remaining = _remaining(shared_state.get_state().get(LOCKOUTS, username))
+        if remaining:
+            self._locked.inc()
+        return remaining
+
+    def remember(self, username: str, user_data: dict) -> int:
+        """
+        Complète l'état avec la ligne lue en base si ce compte n'est pas encore suivi
+        (l'état partagé, plus récent que la base tant qu'il n'est pas écrit, prime).
+        Retourne les secondes de verrouillage restantes.
+        """
+        state = shared_state.get_state()
+        seeded = {
+            "user_id": str(user_data["id"]),
+            "attempts": user_data.get("failed_login_attempts") or 0,
+            "until": _parse_lockout(user_data.get("lockout_until")),
+        }
+        record = state.setdefault(LOCKOUTS, username, seeded, STATE_IDLE_SECONDS)
+        if record["user_id"] != seeded["user_id"]:
+            # Compte supprimé puis recréé sous le même nom
+            record = seeded
+            state.set(LOCKOUTS, username, record, STATE_IDLE_SECONDS)
+        remaining = _remaining(record)
+        if remaining:
+            self._locked.inc()
+        return remaining
+
+    # --- Résultat de la tentative ---
+
+    def record_failure(self, username: str) -> int:
+        """Mauvais mot de passe (après 'remember') : verrouille le compte et retourne la durée."""
+        state = shared_state.get_state()
+        record = state.update(LOCKOUTS, username, increments={"attempts": 1}, ttl=STATE_IDLE_SECONDS)
+        duration = lockout_duration(record["attempts"])
+        # Arrondi à la seconde : les comptes verrouillés au même moment partagent un UPDATE
+        until = float(math.ceil(time.time() + duration))
+        state.update(LOCKOUTS, username, maximums={"until": until}, ttl=STATE_IDLE_SECONDS)
+        self._note(record["user_id"], username)
+        self._failures.inc()
+        return duration
+
+    def record_success(self, username: str):
+        """Connexion réussie : remet le compteur à zéro (écrit seulement s'il ne l'était pas)."""
+        state = shared_state.get_state()
+        record = state.get(LOCKOUTS, username)
+        if record is None or (record["attempts"] == 0 and not record["until"]):
+            return
+        state.update(LOCKOUTS, username, values={"attempts": 0, "until": 0.0}, ttl=STATE_IDLE_SECONDS)
+        self._note(record["user_id"], username)
+
+    # --- Écriture différée ---
+
+    def _note(self, user_id: str, username: str):
+        shared_state.get_state().set(PENDING, user_id, username)
+        with self._lock:
+            self._noted += 1
+            noted = self._noted
+            if self._flusher is None and not self._closed:
+                self._flusher = threading.Thread(target=self._run, name="login-limiter-flush", daemon=True)
+                self._flusher.start()
+        if noted >= FLUSH_BATCH_SIZE:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Écrit l'état actuel des comptes notés, regroupés par valeur ; retourne le nombre de comptes écrits."""
+        from .supabase_client import supabase
+
+        state = shared_state.get_state()
+        with self._lock:
+            self._noted = 0
+        pending = state.pop_all(PENDING)
+        self._tracked.set(state.size(LOCKOUTS))
+        if not pending:
+            return 0
+
+        records = state.get_many(LOCKOUTS, set(pending.values()))
+        groups: Dict[Pending, List[str]] = {}
+        for user_id, username in pending.items():
+            record = records.get(username)
+            if record is None or record["user_id"] != user_id:
+                continue
+            until = record["until"]
+            lockout_until = datetime.fromtimestamp(until, timezone.utc).isoformat() if until else None
+            groups.setdefault((record["attempts"], lockout_until), []).append(user_id)
+
+        written = 0
+        for (attempts, lockout_until), user_ids in groups.items():
+            for start in range(0, len(user_ids), UPDATE_CHUNK_SIZE):
+                chunk = user_ids[start:start + UPDATE_CHUNK_SIZE]
+                try:
+                    supabase.table("users").update({
+                        "failed_login_attempts": attempts,
+                        "lockout_until": lockout_until
+                    }).in_("id", chunk).execute()
+                    written += len(chunk)
+                except Exception as e:
+                    print(f"Failed to persist lockout state: {e}")
+                    # Nouvel essai au prochain vidage (avec l'état le plus récent)
+                    for user_id in chunk:
+                        state.setdefault(PENDING, user_id, pending[user_id])
+                self._writes.inc()
+        self._rows.inc(written)
+        return written
+
+    def close(self):
+        """Arrête le thread et écrit ce qui reste (appelé à l'arrêt de chaque worker)."""
+        self._closed = True
+        self._wake.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=FLUSH_INTERVAL_SECONDS + 5)
+            self._flusher = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Failed to flush lockout state on shutdown: {e}")
+
+
+limiter = LoginLimiter()
@@ -0,0 +1,147 @@
+# backend/app/core/metrics.py
+# Compteurs, jauges et histogrammes en mémoire, exposés par GET /metrics.
+# Volontairement minimal : chaque processus tient ses propres valeurs.
+
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# Bornes par défaut des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_metrics: Dict[str, "Metric"] = {}
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict:
+        return {"type": self.kind, "description": self.description, "value": self.value}
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: int = 1):
+        self.inc(-amount)
+
+    def set(self, value: int):
+        with self._lock:
+            self.value = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # dernière case : au-delà de la plus grande borne
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Borne supérieure du bucket contenant le quantile 'q' (approximation)."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = q * self.count
+            seen = 0
+            for bound, n in zip(self.buckets, self.counts):
+                seen += n
+                if seen >= target:
+                    return bound
+            return self.max
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            buckets = {f"le_{bound}": n for bound, n in zip(self.buckets, self.counts)}
+            buckets["le_inf"] = self.counts[-1]
+            count, total, maximum = self.count, self.sum, self.max
+        return {
+            "type": self.kind,
+            "description": self.description,
+            "count": count,
+            "sum": round(total, 6),
+            "avg": round(total / count, 6) if count else None,
+            "max": round(maximum, 6),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class Ratio(Metric):
+    """Part d'un compteur dans le total de deux compteurs (ex. taux de hits d'un cache)."""
+    kind = "ratio"
+
+    def __init__(self, name: str, description: str, part: Counter, other: Counter):
+        super().__init__(name, description)
+        self.part = part
+        self.other = other
+
+    def snapshot(self) -> Dict:
+        part, total = self.part.value, self.part.value + self.other.value
+        return {"type": self.kind, "description": self.description,
+                "value": round(part / total, 4) if total else None}
+
+
+def _register(metric_class, name: str, description: str, **kwargs) -> Metric:
+    """Retourne la métrique existante de ce nom, ou la crée (idempotent au rechargement)."""
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = metric_class(name, description, **kwargs)
+            _metrics[name] = metric
+        return metric
+
+
+def counter(name: str, description: str = "") -> Counter:
+    return _register(Counter, name, description)
+
+
+def gauge(name: str, description: str = "") -> Gauge:
+    return _register(Gauge, name, description)
+
+
+def histogram(name: str, description: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, description, buckets=buckets)
+
+
+def ratio(name: str, description: str, part: Counter, other: Counter) -> Ratio:
+    return _register(Ratio, name, description, part=part, other=other)
+
+
+def snapshot(prefix: Optional[str] = None) -> Dict[str, Dict]:
+    with _lock:
+        metrics: List[Metric] = sorted(_metrics.values(), key=lambda m: m.name)
+    return {m.name: m.snapshot() for m in metrics if prefix is None or m.name.startswith(prefix)}
@@ -0,0 +1,67 @@
+# backend/app/core/responses.py
+# Classes de réponse partagées par les routers.
+#
+# Sérialisation JSON rapide : orjson s'il est installé (dépendance optionnelle), sinon
+# pydantic_core.to_json ; les deux écrivent directement les modèles 'schemas.*',
+# UUID et dates, sans passer par jsonable_encoder + json.dumps.
+
+from typing import Any
+
+import pydantic_core
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+    # Clés non textuelles (comme json.dumps) et tableaux numpy acceptés
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Types inconnus d'orjson (modèles Pydantic, Decimal...) : forme JSON de pydantic_core."""
+    return pydantic_core.to_jsonable_python(value)
+
+
+def dumps(value: Any) -> bytes:
+    """Objet Python (dict, liste, modèle Pydantic...) -> JSON compact UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+    return pydantic_core.to_json(value)
+
+
+def loads(data: Any) -> Any:
+    """JSON (bytes ou str) -> objet Python, ex. loads(response.content) pour une réponse httpx."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return pydantic_core.from_json(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON par défaut de l'application (voir main.py). Retournée directement par
+    un endpoint, elle évite aussi la re-validation par 'response_model' : à réserver
+    aux données déjà conformes au schéma (lignes lues dans la base).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse dont le générateur lit lui-même le corps de la requête
+    (request.stream()) pendant que la réponse est envoyée.
+
+    Pour les serveurs ASGI < 2.4 (uvicorn), StreamingResponse écoute 'receive()' en
+    parallèle pour détecter la déconnexion du client et consommerait alors les
+    morceaux du corps destinés au générateur. Ici, seul le générateur lit 'receive()' :
+    une déconnexion est signalée par request.stream() (ClientDisconnect) ou par
+    l'échec de l'envoi.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,393 @@
+# backend/app/core/shared_state.py
+# État partagé entre les workers : caches, limiteurs de débit, files d'écriture
+# différée, pub/sub (hub de chat) et registre des écouteurs MiTM.
+#
+#  - MemoryState : tout dans le processus courant (un seul worker, défaut) ;
+#  - BrokerState : client d'un broker local (multiprocessing.managers sur un socket
+#    Unix) qui héberge un unique MemoryState. Chaque opération est un aller-retour
+#    sur le socket et reste atomique puisqu'elle s'exécute dans le broker.
+# Le lanceur (app/serve.py) démarre le broker quand il lance plusieurs workers et
+# transmet son adresse par SHARED_STATE_ADDRESS / SHARED_STATE_AUTHKEY.
+#
+# Les valeurs doivent pouvoir passer par pickle. Les expirations suivent l'horloge
+# du processus qui détient les données (le broker en mode partagé).
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Écritures entre deux purges complètes des entrées expirées
+SWEEP_EVERY = 1000
+# Messages en attente par abonné distant (les plus anciens sont abandonnés au-delà)
+SUBSCRIBER_QUEUE_SIZE = 10000
+# File d'un abonné distant oubliée s'il ne l'a pas relevée depuis cette durée
+SUBSCRIBER_TIMEOUT_SECONDS = 60
+# Attente maximale d'une relève (les abonnés relancent aussitôt)
+POLL_TIMEOUT_SECONDS = 5.0
+
+Callback = Callable[[Any], None]
+_MISSING = object()
+
+
+class MemoryState:
+    """Espaces de noms clé -> valeur (LRU, expiration), opérations atomiques et pub/sub."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        # espace -> clé -> (expiration ou None, valeur), du moins au plus récemment utilisé
+        self._spaces: Dict[str, "OrderedDict[Hashable, Tuple[Optional[float], Any]]"] = {}
+        self._writes = 0
+        self._callbacks: Dict[str, List[Callback]] = {}
+        # abonné distant -> (sujets, messages en attente, dernière relève)
+        self._queues: Dict[str, Tuple[Set[str], Deque[Tuple[str, Any]], float]] = {}
+
+    # --- Interne (verrou tenu) ---
+
+    def _entry(self, namespace: str, key: Hashable, now: float):
+        space = self._spaces.get(namespace)
+        if space is None:
+            return _MISSING
+        entry = space.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        if entry[0] is not None and entry[0] <= now:
+            del space[key]
+            return _MISSING
+        space.move_to_end(key)
+        return entry[1]
+
+    def _put(self, namespace: str, key: Hashable, value: Any, ttl: Optional[float], now: float,
+             max_size: Optional[int] = None):
+        space = self._spaces.get(namespace)
+        if space is None:
+            space = self._spaces[namespace] = OrderedDict()
+        space[key] = (now + ttl if ttl is not None else None, value)
+        space.move_to_end(key)
+        if max_size is not None:
+            while len(space) > max_size:
+                space.popitem(last=False)
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            self._sweep(now)
+
+    def _sweep(self, now: float):
+        for space in self._spaces.values():
+            expired = [key for key, (expires_at, _) in space.items() if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del space[key]
+
+    # --- Clé / valeur ---
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._entry(namespace, key, time.monotonic())
+        return default if value is _MISSING else value
+
+    def get_many(self, namespace: str, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Valeurs présentes (et non expirées) parmi 'keys'."""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._entry(namespace, key, now)
+                if value is not _MISSING:
+                    found[key] = value
+        return found
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: Optional[float] = None,
+            max_size: Optional[int] = None):
+        """Enregistre 'value' ; au-delà de 'max_size' entrées, les moins récemment utilisées sont évincées."""
+        with self._lock:
+            self._put(namespace, key, value, ttl, time.monotonic(), max_size)
+
+    def setdefault(self, namespace: str, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        """Valeur actuelle, ou 'value' si la clé est absente ; l'expiration repart dans les deux cas."""
+        now = time.monotonic()
+        with self._lock:
+            current = self._entry(namespace, key, now)
+            if current is not _MISSING:
+                value = current
+            self._put(namespace, key, value, ttl, now)
+        return value
+
+    def delete(self, namespace: str, *keys: Hashable):
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is not None:
+                for key in keys:
+                    space.pop(key, None)
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._spaces.pop(namespace, None)
+
+    def pop_all(self, namespace: str) -> Dict[Hashable, Any]:
+        """Retire et retourne toutes les entrées vivantes de l'espace (vidage d'une file d'écriture)."""
+        now = time.monotonic()
+        with self._lock:
+            space = self._spaces.pop(namespace, None) or {}
+        return {key: value for key, (expires_at, value) in space.items() if expires_at is None or expires_at > now}
+
+    def size(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._spaces.get(namespace, ()))
+
+    # --- Opérations atomiques ---
+
+    def update(self, namespace: str, key: Hashable, values: Optional[Dict[str, Any]] = None,
+               increments: Optional[Dict[str, float]] = None, maximums: Optional[Dict[str, float]] = None,
+               ttl: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Modifie les champs d'un enregistrement (dictionnaire, créé vide si absent) en une
+        seule opération : affectations, puis incréments, puis maximums. Retourne le résultat.
+        """
+        now = time.monotonic()
+        with self._lock:
+            record = self._entry(namespace, key, now)
+            record = {} if record is _MISSING else dict(record)
+            record.update(values or {})
+            for field, amount in (increments or {}).items():
+                record[field] = record.get(field, 0) + amount
+            for field, value in (maximums or {}).items():
+                record[field] = max(record.get(field, value), value)
+            self._put(namespace, key, record, ttl, now)
+        return record
+
+    def take_token(self, namespace: str, key: Hashable, capacity: float, per_second: float) -> float:
+        """
+        Seau à jetons : consomme un jeton et retourne 0, ou retourne l'attente (secondes)
+        avant le prochain jeton. Un seau redevenu plein expire (équivalent à une clé absente).
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._entry(namespace, key, now)
+            tokens, updated = (capacity, now) if bucket is _MISSING else bucket
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            wait = 0.0
+            if tokens < 1.0:
+                wait = (1.0 - tokens) / per_second
+            else:
+                tokens -= 1.0
+            self._put(namespace, key, (tokens, now), (capacity - tokens) / per_second, now)
+        return wait
+
+    def acquire(self, namespace: str, key: Hashable, limit: int, ttl: float) -> bool:
+        """
+        Prend une place parmi 'limit' (sémaphore à baux) : les entrées expirées de l'espace
+        sont d'abord purgées. Le détenteur renouvelle son bail avec set(..., ttl) et le
+        rend avec delete ; un détenteur disparu libère sa place à l'expiration.
+        """
+        now = time.monotonic()
+        with self._lock:
+            space = self._spaces.get(namespace)
+            if space is not None:
+                for held in [k for k, (expires_at, _) in space.items() if expires_at is not None and expires_at <= now]:
+                    del space[held]
+                if key not in space and len(space) >= limit:
+                    return False
+            self._put(namespace, key, True, ttl, now)
+        return True
+
+    # --- Pub/sub ---
+
+    def publish(self, topic: str, message: Any):
+        """Remet 'message' aux abonnés locaux du sujet et aux files des abonnés distants."""
+        now = time.monotonic()
+        with self._lock:
+            callbacks = list(self._callbacks.get(topic, ()))
+            stale = []
+            for subscriber, (topics, queue, seen_at) in self._queues.items():
+                if now - seen_at > SUBSCRIBER_TIMEOUT_SECONDS:
+                    stale.append(subscriber)
+                elif topic in topics:
+                    queue.append((topic, message))
+            for subscriber in stale:
+                del self._queues[subscriber]
+            self._ready.notify_all()
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, topic: str, callback: Callback):
+        """Appelle 'callback(message)' à chaque publication sur 'topic' (dans ce processus)."""
+        with self._lock:
+            self._callbacks.setdefault(topic, []).append(callback)
+
+    def open_queue(self, subscriber: str, topics: List[str]):
+        """Crée (ou met à jour) la file d'un abonné d'un autre processus."""
+        with self._lock:
+            current = self._queues.get(subscriber)
+            queue = current[1] if current else deque(maxlen=SUBSCRIBER_QUEUE_SIZE)
+            self._queues[subscriber] = (set(topics), queue, time.monotonic())
+
+    def poll(self, subscriber: str, timeout: float = POLL_TIMEOUT_SECONDS) -> Optional[List[Tuple[str, Any]]]:
+        """Messages en attente pour l'abonné (attend jusqu'à 'timeout') ; None si la file n'existe plus."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                current = self._queues.get(subscriber)
+                if current is None:
+                    return None
+                topics, queue, _ = current
+                remaining = deadline - time.monotonic()
+                if queue or remaining <= 0:
+                    messages = list(queue)
+                    queue.clear()
+                    self._queues[subscriber] = (topics, queue, time.monotonic())
+                    return messages
+                self._ready.wait(remaining)
+
+
+# --- Broker (plusieurs workers) ---
+
+class _BrokerManager(BaseManager):
+    pass
+
+
+_BrokerManager.register("state")
+
+
+class BrokerState:
+    """Même interface que MemoryState ; les données vivent dans le broker."""
+
+    def __init__(self, address: str, authkey: bytes):
+        manager = _BrokerManager(address=address, authkey=authkey)
+        manager.connect()
+        # Le proxy ouvre une connexion par thread appelant
+        self._remote = manager.state()
+        self._subscriber = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._callbacks: Dict[str, List[Callback]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def get(self, namespace, key, default=None):
+        # 'default' reste local (une sentinelle ne survivrait pas à pickle)
+        found = self._remote.get_many(namespace, [key])
+        return found[key] if key in found else default
+
+    def get_many(self, namespace, keys):
+        return self._remote.get_many(namespace, list(keys))
+
+    def set(self, namespace, key, value, ttl=None, max_size=None):
+        self._remote.set(namespace, key, value, ttl, max_size)
+
+    def setdefault(self, namespace, key, value, ttl=None):
+        return self._remote.setdefault(namespace, key, value, ttl)
+
+    def delete(self, namespace, *keys):
+        self._remote.delete(namespace, *keys)
+
+    def clear(self, namespace):
+        self._remote.clear(namespace)
+
+    def pop_all(self, namespace):
+        return self._remote.pop_all(namespace)
+
+    def size(self, namespace):
+        return self._remote.size(namespace)
+
+    def update(self, namespace, key, values=None, increments=None, maximums=None, ttl=None):
+        return self._remote.update(namespace, key, values, increments, maximums, ttl)
+
+    def take_token(self, namespace, key, capacity, per_second):
+        return self._remote.take_token(namespace, key, capacity, per_second)
+
+    def acquire(self, namespace, key, limit, ttl):
+        return self._remote.acquire(namespace, key, limit, ttl)
+
+    def publish(self, topic, message):
+        self._remote.publish(topic, message)
+
+    def subscribe(self, topic: str, callback: Callback):
+        """Comme MemoryState.subscribe : un thread relève la file de ce processus dans le broker."""
+        with self._lock:
+            self._callbacks.setdefault(topic, []).append(callback)
+            self._remote.open_queue(self._subscriber, list(self._callbacks))
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="shared-state-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                messages = self._remote.poll(self._subscriber, POLL_TIMEOUT_SECONDS)
+                if messages is None:
+                    # File oubliée par le broker (processus resté muet trop longtemps)
+                    with self._lock:
+                        self._remote.open_queue(self._subscriber, list(self._callbacks))
+                    continue
+            except Exception as e:
+                print(f"Shared state listener error: {e!r}")
+                time.sleep(1.0)
+                continue
+            for topic, message in messages:
+                for callback in list(self._callbacks.get(topic, ())):
+                    try:
+                        callback(message)
+                    except Exception as e:
+                        print(f"Shared state subscriber error: {e}")
+
+
+def serve_broker(address: str, authkey: bytes):
+    """Point d'entrée du processus broker (voir app/serve.py)."""
+    import signal
+
+    # Ctrl+C / SIGINT vise tout le groupe : le broker doit survivre à l'arrêt des
+    # workers (dernier vidage des écritures différées) ; le lanceur le termine ensuite.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    state = MemoryState()
+
+    class _ServerManager(BaseManager):
+        pass
+
+    _ServerManager.register("state", callable=lambda: state)
+    _ServerManager(address=address, authkey=authkey).get_server().serve_forever()
+
+
+def start_broker(address: str, authkey: bytes, timeout: float = 10.0):
+    """Démarre le broker dans un processus fils et attend qu'il accepte les connexions."""
+    import multiprocessing
+
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_broker, args=(address, authkey), name="shared-state-broker", daemon=True
+    )
+    process.start()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            BrokerState(address, authkey)
+            return process
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline or not process.is_alive():
+                process.terminate()
+                raise RuntimeError(f"Shared state broker did not start on {address}")
+            time.sleep(0.05)
+
+
+# --- Instance du processus ---
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def is_shared() -> bool:
+    """Vrai si ce processus est un worker parmi d'autres (broker configuré)."""
+    return bool(os.environ.get("SHARED_STATE_ADDRESS"))
+
+
+def get_state():
+    """MemoryState, ou BrokerState si le lanceur a démarré un broker."""
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                address = os.environ.get("SHARED_STATE_ADDRESS")
+                if address:
+                    _state = BrokerState(address, bytes.fromhex(os.environ["SHARED_STATE_AUTHKEY"]))
+                else:
+                    _state = MemoryState()
+    return _state
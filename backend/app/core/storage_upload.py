@@ -0,0 +1,295 @@
+# backend/app/core/storage_upload.py
+# Envoi en flux des fichiers vers Supabase Storage.
+#
+# Le corps multipart de la requête est lu morceau par morceau (python-multipart) et
+# transmis au fur et à mesure, sans jamais charger le fichier entier en mémoire :
+#  - petits fichiers : un POST /object/{bucket}/{chemin} avec un corps en flux ;
+#  - gros fichiers : upload résumable TUS (/upload/resumable), en morceaux de
+#    STORAGE_UPLOAD_CHUNK_SIZE octets. Un morceau qui échoue est repris à l'offset
+#    annoncé par le serveur (HEAD), le morceau suivant étant lu pendant l'envoi.
+# STORAGE_UPLOAD_CONCURRENCY borne le nombre d'envois simultanés vers le stockage.
+
+import asyncio
+import base64
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from . import metrics
+from .http_client import get_async_client
+
+MB = 1024 * 1024
+
+# Supabase impose des morceaux de 6 Mo exactement (sauf le dernier) pour TUS
+CHUNK_SIZE = int(os.environ.get("STORAGE_UPLOAD_CHUNK_SIZE", 6 * MB))
+# Envois simultanés vers le stockage (tous utilisateurs confondus, par processus)
+CONCURRENCY = int(os.environ.get("STORAGE_UPLOAD_CONCURRENCY", 4))
+# Au-delà de cette taille de requête (ou si elle est inconnue), upload résumable
+RESUMABLE_THRESHOLD = int(os.environ.get("STORAGE_RESUMABLE_THRESHOLD", 6 * MB))
+# Nouvelles tentatives par morceau TUS
+CHUNK_RETRIES = 3
+
+TUS_VERSION = "1.0.0"
+
+uploaded_bytes = metrics.counter("storage_upload_bytes", "Bytes streamed to Supabase Storage")
+upload_latency = metrics.histogram(
+    "storage_upload_seconds", "Duration of a streamed upload to Supabase Storage",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def storage_url() -> str:
+    url = os.environ.get("SUPABASE_STORAGE_URL")
+    if url:
+        return url.rstrip("/")
+    supabase_url = os.environ.get("SUPABASE_URL")
+    if not supabase_url:
+        raise RuntimeError("SUPABASE_URL not configured in .env")
+    return f"{supabase_url.rstrip('/')}/storage/v1"
+
+
+def _upload_slot() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(CONCURRENCY)
+    return _semaphore
+
+
+# --- Lecture en flux du corps multipart ---
+
+class MultipartFileStream:
+    """
+    Premier fichier d'un corps multipart/form-data, lu directement depuis le flux ASGI.
+    'open()' lit jusqu'aux en-têtes du fichier (nom, type) ; l'itération produit ensuite
+    son contenu par morceaux, au rythme où le client l'envoie.
+    """
+
+    def __init__(self, body: AsyncIterator[bytes], content_type_header: str):
+        content_type, options = parse_options_header(content_type_header)
+        boundary = options.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise ValueError("Expected a multipart/form-data body with a 'file' field.")
+
+        self._body = body
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._in_file = False
+        self._file_found = False
+        self._file_done = False
+        self._exhausted = False
+        self._pending: List[bytes] = []
+
+        self.filename: Optional[str] = None
+        self.content_type: str = "application/octet-stream"
+        self.size = 0
+
+    # Callbacks du parseur (appelés pendant 'write')
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self):
+        if self._file_found:
+            return
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" in disposition:
+            self._file_found = self._in_file = True
+            self.filename = disposition[b"filename"].decode("utf-8", errors="replace")
+            content_type = self._headers.get(b"content-type")
+            if content_type:
+                self.content_type = content_type.decode("latin-1").strip()
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+
+    async def _feed(self) -> bool:
+        """Donne un morceau du corps au parseur ; False quand le corps est épuisé."""
+        if self._exhausted:
+            return False
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            self._exhausted = True
+            self._parser.finalize()
+            return False
+        if chunk:
+            self._parser.write(chunk)
+        return True
+
+    async def open(self) -> "MultipartFileStream":
+        while not self._file_found:
+            if not await self._feed():
+                raise ValueError("No file found in the request.")
+        return self
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            if self._pending:
+                data, self._pending = b"".join(self._pending), []
+                self.size += len(data)
+                yield data
+            if self._file_done:
+                return
+            if not await self._feed() and not self._pending:
+                if not self._file_done:
+                    raise ValueError("Incomplete multipart body.")
+                return
+
+
+async def rechunk(stream: AsyncIterator[bytes], size: int) -> AsyncIterator[Tuple[bytes, bool]]:
+    """
+    Regroupe un flux en morceaux de 'size' octets exactement (sauf le dernier).
+    Produit (morceau, dernier) : un morceau n'est émis que lorsqu'on sait s'il est le dernier.
+    """
+    buffer = bytearray()
+    async for data in stream:
+        buffer += data
+        # Strictement plus que 'size' : le morceau émis n'est pas le dernier
+        while len(buffer) > size:
+            yield bytes(buffer[:size]), False
+            del buffer[:size]
+    yield bytes(buffer), True
+
+
+async def iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    """Flux d'un contenu déjà en mémoire."""
+    yield data
+
+
+# --- Envoi vers le stockage ---
+
+def _tus_metadata(bucket: str, object_name: str, content_type: str) -> str:
+    def b64(value: str) -> str:
+        return base64.b64encode(value.encode("utf-8")).decode("ascii")
+    return ",".join([
+        f"bucketName {b64(bucket)}",
+        f"objectName {b64(object_name)}",
+        f"contentType {b64(content_type)}",
+    ])
+
+
+async def _upload_simple(client: httpx.AsyncClient, base: str, token: str, bucket: str,
+                         object_name: str, content_type: str, stream: AsyncIterator[bytes]):
+    response = await client.post(
+        f"{base}/object/{bucket}/{object_name}",
+        headers={"Authorization": f"Bearer {token}", "Content-Type": content_type},
+        content=stream,
+    )
+    response.raise_for_status()
+
+
+async def _patch_chunk(client: httpx.AsyncClient, location: str, headers: Dict[str, str],
+                       chunk: bytes, offset: int, total: Optional[int]) -> int:
+    """Envoie un morceau à partir de 'offset' ; reprend à l'offset du serveur en cas d'échec."""
+    end = offset + len(chunk)
+    sent = offset
+    for attempt in range(CHUNK_RETRIES + 1):
+        patch_headers = {
+            **headers,
+            "Upload-Offset": str(sent),
+            "Content-Type": "application/offset+octet-stream",
+        }
+        if total is not None:
+            patch_headers["Upload-Length"] = str(total)
+        try:
+            response = await client.patch(location, headers=patch_headers, content=chunk[sent - offset:])
+            response.raise_for_status()
+            return int(response.headers.get("Upload-Offset", end))
+        except httpx.HTTPError as e:
+            status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+            if attempt == CHUNK_RETRIES or (status_code is not None and status_code < 500 and status_code != 409):
+                raise
+            # Où en est le serveur ? (une partie du morceau a pu être enregistrée)
+            head = await client.head(location, headers=headers)
+            head.raise_for_status()
+            sent = int(head.headers["Upload-Offset"])
+            if sent >= end:
+                return sent
+    return sent
+
+
+async def _upload_resumable(client: httpx.AsyncClient, base: str, token: str, bucket: str,
+                            object_name: str, content_type: str, stream: AsyncIterator[bytes]):
+    headers = {"Authorization": f"Bearer {token}", "Tus-Resumable": TUS_VERSION}
+    created = await client.post(
+        f"{base}/upload/resumable",
+        headers={
+            **headers,
+            "Upload-Defer-Length": "1",
+            "Upload-Metadata": _tus_metadata(bucket, object_name, content_type),
+        },
+    )
+    created.raise_for_status()
+    location = urljoin(f"{base}/upload/resumable", created.headers["Location"])
+
+    # Lecture anticipée : le morceau suivant est lu pendant l'envoi du courant
+    chunks = rechunk(stream, CHUNK_SIZE).__aiter__()
+    offset, last = 0, False
+    following = asyncio.ensure_future(chunks.__anext__())
+    try:
+        while not last:
+            chunk, last = await following
+            if not last:
+                following = asyncio.ensure_future(chunks.__anext__())
+            # Dernier morceau : la taille totale est enfin connue
+            total = offset + len(chunk) if last else None
+            offset = await _patch_chunk(client, location, headers, chunk, offset, total)
+    finally:
+        if not following.done():
+            following.cancel()
+
+
+async def upload_stream(token: str, bucket: str, object_name: str, content_type: str,
+                        stream: AsyncIterator[bytes], expected_size: Optional[int] = None):
+    """
+    Transmet 'stream' vers 'bucket/object_name' avec le jeton de l'utilisateur.
+    'expected_size' (taille approximative, ex. Content-Length de la requête) choisit
+    entre l'envoi direct et l'upload résumable.
+    """
+    client = get_async_client()
+    base = storage_url()
+    counted = _count(stream)
+    start = asyncio.get_running_loop().time()
+    async with _upload_slot():
+        if expected_size is not None and expected_size <= RESUMABLE_THRESHOLD:
+            await _upload_simple(client, base, token, bucket, object_name, content_type, counted)
+        else:
+            await _upload_resumable(client, base, token, bucket, object_name, content_type, counted)
+    upload_latency.observe(asyncio.get_running_loop().time() - start)
+
+
+async def _count(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    async for data in stream:
+        uploaded_bytes.inc(len(data))
+        yield data
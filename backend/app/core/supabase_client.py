@@ -1,8 +1,12 @@
 # backend/app/core/supabase_client.py
 import os
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Optional
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -12,5 +16,36 @@ key: str = os.environ.get("SUPABASE_KEY")
 if not url or not key:
     raise EnvironmentError("SUPABASE_URL and SUPABASE_KEY must be set in .env file")
 
-# Create the Supabase client instance
-supabase: Client = create_client(url, key)
\ No newline at end of file
+
+class _LazyClient:
+    """
+    Client Supabase construit au premier usage : le paquet 'supabase' (auth, postgrest,
+    storage, realtime, functions) est long à importer et n'est pas nécessaire pour
+    démarrer le serveur. Les attributs sont délégués au vrai client.
+    """
+
+    def __init__(self):
+        self._lazy_client: Optional["Client"] = None
+        self._lazy_lock = threading.Lock()
+
+    def _lazy_get(self) -> "Client":
+        client = self._lazy_client
+        if client is None:
+            with self._lazy_lock:
+                if self._lazy_client is None:
+                    from supabase import create_client
+                    self._lazy_client = create_client(url, key)
+                client = self._lazy_client
+        return client
+
+    def __getattr__(self, name: str):
+        return getattr(self._lazy_get(), name)
+
+
+# Create the Supabase client instance (built on first use)
+supabase: "Client" = _LazyClient()  # type: ignore[assignment]
+
+
+def get_client() -> "Client":
+    """Le vrai client (construit s'il ne l'est pas encore)."""
+    return supabase._lazy_get()
@@ -0,0 +1,259 @@
+# backend/app/core/username_index.py
+# Index en mémoire des noms d'utilisateur pour /users/search.
+#
+#  - tableau trié des noms (en minuscules) : recherche par préfixe par dichotomie ;
+#  - index de bigrammes et trigrammes -> utilisateurs : recherche de sous-chaîne en ne
+#    vérifiant que la plus petite liste de candidats ;
+#  - cache LRU des résultats par requête, vidé à chaque ajout.
+# L'index est chargé depuis Supabase au premier usage, complété à chaque inscription
+# (diffusée à tous les workers par le pub/sub de core.shared_state) et rechargé
+# périodiquement.
+
+import bisect
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import shared_state
+from .cache import TTLCache
+
+# Nombre de résultats renvoyés par /users/search
+DEFAULT_LIMIT = 10
+# Rechargement complet depuis la base au-delà de cet âge (secondes)
+REFRESH_SECONDS = 300
+# Taille des pages lues lors du chargement
+LOAD_PAGE_SIZE = 1000
+# Sujet pub/sub des inscriptions
+TOPIC = "username_index"
+
+User = Tuple[str, str]  # (id, username)
+
+
+def _grams(text: str, n: int) -> Iterable[str]:
+    return (text[i:i + n] for i in range(len(text) - n + 1))
+
+
+class UsernameIndex:
+    def __init__(self, users: Iterable[User] = ()):
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._lowered: List[str] = []
+        self._by_id: Dict[str, int] = {}
+        # Préfixes : (nom en minuscules, emplacement) triés
+        self._sorted: List[Tuple[str, int]] = []
+        # Sous-chaînes : n-gramme -> emplacements (croissants)
+        self._grams: Dict[str, array] = {}
+        self._results = TTLCache("user_search", max_size=4096, ttl=REFRESH_SECONDS)
+        # Incrémenté à chaque ajout : un résultat calculé avant un ajout n'est pas mis en cache
+        self._version = 0
+        self.loaded_at = 0.0
+
+        # Construction en bloc : listes de postings puis conversion en tableaux compacts
+        postings: Dict[str, List[int]] = {}
+        for slot, (user_id, username) in enumerate(users):
+            lowered = username.lower()
+            self._ids.append(user_id)
+            self._names.append(username)
+            self._lowered.append(lowered)
+            self._by_id[user_id] = slot
+            for gram in {lowered[i:i + n] for n in (2, 3) for i in range(len(lowered) - n + 1)}:
+                slots = postings.get(gram)
+                if slots is None:
+                    postings[gram] = [slot]
+                else:
+                    slots.append(slot)
+        self._grams = {gram: array("i", slots) for gram, slots in postings.items()}
+        self._sorted = sorted(zip(self._lowered, range(len(self._lowered))))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _append(self, user_id: str, username: str) -> int:
+        slot = len(self._ids)
+        lowered = username.lower()
+        self._ids.append(user_id)
+        self._names.append(username)
+        self._lowered.append(lowered)
+        self._by_id[user_id] = slot
+        self._sorted.append((lowered, slot))
+        for gram in set(_grams(lowered, 2)) | set(_grams(lowered, 3)):
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = array("i")
+            postings.append(slot)
+        return slot
+
+    def add(self, user_id: str, username: str):
+        """Ajoute un utilisateur (inscription) ; ignoré s'il est déjà indexé."""
+        with self._lock:
+            if user_id in self._by_id:
+                return
+            slot = self._append(user_id, username)
+            # '_append' a ajouté l'entrée en fin de liste : la remettre à sa place
+            self._sorted.pop()
+            bisect.insort(self._sorted, (self._lowered[slot], slot))
+            self._version += 1
+            self._results.clear()
+
+    # --- Recherche ---
+
+    def _prefix_slots(self, query: str, limit: int) -> List[int]:
+        slots = []
+        start = bisect.bisect_left(self._sorted, (query, -1))
+        for lowered, slot in self._sorted[start:start + limit]:
+            if not lowered.startswith(query):
+                break
+            slots.append(slot)
+        return slots
+
+    def _substring_slots(self, query: str, limit: int, skip: set) -> List[int]:
+        slots = []
+        if len(query) >= 2:
+            n = min(len(query), 3)
+            postings = [self._grams.get(gram) for gram in set(_grams(query, n))]
+            if any(p is None for p in postings):
+                return []
+            candidates: Iterable[int] = min(postings, key=len)
+        else:
+            candidates = range(len(self._ids))  # Un seul caractère : parcours avec arrêt anticipé
+        for slot in candidates:
+            if slot not in skip and query in self._lowered[slot]:
+                slots.append(slot)
+                if len(slots) >= limit:
+                    break
+        return slots
+
+    def search(self, query: str, exclude_id: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> List[Dict[str, str]]:
+        """
+        Noms contenant 'query' (insensible à la casse) : d'abord ceux qui commencent
+        par 'query' (ordre alphabétique), puis les autres.
+        """
+        query = query.lower()
+        # Un résultat de plus en cache pour pouvoir exclure l'utilisateur qui cherche
+        key = (query, limit)
+        slots = self._results.get(key)
+        if slots is None:
+            with self._lock:
+                version = self._version
+                slots = self._prefix_slots(query, limit + 1)
+                if len(slots) < limit + 1:
+                    slots += self._substring_slots(query, limit + 1 - len(slots), set(slots))
+            with self._lock:
+                if self._version == version:
+                    self._results.set(key, slots)
+
+        return [
+            {"id": self._ids[slot], "username": self._names[slot]}
+            for slot in slots
+            if self._ids[slot] != exclude_id
+        ][:limit]
+
+
+# --- Index partagé du processus ---
+
+_index: Optional[UsernameIndex] = None
+_index_lock = threading.Lock()
+_refreshing = False
+_subscribed = False
+# Inscriptions reçues pendant un chargement, rejouées dans le nouvel index
+_pending: Optional[List[User]] = None
+_pending_lock = threading.Lock()
+
+
+def _load_users() -> List[User]:
+    """Lit tous les utilisateurs (id, username) par pages (clé de service)."""
+    from .supabase_client import supabase
+
+    users: List[User] = []
+    start = 0
+    while True:
+        response = (
+            supabase.table("users").select("id,username").order("id")
+            .range(start, start + LOAD_PAGE_SIZE - 1).execute()
+        )
+        rows = response.data or []
+        users.extend((row["id"], row["username"]) for row in rows)
+        if len(rows) < LOAD_PAGE_SIZE:
+            return users
+        start += LOAD_PAGE_SIZE
+
+
+def _build_index() -> UsernameIndex:
+    index = UsernameIndex(_load_users())
+    index.loaded_at = time.monotonic()
+    return index
+
+
+def _load():
+    """
+    Charge un nouvel index et le met en place. Les inscriptions arrivées pendant la
+    lecture (absentes de l'instantané lu) y sont rejouées avant la bascule.
+    """
+    global _index, _pending
+    with _pending_lock:
+        _pending = []
+    try:
+        index = _build_index()
+    except BaseException:
+        with _pending_lock:
+            _pending = None
+        raise
+    with _pending_lock:
+        for user in _pending:
+            index.add(*user)
+        _pending = None
+        _index = index
+
+
+def _refresh():
+    global _refreshing
+    try:
+        _load()
+    except Exception as e:
+        print(f"Username index refresh error: {e}")
+    finally:
+        _refreshing = False
+
+
+def _on_signup(user: User):
+    with _pending_lock:
+        if _pending is not None:
+            _pending.append(user)
+        index = _index
+    if index is not None:
+        index.add(*user)
+
+
+def get_index() -> UsernameIndex:
+    """
+    Index courant. Le premier appel le charge ; ensuite, un index trop ancien continue
+    de répondre pendant qu'un thread le reconstruit.
+    """
+    global _refreshing, _subscribed
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                # Abonnement avant la lecture : les inscriptions concurrentes sont rejouées
+                if not _subscribed:
+                    shared_state.get_state().subscribe(TOPIC, _on_signup)
+                    _subscribed = True
+                _load()
+        return _index
+
+    if time.monotonic() - _index.loaded_at >= REFRESH_SECONDS:
+        with _index_lock:
+            if not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_refresh, daemon=True).start()
+    return _index
+
+
+def add_user(user_id: str, username: str):
+    """
+    À appeler après une inscription : ajout immédiat dans ce worker, puis diffusion aux
+    autres (aucun effet sur un worker dont l'index n'est pas encore chargé).
+    """
+    _on_signup((user_id, username))
+    shared_state.get_state().publish(TOPIC, (user_id, username))
@@ -0,0 +1,36 @@
+# backend/app/core/zipstream.py
+# Archive ZIP produite en flux : chaque fichier est écrit dès qu'il est prêt et les
+# octets sont renvoyés aussitôt au client (zipfile sait écrire vers un flux non
+# positionnable grâce aux descripteurs de données).
+
+import zipfile
+from typing import AsyncIterator, List, Tuple
+
+
+class _Sink:
+    """Flux en écriture seule : accumule les octets jusqu'au prochain 'drain'."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+async def zip_stream(entries: AsyncIterator[Tuple[str, bytes]],
+                     compression: int = zipfile.ZIP_STORED) -> AsyncIterator[bytes]:
+    """Produit l'archive contenant les (nom, contenu) de 'entries', au fil de leur arrivée."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=compression) as archive:
+        async for name, content in entries:
+            archive.writestr(name, content)
+            yield sink.drain()
+    yield sink.drain()  # Répertoire central
@@ -1,13 +1,44 @@
 # backend/app/main.py
 
+import os
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .core.supabase_client import supabase
+from .core.supabase_client import supabase, get_client as get_supabase_client
+from .core import metrics, http_client, lazy
+from .core.login_limiter import limiter as login_limiter
+from .core.compression import CompressionMiddleware
+from .core.responses import FastJSONResponse
 from .api import auth, users, chats, attacks, storage, visualize, crypto, mitm  # <-- IMPORT MITM
+from .security.crypto_algorithms import registry
+
+# Chargement en arrière-plan des modules différés et du client Supabase, peu après le
+# démarrage pour ne pas ralentir la première réponse (WARM_UP=0 : au premier usage seulement)
+WARM_UP = os.environ.get("WARM_UP", "1") != "0"
+WARM_UP_DELAY_SECONDS = float(os.environ.get("WARM_UP_DELAY_SECONDS", 1.0))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool de connexions ouvert dès le démarrage (CAPTCHA, uploads vers Storage, ...)
+    http_client.get_async_client()
+    if WARM_UP:
+        warm_up = threading.Timer(WARM_UP_DELAY_SECONDS, lazy.warm_up, args=(get_supabase_client, registry.available_methods))
+        warm_up.daemon = True
+        warm_up.start()
+    yield
+    # Ferme le pool de connexions partagé
+    await http_client.close_async_client()
+    # Écrit les états de verrouillage encore en attente
+    login_limiter.close()
+
 
 app = FastAPI(
     title="TP1-SSAD Security Framework API",
-    description="Backend for the SSAD encryption and security project."
+    description="Backend for the SSAD encryption and security project.",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # --- CORS Configuration ---
@@ -27,6 +58,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Compression (Brotli si disponible, sinon gzip) ---
+app.add_middleware(CompressionMiddleware)
+
 # --- 2. INCLUDE ALL YOUR ROUTERS ---
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -42,6 +76,12 @@ def read_root():
     return {"message": "SEKO Backend is running!"}
 
 
+@app.get("/metrics")
+def read_metrics():
+    """In-process counters and latency histograms (per worker)."""
+    return metrics.snapshot()
+
+
 @app.get("/test-supabase")
 async def test_supabase_connection():
     response = supabase.table("users").select("id, username").limit(1).execute()
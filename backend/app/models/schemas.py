@@ -69,6 +69,9 @@ class MessageCreate(BaseModel):
     encrypted_content: str
     content_type: str = "text" 
 
+class MessageBatchCreate(BaseModel):
+    messages: List[MessageCreate] # Inserted in order, in a single request
+
 class Message(BaseModel):
     id: int
     chat_id: uuid.UUID
@@ -155,3 +158,51 @@ class CryptoRequest(BaseModel):
 
 class CryptoResponse(BaseModel):
     result_text: str
+
+class CryptoBatchRequest(BaseModel):
+    items: List[CryptoRequest] # Mixed methods and keys are allowed
+
+# --- Cryptanalysis Schemas ---
+
+class KnownPlaintextPair(BaseModel):
+    plaintext: str
+    ciphertext: str
+
+class HillCryptanalysisRequest(BaseModel):
+    size: int = 2
+    pairs: Optional[List[KnownPlaintextPair]] = None # Known-plaintext attack
+    ciphertext: Optional[str] = None # Ciphertext-only attack (2x2 only)
+    workers: Optional[int] = None
+
+class HillCryptanalysisResponse(BaseModel):
+    mode: str # 'known_plaintext' or 'ciphertext_only'
+    found: bool
+    key: Optional[str] = None
+    key_matrix: Optional[List[List[int]]] = None
+    inverse_matrix: Optional[List[List[int]]] = None
+    plaintext: Optional[str] = None
+    score: Optional[float] = None
+    blocks_used: Optional[List[int]] = None
+    attempts: Optional[int] = None
+    keys_tested: Optional[int] = None
+    keys_per_second: Optional[float] = None
+    time_taken: float
+    message: Optional[str] = None
+
+class PlayfairCryptanalysisRequest(BaseModel):
+    ciphertext: str
+    size: int = 5
+    restarts: Optional[int] = None
+    steps: Optional[int] = None
+    workers: Optional[int] = None
+
+class CryptanalysisJob(BaseModel):
+    job_id: str
+    kind: str
+    status: str # 'pending', 'running', 'done' or 'failed'
+    progress: float
+    done: int
+    total: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    elapsed: float
@@ -0,0 +1,233 @@
+# backend/app/security/attack_tools/hill_attack.py
+# Cryptanalyse du chiffrement de Hill :
+#  - attaque par texte clair connu (résolution de K = C · P^-1 mod 26) ;
+#  - attaque sur texte chiffré seul pour les clés 2x2 (recherche exhaustive vectorisée).
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from ..crypto_algorithms import hill
+from . import ngram_scoring
+from .workers import resolve_workers
+
+# Nombre total de matrices 2x2 modulo 26
+KEYSPACE_2X2 = 26 ** 4
+# Taille des lots de clés évalués en une seule opération NumPy
+DEFAULT_BATCH_SIZE = 4096
+# Longueur maximale du chiffré utilisée pour le score (le déchiffrement final utilise tout le texte)
+SCORING_LENGTH = 240
+# Nombre maximal de combinaisons de blocs essayées pour l'attaque à clair connu
+MAX_BLOCK_COMBINATIONS = 5000
+
+_INVERTIBLE_DET = np.array([inv is not None for inv in hill.INVERSES_MOD_26])
+
+
+# --- Attaque par texte clair connu ---
+
+def _blocks(text: str, d: int, pad: bool) -> np.ndarray:
+    """Découpe un texte en blocs de 'd' nombres (bourrage 'X' comme au chiffrement)."""
+    numbers = hill.text_to_numbers(text)
+    if pad and len(numbers) % d:
+        numbers.extend([ord('X') - ord('A')] * (d - len(numbers) % d))
+    numbers = numbers[:len(numbers) - len(numbers) % d]
+    return np.array(numbers, dtype=np.int64).reshape(-1, d)
+
+
+def recover_key_known_plaintext(pairs: List[Tuple[str, str]], d: int) -> Dict[str, Any]:
+    """
+    Retrouve la matrice clé K à partir de couples (clair, chiffré).
+    Chaque bloc vérifie C = K · P (mod 26). On choisit 'd' blocs dont la matrice P
+    (blocs en colonnes) est inversible mod 26, puis K = C · P^-1 (mod 26).
+    La clé candidate est ensuite vérifiée sur tous les blocs connus.
+    """
+    start = time.perf_counter()
+
+    plain_blocks, cipher_blocks = [], []
+    for plaintext, ciphertext in pairs:
+        p = _blocks(plaintext, d, pad=True)
+        c = _blocks(ciphertext, d, pad=False)
+        if len(p) != len(c):
+            raise ValueError(
+                f"Le couple ('{plaintext[:20]}', '{ciphertext[:20]}') n'a pas le même nombre de blocs "
+                f"de {d} lettres après nettoyage."
+            )
+        plain_blocks.append(p)
+        cipher_blocks.append(c)
+
+    if not plain_blocks:
+        raise ValueError("Au moins un couple (clair, chiffré) est requis.")
+
+    P_all = np.concatenate(plain_blocks)
+    C_all = np.concatenate(cipher_blocks)
+    if len(P_all) < d:
+        raise ValueError(f"Il faut au moins {d} blocs de {d} lettres ({d * d} lettres) pour une matrice {d}x{d}.")
+
+    attempts = 0
+    for combo in combinations(range(len(P_all)), d):
+        if attempts >= MAX_BLOCK_COMBINATIONS:
+            break
+        attempts += 1
+
+        P = P_all[list(combo)].T  # blocs en colonnes
+        try:
+            P_inv = hill.get_modular_inverse_matrix(P, d)
+        except ValueError:
+            continue  # Blocs linéairement dépendants mod 26
+
+        K = (C_all[list(combo)].T @ P_inv) % hill.MODULE
+        # Vérification sur tous les blocs connus
+        if not np.array_equal((P_all @ K.T) % hill.MODULE, C_all):
+            continue
+        try:
+            K_inv = hill.get_modular_inverse_matrix(K, d)
+        except ValueError:
+            continue
+
+        return {
+            "found": True,
+            "key": hill.numbers_to_text(K.ravel().tolist()),
+            "key_matrix": K.tolist(),
+            "inverse_matrix": K_inv.tolist(),
+            "blocks_used": [int(i) for i in combo],
+            "blocks_verified": int(len(P_all)),
+            "attempts": attempts,
+            "time_taken": round(time.perf_counter() - start, 6),
+        }
+
+    return {
+        "found": False,
+        "message": "Aucun ensemble de blocs inversible et cohérent n'a été trouvé. Fournissez davantage de texte connu.",
+        "blocks_verified": int(len(P_all)),
+        "attempts": attempts,
+        "time_taken": round(time.perf_counter() - start, 6),
+    }
+
+
+# --- Attaque sur texte chiffré seul (2x2) ---
+
+def _index_to_matrices(indices: np.ndarray) -> np.ndarray:
+    """Convertit des indices [0, 26^4) en matrices 2x2 (a b / c d), en base 26."""
+    digits = np.stack([(indices // 26 ** p) % 26 for p in (3, 2, 1, 0)], axis=-1)
+    return digits.reshape(-1, 2, 2)
+
+
+def _search_range(cipher_numbers: np.ndarray, start: int, stop: int, batch_size: int, top: int = 5) -> Tuple[List[Tuple[float, int]], int]:
+    """
+    Évalue toutes les matrices de déchiffrement d'indice [start, stop).
+    Retourne les 'top' meilleurs (score, indice) et le nombre de clés inversibles testées.
+    """
+    table = ngram_scoring.quadgram_table()
+    blocks = cipher_numbers.reshape(-1, 2).T  # (2, n)
+    best: List[Tuple[float, int]] = []
+    tested = 0
+
+    for batch_start in range(start, stop, batch_size):
+        indices = np.arange(batch_start, min(batch_start + batch_size, stop), dtype=np.int64)
+        matrices = _index_to_matrices(indices)
+
+        det = (matrices[:, 0, 0] * matrices[:, 1, 1] - matrices[:, 0, 1] * matrices[:, 1, 0]) % 26
+        mask = _INVERTIBLE_DET[det]
+        if not mask.any():
+            continue
+        indices, matrices = indices[mask], matrices[mask]
+        tested += len(indices)
+
+        # (B, 2, 2) @ (2, n) -> (B, 2, n) -> texte entrelacé (B, 2n)
+        plain = (matrices @ blocks) % 26
+        plain = plain.transpose(0, 2, 1).reshape(len(indices), -1)
+        scores = ngram_scoring.score_numbers(plain, table)
+
+        k = min(top, len(scores))
+        candidates = np.argpartition(scores, -k)[-k:]
+        best.extend((float(scores[i]), int(indices[i])) for i in candidates)
+        best = sorted(best, reverse=True)[:top]
+
+    return best, tested
+
+
+def _split_ranges(total: int, parts: int) -> List[Tuple[int, int]]:
+    step = -(-total // parts)
+    return [(i, min(i + step, total)) for i in range(0, total, step)]
+
+
+def search_2x2(cipher_numbers: np.ndarray, workers: int = 1, batch_size: int = DEFAULT_BATCH_SIZE,
+               keyspace: int = KEYSPACE_2X2) -> Tuple[List[Tuple[float, int]], int]:
+    """Recherche exhaustive répartie sur 'workers' processus (1 = dans le processus courant)."""
+    if workers <= 1:
+        return _search_range(cipher_numbers, 0, keyspace, batch_size)
+
+    # Table construite avant le fork pour que les processus la partagent
+    ngram_scoring.quadgram_table()
+    best: List[Tuple[float, int]] = []
+    tested = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_search_range, cipher_numbers, lo, hi, batch_size)
+            for lo, hi in _split_ranges(keyspace, workers * 4)
+        ]
+        for future in futures:
+            part_best, part_tested = future.result()
+            best.extend(part_best)
+            tested += part_tested
+    return sorted(best, reverse=True)[:5], tested
+
+
+def crack_ciphertext_only(ciphertext: str, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Attaque par texte chiffré seul sur une clé 2x2 : toutes les matrices inversibles
+    de déchiffrement sont essayées et le clair le plus proche de l'anglais (score de
+    quadrigrammes) est retenu. La clé de chiffrement est l'inverse de la meilleure matrice.
+    """
+    cipher_numbers = _blocks(ciphertext, 2, pad=False).ravel()
+    if len(cipher_numbers) < 8:
+        raise ValueError("Le texte chiffré doit contenir au moins 8 lettres pour une attaque sur texte chiffré seul.")
+
+    workers = resolve_workers(workers)
+    start = time.perf_counter()
+    best, tested = search_2x2(cipher_numbers[:SCORING_LENGTH], workers=workers)
+    elapsed = time.perf_counter() - start
+
+    score, index = best[0]
+    decryption_matrix = _index_to_matrices(np.array([index]))[0]
+    key_matrix = hill.get_modular_inverse_matrix(decryption_matrix, 2)
+    key = hill.numbers_to_text(key_matrix.ravel().tolist())
+    scored_length = min(len(cipher_numbers), SCORING_LENGTH)
+
+    return {
+        "found": True,
+        "key": key,
+        "key_matrix": key_matrix.tolist(),
+        "inverse_matrix": decryption_matrix.tolist(),
+        "plaintext": hill.decrypt_hill(ciphertext, key_matrix, 2, decryption_matrix),
+        "score": round(ngram_scoring.normalized_score(score, scored_length), 4),
+        "keys_tested": int(tested),
+        "workers": workers,
+        "time_taken": round(elapsed, 6),
+        "keys_per_second": round(tested / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def benchmark(ciphertext: str, keyspace: int = KEYSPACE_2X2, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Mesure le débit de la recherche 2x2 (clés/s) sur un cœur puis sur tous les cœurs."""
+    cipher_numbers = _blocks(ciphertext, 2, pad=False).ravel()[:SCORING_LENGTH]
+    if len(cipher_numbers) < 8:
+        raise ValueError("Le texte chiffré doit contenir au moins 8 lettres.")
+    workers = resolve_workers(workers)
+    ngram_scoring.quadgram_table()
+
+    results = {}
+    for label, n in (("single_core", 1), ("multi_core", workers)):
+        start = time.perf_counter()
+        _, tested = search_2x2(cipher_numbers, workers=n, keyspace=keyspace)
+        elapsed = time.perf_counter() - start
+        results[label] = {
+            "workers": n,
+            "keys_tested": int(tested),
+            "time_taken": round(elapsed, 6),
+            "keys_per_second": round(tested / elapsed, 1) if elapsed > 0 else None,
+        }
+    return results
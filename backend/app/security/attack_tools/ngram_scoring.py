@@ -0,0 +1,173 @@
+# backend/app/security/attack_tools/ngram_scoring.py
+# Language model shared by the cryptanalysis engines (Hill, Playfair).
+# Candidate plaintexts are ranked by the sum of quadgram log-probabilities,
+# read from a flat NumPy table so that scoring one quadgram is a single lookup.
+
+import re
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Fréquences des lettres en anglais (%), utilisées comme a priori de lissage.
+ENGLISH_LETTER_FREQUENCIES = {
+    'A': 8.17, 'B': 1.49, 'C': 2.78, 'D': 4.25, 'E': 12.70, 'F': 2.23, 'G': 2.02,
+    'H': 6.09, 'I': 6.97, 'J': 0.15, 'K': 0.77, 'L': 4.03, 'M': 2.41, 'N': 6.75,
+    'O': 7.51, 'P': 1.93, 'Q': 0.10, 'R': 5.99, 'S': 6.33, 'T': 9.06, 'U': 2.76,
+    'V': 0.98, 'W': 2.36, 'X': 0.15, 'Y': 1.97, 'Z': 0.07,
+}
+
+# Small reference corpus used to estimate bigram and quadgram statistics.
+# The quadgram table interpolates corpus counts with a bigram chain and the
+# letter frequencies above, so unseen quadgrams still get a sensible score.
+_CORPUS = """
+The history of secret writing is as old as writing itself. When the first
+scribes learned to record the names of kings and the size of the harvest, some
+of them also learned to hide what they wrote from the eyes of their rivals.
+A message that travels from one city to another passes through many hands, and
+every one of those hands belongs to a person who might be curious, careless or
+paid by the enemy. The simplest answer to this problem was to change the
+letters of the message according to a rule that only the sender and the
+receiver knew. Julius Caesar is remembered for shifting every letter of the
+alphabet by three places, so that the word attack became a word that looked
+like nonsense to anyone who did not know the trick. For a long time this was
+good enough, because most people who captured a message could not read at all.
+
+Over the centuries the people who tried to break these systems became more
+skilled than the people who designed them. Scholars noticed that in every
+language some letters appear far more often than others. In English the letter
+E is the most common, followed by T, A, O, I and N, while letters such as Q, X
+and Z are rare. A message written with a simple substitution keeps these
+patterns, so an analyst who counts the letters of the ciphertext can guess
+which symbol stands for E and which stands for T. Once a few letters are known,
+short words such as the, and, of and to appear, and the rest of the message
+follows quickly. This method, called frequency analysis, was described by Arab
+mathematicians more than a thousand years ago and it is still taught today.
+
+The designers answered by hiding the frequencies. The Playfair cipher, which
+was used by the British army in the field, encrypts pairs of letters instead of
+single letters. The key is written into a square grid of five rows and five
+columns, and each pair of letters in the message is replaced by another pair
+taken from the corners of the rectangle that the two letters form in the grid.
+Because there are hundreds of possible pairs, counting them requires much more
+text, and the pattern is harder to see. The Hill cipher goes further and treats
+blocks of letters as vectors that are multiplied by a secret matrix. Every
+letter of the output depends on every letter of the block, so a change in one
+position spreads across the whole block.
+
+None of these systems is secure by modern standards. The Hill cipher is linear,
+which means that an attacker who knows a few pairs of plaintext and ciphertext
+blocks can write a system of equations and solve it for the key. The Playfair
+cipher can be broken by a computer that starts with a random grid, measures how
+much the decrypted text looks like real language, and then keeps making small
+changes to the grid while the score improves. Methods like these are the reason
+why we now rely on algorithms that were built with mathematics and computing
+power in mind, and that have been studied in public for many years before they
+are trusted with real information.
+
+Security is not only about algorithms. A strong cipher is useless if the key is
+written on a note next to the computer, if the password is the name of the
+family dog, or if the network sends everything in clear text where anyone in
+the same coffee shop can read it. Good practice means choosing long and random
+passwords, limiting the number of times a login can be attempted, checking that
+the person on the other side of the connection is really who they claim to be,
+and keeping software up to date. It also means understanding the attacks well
+enough to recognise them, which is the reason students still learn how the old
+ciphers work and how they were broken.
+
+In this project each student can send messages that are encrypted with one of
+the classical ciphers, watch every step of the encryption on the screen, hide
+text inside pictures and sound files, and then play the role of the attacker
+who tries to read what was sent. The goal is not to build a system that resists
+a determined adversary, but to make the weaknesses visible so that the lessons
+are remembered when it is time to design something that matters.
+"""
+
+# Poids d'interpolation : quadrigrammes observés, chaîne de bigrammes, unigrammes.
+_LAMBDA_QUADGRAM = 0.5
+_LAMBDA_BIGRAM = 0.4
+_LAMBDA_MONOGRAM = 0.1
+
+
+def _corpus_indices(alphabet: str) -> np.ndarray:
+    """Returns the reference corpus as an array of indices into 'alphabet'."""
+    lookup = {c: i for i, c in enumerate(alphabet)}
+    cleaned = re.sub(r"[^A-Z]", "", _CORPUS.upper())
+    if 'J' not in lookup:
+        cleaned = cleaned.replace('J', 'I')
+    return np.array([lookup[c] for c in cleaned if c in lookup], dtype=np.int64)
+
+
+@lru_cache(maxsize=4)
+def quadgram_table(alphabet: str = LETTERS) -> np.ndarray:
+    """
+    Builds the flat quadgram log10-probability table for 'alphabet'.
+    Entry (a*n^3 + b*n^2 + c*n + d) scores the quadgram 'abcd' where n = len(alphabet).
+    Symbols outside A-Z (digits of the 6x6 Playfair grid) only get the smoothing floor.
+    """
+    n = len(alphabet)
+    idx = _corpus_indices(alphabet)
+
+    # Unigrammes : fréquences de référence (plancher pour les symboles inconnus)
+    mono = np.array([ENGLISH_LETTER_FREQUENCIES.get(c, 0.01) for c in alphabet], dtype=np.float64)
+    mono /= mono.sum()
+
+    # Bigrammes conditionnels P(b | a), lissage de Laplace
+    bigram_counts = np.ones((n, n), dtype=np.float64)
+    np.add.at(bigram_counts, (idx[:-1], idx[1:]), 1.0)
+    bigram_cond = bigram_counts / bigram_counts.sum(axis=1, keepdims=True)
+
+    # Quadrigrammes observés dans le corpus
+    windows = idx[:-3] * n ** 3 + idx[1:-2] * n ** 2 + idx[2:-1] * n + idx[3:]
+    quad_counts = np.bincount(windows, minlength=n ** 4).astype(np.float64)
+    quad_prob = quad_counts / max(len(windows), 1)
+
+    chain = (
+        mono[:, None, None, None]
+        * bigram_cond[:, :, None, None]
+        * bigram_cond[None, :, :, None]
+        * bigram_cond[None, None, :, :]
+    ).ravel()
+    mono_product = np.einsum('a,b,c,d->abcd', mono, mono, mono, mono).ravel()
+
+    prob = _LAMBDA_QUADGRAM * quad_prob + _LAMBDA_BIGRAM * chain + _LAMBDA_MONOGRAM * mono_product
+    return np.log10(prob).astype(np.float32)
+
+
+def quadgram_indices(numbers: np.ndarray, n: int) -> np.ndarray:
+    """Flat table indices of every overlapping quadgram of 'numbers' (last axis)."""
+    return (
+        numbers[..., :-3] * n ** 3
+        + numbers[..., 1:-2] * n ** 2
+        + numbers[..., 2:-1] * n
+        + numbers[..., 3:]
+    )
+
+
+def score_numbers(numbers: np.ndarray, table: np.ndarray, n: int = 26) -> np.ndarray:
+    """
+    Scores one text (1-D) or a batch of texts (2-D, one per row) given as symbol indices.
+    Higher is more language-like.
+    """
+    return table[quadgram_indices(numbers, n)].sum(axis=-1)
+
+
+def score_text(text: str, alphabet: str = LETTERS) -> float:
+    """Convenience wrapper: quadgram score of a text (symbols outside 'alphabet' are dropped)."""
+    numbers = to_numbers(text, alphabet)
+    if len(numbers) < 4:
+        return 0.0
+    return float(score_numbers(numbers, quadgram_table(alphabet), len(alphabet)))
+
+
+def normalized_score(score: float, length: int) -> float:
+    """Average log-probability per quadgram, comparable across text lengths."""
+    return score / max(length - 3, 1)
+
+
+def to_numbers(text: str, alphabet: Sequence[str] = LETTERS) -> np.ndarray:
+    """Maps a text onto symbol indices, dropping unknown symbols."""
+    lookup = {c: i for i, c in enumerate(alphabet)}
+    return np.array([lookup[c] for c in text.upper() if c in lookup], dtype=np.int64)
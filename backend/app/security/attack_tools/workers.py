@@ -0,0 +1,21 @@
+# backend/app/security/attack_tools/workers.py
+# Nombre de processus des attaques parallèles (recherche Hill 2x2, recuit Playfair).
+# La valeur vient de la requête : elle est bornée au nombre de CPU de la machine, sans
+# quoi un appel pourrait démarrer un pool de milliers de processus.
+
+import os
+from typing import Optional
+
+
+def max_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """'workers' validé (1 à max_workers()), ou tous les CPU s'il n'est pas précisé."""
+    limit = max_workers()
+    if workers is None:
+        return limit
+    if not 1 <= workers <= limit:
+        raise ValueError(f"'workers' must be between 1 and {limit}.")
+    return workers
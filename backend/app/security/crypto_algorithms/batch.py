@@ -0,0 +1,115 @@
+# backend/app/security/crypto_algorithms/batch.py
+# Chiffrement / déchiffrement par lots.
+# Les éléments sont regroupés par (méthode, paramètres) pour que chaque clé ne soit
+# compilée qu'une fois (via le registre des algorithmes) ; les gros lots sont
+# découpés en tranches traitées par un pool de processus. Les résultats sont toujours restitués dans l'ordre d'entrée.
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from . import registry
+
+# Au-delà de ce volume de texte, le lot est réparti sur le pool de processus
+POOL_THRESHOLD_CHARS = 200_000
+# Volume de texte maximal par tranche envoyée à un processus
+CHUNK_CHARS = 50_000
+
+# (texte, méthode, clé, décalage, taille)
+BatchItem = Tuple[str, str, Optional[str], Optional[int], Optional[int]]
+# (indice d'entrée, succès, texte résultat ou message d'erreur)
+BatchResult = Tuple[int, bool, str]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _pool
+
+
+def _run_chunk(mode: str, method: str, key: Optional[str], shift: Optional[int], size: Optional[int],
+               texts: List[str]) -> List[Tuple[bool, str]]:
+    """Traite une tranche d'un même groupe ; la clé est validée (et compilée) une seule fois."""
+    try:
+        cipher = registry.compile_cipher(method, registry.field_params(key=key, shift=shift, size=size))
+    except ValueError as e:
+        return [(False, str(e))] * len(texts)
+
+    # Chemin par lots de l'algorithme (ex. une seule multiplication matricielle pour Hill)
+    try:
+        many = cipher.encrypt_many if mode == "encrypt" else cipher.decrypt_many
+        return [(True, result) for result in many(texts)]
+    except ValueError:
+        pass
+
+    # Un texte invalide fait échouer le lot : repli élément par élément pour isoler l'erreur
+    func = cipher.encrypt if mode == "encrypt" else cipher.decrypt
+    results = []
+    for text in texts:
+        try:
+            results.append((True, func(text)))
+        except ValueError as e:
+            results.append((False, str(e)))
+    return results
+
+
+def _chunks(items: List[BatchItem]) -> List[Tuple[tuple, List[int]]]:
+    """Regroupe les indices par (méthode, clé, décalage, taille) puis découpe en tranches."""
+    groups: "OrderedDict[tuple, List[int]]" = OrderedDict()
+    for index, (text, method, key, shift, size) in enumerate(items):
+        groups.setdefault((method, key, shift, size), []).append(index)
+
+    chunks = []
+    for params, indices in groups.items():
+        current, chars = [], 0
+        for index in indices:
+            current.append(index)
+            chars += len(items[index][0])
+            if chars >= CHUNK_CHARS:
+                chunks.append((params, current))
+                current, chars = [], 0
+        if current:
+            chunks.append((params, current))
+    return chunks
+
+
+def run_batch(mode: str, items: Iterable[BatchItem]) -> Iterator[BatchResult]:
+    """
+    Traite un lot et produit les résultats dans l'ordre d'entrée, au fur et à mesure
+    que le préfixe contigu des résultats est disponible.
+    """
+    if mode not in ("encrypt", "decrypt"):
+        raise ValueError("Mode must be 'encrypt' or 'decrypt'.")
+    items = list(items)
+    chunks = _chunks(items)
+    results: List[Optional[Tuple[bool, str]]] = [None] * len(items)
+    next_index = 0
+
+    def ready() -> Iterator[BatchResult]:
+        nonlocal next_index
+        while next_index < len(items) and results[next_index] is not None:
+            ok, value = results[next_index]
+            yield next_index, ok, value
+            next_index += 1
+
+    total_chars = sum(len(item[0]) for item in items)
+    if total_chars < POOL_THRESHOLD_CHARS or len(chunks) == 1:
+        for params, indices in chunks:
+            for index, result in zip(indices, _run_chunk(mode, *params, [items[i][0] for i in indices])):
+                results[index] = result
+            yield from ready()
+        return
+
+    pool = _get_pool()
+    futures = {
+        pool.submit(_run_chunk, mode, *params, [items[i][0] for i in indices]): indices
+        for params, indices in chunks
+    }
+    for future in as_completed(futures):
+        for index, result in zip(futures[future], future.result()):
+            results[index] = result
+        yield from ready()
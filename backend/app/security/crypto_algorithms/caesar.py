@@ -1,5 +1,7 @@
 from collections import Counter
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
+
+from . import registry
 
 # --- Logique du nouveau fichier ---
 
@@ -13,11 +15,7 @@ def cesar_chiffrer(texte: str, cle: int) -> str:
     texte = nettoyer(texte)
     if cle % 26 == 0:
         return texte  # Pas de chiffrement
-    resultat = ""
-    for c in texte:
-        code = (ord(c) - ord('A') + cle) % 26
-        resultat += chr(ord('A') + code)
-    return resultat
+    return "".join(chr(ord('A') + (ord(c) - ord('A') + cle) % 26) for c in texte)
 
 # Déchiffrement César
 def cesar_dechiffrer(texte: str, cle: int) -> str:
@@ -77,3 +75,71 @@ def get_flaws() -> Dict[str, str]:
         "description": "Le chiffrement de César n'a que 25 clés possibles. Une attaque par force brute est triviale. De plus, il préserve la fréquence des lettres (par exemple, 'E' devient 'H' avec une clé de 3), le rendant vulnérable à l'analyse fréquentielle.",
         "solution": "Ne jamais utiliser ce chiffrement pour des données sensibles. Utiliser un chiffrement polyalphabétique (comme Vigenère) ou, mieux, un standard moderne (AES)."
     }
+
+
+# --- Enregistrement dans le registre des algorithmes ---
+
+_LETTRES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class CompiledCaesar(registry.CompiledCipher):
+    """Décalage compilé en tables de traduction (une pour chaque sens)."""
+
+    method = "caesar"
+
+    def __init__(self, shift: int):
+        self.shift = shift
+        decale = _LETTRES[shift % 26:] + _LETTRES[:shift % 26]
+        self._table_chiffrement = str.maketrans(_LETTRES, decale)
+        self._table_dechiffrement = str.maketrans(decale, _LETTRES)
+
+    def encrypt(self, text: str) -> str:
+        texte = nettoyer(text)
+        if not texte.isascii():
+            return cesar_chiffrer(texte, self.shift)  # Lettres accentuées : chemin d'origine
+        return texte.translate(self._table_chiffrement)
+
+    def decrypt(self, text: str) -> str:
+        texte = nettoyer(text)
+        if not texte.isascii():
+            return cesar_dechiffrer(texte, self.shift)
+        return texte.translate(self._table_dechiffrement)
+
+    # Déroulé lettre par lettre : les caractères hors alphabet sont signalés sans sortie
+    def trace_encrypt(self, text: str) -> registry.Trace:
+        return registry.Trace(None, None, self._trace(text, self._table_chiffrement))
+
+    def trace_decrypt(self, text: str) -> registry.Trace:
+        return registry.Trace(None, None, self._trace(text, self._table_dechiffrement))
+
+    @staticmethod
+    def _trace(text: str, table: Dict[int, int]) -> Iterator[Dict[str, Any]]:
+        for char in text:
+            if 'a' <= char <= 'z' or 'A' <= char <= 'Z':
+                yield {"input": char, "output": char.upper().translate(table)}
+            else:
+                yield {"input": char, "output": None}
+
+    # César traite chaque lettre indépendamment : aucun état entre les morceaux
+    def encryptor(self) -> "CaesarStream":
+        return CaesarStream(self.encrypt)
+
+    def decryptor(self) -> "CaesarStream":
+        return CaesarStream(self.decrypt)
+
+
+class CaesarStream(registry.StreamTransform):
+    def __init__(self, func):
+        self._func = func
+
+    def update(self, chunk: str) -> str:
+        return self._func(chunk)
+
+
+class CaesarCipher(registry.Cipher):
+    name = "caesar"
+
+    def normalize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"shift": registry.require_int(params, "shift", "Caesar")}
+
+    def build(self, params: Dict[str, Any]) -> CompiledCaesar:
+        return CompiledCaesar(params["shift"])
@@ -1,20 +1,33 @@
 import numpy as np
 import math
 import sys
-from typing import List, Optional, Dict # <- CORRECTION ICI
+from typing import Any, Iterable, Iterator, List, Optional, Dict, Tuple # <- CORRECTION ICI
+
+from . import registry
 
 # --- Fonctions utilitaires pour la cryptographie (Mod 26) ---
 
+MODULE = 26
+# Taille maximale de la matrice clé (clé de MAX_SIZE x MAX_SIZE lettres)
+MAX_SIZE = 10
+
+# Table des inverses modulo 26 (None si gcd(a, 26) != 1), calculée une seule fois.
+INVERSES_MOD_26: Tuple[Optional[int], ...] = tuple(
+    next((x for x in range(1, MODULE) if (a * x) % MODULE == 1), None)
+    for a in range(MODULE)
+)
+
 def mod_inverse(a: int, m: int) -> Optional[int]:
     """
     Calcule l'inverse modulaire de 'a' modulo 'm'.
     Nécessaire pour le déterminant lors du déchiffrement.
     """
-    a = a % m
-    for x in range(1, m):
-        if (a * x) % m == 1:
-            return x
-    return None # Non inversible
+    if m == MODULE:
+        return INVERSES_MOD_26[a % m]
+    try:
+        return pow(a, -1, m)
+    except ValueError:
+        return None # Non inversible
 
 def text_to_numbers(text: str) -> List[int]:
     """Convertit une chaîne de caractères (nettoyée) en liste de nombres (A=0, Z=25)."""
@@ -27,11 +40,8 @@ def text_to_numbers(text: str) -> List[int]:
 
 def numbers_to_text(numbers: List[int]) -> str:
     """Convertit une liste de nombres en chaîne de caractères."""
-    text = ""
-    for num in numbers:
-        # np.round(num) est utilisé pour gérer les très petites erreurs de flottants
-        text += chr(int(round(num)) + ord('A'))
-    return text
+    # int(round(num)) est conservé pour gérer d'éventuelles valeurs flottantes
+    return "".join(chr(int(round(num)) + ord('A')) for num in numbers)
 
 def get_key_matrix(key_string: str, d: int) -> np.ndarray:
     """Crée la matrice clé et vérifie sa taille."""
@@ -44,63 +54,87 @@ def get_key_matrix(key_string: str, d: int) -> np.ndarray:
 
 # --- Fonctions pour le calcul de l'inverse modulaire ---
 
+def _gauss_jordan_mod_prime(rows: List[List[int]], p: int) -> Tuple[int, Optional[List[List[int]]]]:
+    """
+    Élimination de Gauss-Jordan exacte (entiers) sur Z/pZ, p premier.
+    Retourne (déterminant mod p, inverse mod p ou None si non inversible).
+    """
+    d = len(rows)
+    # Matrice augmentée [A | I]
+    aug = [[v % p for v in row] + [1 if i == j else 0 for j in range(d)] for i, row in enumerate(rows)]
+    det = 1
+
+    for col in range(d):
+        pivot = next((r for r in range(col, d) if aug[r][col] != 0), None)
+        if pivot is None:
+            return 0, None
+        if pivot != col:
+            aug[col], aug[pivot] = aug[pivot], aug[col]
+            det = -det
+        pivot_val = aug[col][col]
+        det = (det * pivot_val) % p
+        pivot_inv = pow(pivot_val, -1, p)
+        aug[col] = [(v * pivot_inv) % p for v in aug[col]]
+        for r in range(d):
+            factor = aug[r][col]
+            if r != col and factor:
+                aug[r] = [(v - factor * pv) % p for v, pv in zip(aug[r], aug[col])]
+
+    return det % p, [row[d:] for row in aug]
+
+def _crt_2_13(a2: int, a13: int) -> int:
+    """Théorème des restes chinois : x ≡ a2 (mod 2) et x ≡ a13 (mod 13) → x mod 26."""
+    # 13 ≡ 1 (mod 2), donc x = a13 + 13 * ((a2 - a13) mod 2)
+    return (a13 + 13 * ((a2 - a13) % 2)) % MODULE
+
 def get_modular_inverse_matrix(matrix: np.ndarray, d: int) -> np.ndarray:
     """
     Calcule l'inverse de la matrice modulo 26.
     Inclut la vérification d'inversibilité, solution à la Faible Clé.
+
+    Calcul exact en entiers pour toute taille 'd' : Gauss-Jordan modulo 2
+    et modulo 13 (corps finis), puis recombinaison par le théorème des
+    restes chinois (26 = 2 x 13). Aucun flottant, donc aucune erreur d'arrondi.
     """
-    m = 26
-    
-    # Étape 1: Calcul du Déterminant Modulo 26
-    det = int(round(np.linalg.det(matrix))) % m
+    rows = [[int(v) for v in row] for row in np.asarray(matrix).reshape(d, d).tolist()]
 
-    # Étape 2: Calcul de l'Inverse Modulaire du Déterminant
-    det_inv = mod_inverse(det, m)
-    if det_inv is None:
+    det_2, inverse_2 = _gauss_jordan_mod_prime(rows, 2)
+    det_13, inverse_13 = _gauss_jordan_mod_prime(rows, 13)
+
+    if inverse_2 is None or inverse_13 is None:
+        det = _crt_2_13(det_2, det_13)
         raise ValueError(
             f"La matrice de clé n'est pas inversible mod 26. "
             f"Déterminant = {det}. gcd({det}, 26) != 1. "
             f"Chiffrement/Déchiffrement impossible."
         )
 
-    # Étape 3: Calcul de la Matrice Adjointe (Adj(K))
-    if d == 2:
-        # Adj(K) pour 2x2: [[d, -b], [-c, a]]
-        a, b = matrix[0, 0], matrix[0, 1]
-        c, d_val = matrix[1, 0], matrix[1, 1]
-        adjugate_matrix = np.array([
-            [d_val, -b],
-            [-c, a]
-        ])
-    elif d == 3:
-        # Adj(K) pour 3x3: Matrice des cofacteurs transposée
-        cofactors = np.zeros((3, 3), dtype=int)
-        for i in range(3):
-            for j in range(3):
-                # Calcul du mineur (déterminant de la sous-matrice 2x2)
-                # np.delete supprime la ligne i et la colonne j
-                minor_matrix = np.delete(np.delete(matrix, i, axis=0), j, axis=1)
-                minor_det = int(round(np.linalg.det(minor_matrix)))
-                
-                # Le cofacteur Cij est (-1)^(i+j) * det(Mineur)
-                cofactor = ((-1)**(i + j)) * minor_det
-                cofactors[i, j] = cofactor
-        
-        # L'adjointe est la transposée de la matrice des cofacteurs
-        adjugate_matrix = cofactors.T
-    else:
-        # Seules les tailles 2x2 et 3x3 sont gérées ici.
-        raise ValueError("Taille de matrice non supportée pour l'inverse modulaire.")
-
-    # Étape 4: Calcul de K^(-1) = det_inv * Adj(K) mod 26
-    inverse_matrix = (det_inv * adjugate_matrix) % m
-    inverse_matrix = np.round(inverse_matrix).astype(int)
-    
-    # Correction des valeurs négatives si le modulo a laissé des -x
-    inverse_matrix[inverse_matrix < 0] += m
-    
+    inverse_matrix = np.array(
+        [[_crt_2_13(inverse_2[i][j], inverse_13[i][j]) for j in range(d)] for i in range(d)],
+        dtype=int
+    )
     return inverse_matrix
 
+def compile_key(key: str, d: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Construit (matrice clé, matrice inverse) pour une clé donnée. Le résultat est
+    mis en cache avec la clé compilée (voir registry.py) : valider puis déchiffrer
+    avec la même clé ne coûte qu'une recherche.
+    Les matrices retournées sont en lecture seule car partagées par le cache.
+    """
+    key_matrix = get_key_matrix(key, d)
+    inverse_matrix = get_modular_inverse_matrix(key_matrix, d)
+    key_matrix.flags.writeable = False
+    inverse_matrix.flags.writeable = False
+    return key_matrix, inverse_matrix
+
+def _apply_matrix(numbers: List[int], matrix: np.ndarray, d: int) -> List[int]:
+    """Multiplie chaque bloc de 'd' nombres par la matrice (mod 26), en une seule opération."""
+    if not numbers:
+        return []
+    blocks = np.array(numbers, dtype=np.int64).reshape(-1, d)
+    return ((blocks @ matrix.T) % MODULE).ravel().tolist()
+
 # --- Fonctions pour l'affichage (Solution à la Faible Présentation) ---
 # Note: Celles-ci ne seront pas appelées par l'API, mais conservées pour la complétude.
 def print_matrix(title: str, matrix: np.ndarray):
@@ -124,9 +158,9 @@ def print_matrix(title: str, matrix: np.ndarray):
 
 # --- Fonctions principales du chiffrement de Hill ---
 
-def encrypt_hill(plaintext: str, key_matrix: np.ndarray, d: int) -> str:
-    """Processus de chiffrement avec gestion du bourrage."""
-    
+def prepare_plaintext(plaintext: str, d: int) -> List[int]:
+    """Nettoyage du message puis bourrage avec 'X' jusqu'à un multiple de 'd'."""
+
     # 1. Nettoyage du message
     cleaned_text = "".join(c for c in plaintext.upper() if c.isalpha())
     plain_numbers = text_to_numbers(cleaned_text)
@@ -137,32 +171,29 @@ def encrypt_hill(plaintext: str, key_matrix: np.ndarray, d: int) -> str:
     
     if padding_needed > 0:
         plain_numbers.extend([ord(padding_char) - ord('A')] * padding_needed)
+    return plain_numbers
 
-    ciphertext = []
-    
-    for i in range(0, len(plain_numbers), d):
-        block_numbers = np.array(plain_numbers[i:i+d])
-        encrypted_numbers = (key_matrix @ block_numbers) % 26
-        ciphertext.extend(encrypted_numbers.tolist())
+def prepare_ciphertext(ciphertext: str, d: int) -> List[int]:
+    """Un bloc incomplet en fin de texte est ignoré (il ne peut pas être déchiffré)."""
+    cipher_numbers = text_to_numbers(ciphertext)
+    return cipher_numbers[:len(cipher_numbers) - len(cipher_numbers) % d]
+
+def encrypt_hill(plaintext: str, key_matrix: np.ndarray, d: int) -> str:
+    """Processus de chiffrement avec gestion du bourrage."""
+    plain_numbers = prepare_plaintext(plaintext, d)
+    ciphertext = _apply_matrix(plain_numbers, key_matrix, d)
 
     return numbers_to_text(ciphertext)
 
-def decrypt_hill(ciphertext: str, key_matrix: np.ndarray, d: int) -> str:
+def decrypt_hill(ciphertext: str, key_matrix: np.ndarray, d: int, inverse_key: Optional[np.ndarray] = None) -> str:
     """Processus de déchiffrement."""
     
-    try:
+    if inverse_key is None:
+        # Lève une ValueError si la clé n'est pas inversible
         inverse_key = get_modular_inverse_matrix(key_matrix, d)
-    except ValueError as e:
-        # Propager l'erreur si la clé n'est pas inversible
-        raise e
-
-    cipher_numbers = text_to_numbers(ciphertext)
-    plaintext_numbers = []
 
-    for i in range(0, len(cipher_numbers), d):
-        block_numbers = np.array(cipher_numbers[i:i+d])
-        decrypted_numbers = (inverse_key @ block_numbers) % 26
-        plaintext_numbers.extend(decrypted_numbers.tolist())
+    cipher_numbers = prepare_ciphertext(ciphertext, d)
+    plaintext_numbers = _apply_matrix(cipher_numbers, inverse_key, d)
 
     plaintext_full = numbers_to_text(plaintext_numbers)
     
@@ -175,26 +206,16 @@ def encrypt(plain_text: str, key: str, size: int) -> str:
     Wrapper pour le chiffrement Hill.
     Prend une chaîne de clé et une taille, crée la matrice et chiffre.
     """
-    try:
-        key_matrix = get_key_matrix(key, size)
-        # Vérification de l'inversibilité ici pour échouer tôt
-        get_modular_inverse_matrix(key_matrix, size) 
-        return encrypt_hill(plain_text, key_matrix, size)
-    except ValueError as e:
-        # Transmettre l'erreur (par ex. clé non inversible) à l'API
-        raise e
+    # Clé non inversible : ValueError transmise à l'API
+    return registry.compile_cipher("hill", {"key": key, "size": size}).encrypt(plain_text)
 
 def decrypt(cipher_text: str, key: str, size: int) -> str:
     """
     Wrapper pour le déchiffrement Hill.
     Prend une chaîne de clé et une taille, crée la matrice et déchiffre.
     """
-    try:
-        key_matrix = get_key_matrix(key, size)
-        return decrypt_hill(cipher_text, key_matrix, size)
-    except ValueError as e:
-        # Transmettre l'erreur (par ex. clé non inversible) à l'API
-        raise e
+    # Clé non inversible : ValueError transmise à l'API
+    return registry.compile_cipher("hill", {"key": key, "size": size}).decrypt(cipher_text)
 
 def get_flaws() -> Dict[str, str]:
     """
@@ -204,4 +225,105 @@ def get_flaws() -> Dict[str, str]:
         "flaw": "Attaque par Texte Clair Connu (Known-Plaintext Attack)",
         "description": "Le chiffrement de Hill est linéaire. Si un attaquant connaît 'd*d' blocs de texte clair et leur chiffré correspondant (où 'd' est la taille de la matrice), il peut mettre en place un système d'équations linéaires pour résoudre et trouver la matrice clé. Pour une matrice 2x2, seulement 4 caractères (2 paires) sont nécessaires.",
         "solution": "La faiblesse est la linéarité. Les chiffrements modernes comme AES introduisent de la non-linéarité (via les S-boxes) et des tours multiples pour empêcher ce type d'attaque algébrique."
-    }
\ No newline at end of file
+    }
+
+
+# --- Enregistrement dans le registre des algorithmes ---
+
+class CompiledHill(registry.CompiledCipher):
+    """Matrice clé et matrice inverse calculées une seule fois pour la clé."""
+
+    method = "hill"
+
+    def __init__(self, key: str, size: int):
+        self.size = size
+        self.key_matrix, self.inverse_matrix = compile_key(key, size)
+
+    def encrypt(self, text: str) -> str:
+        return encrypt_hill(text, self.key_matrix, self.size)
+
+    def decrypt(self, text: str) -> str:
+        return decrypt_hill(text, self.key_matrix, self.size, self.inverse_matrix)
+
+    # Lots : les blocs de tous les textes sont multipliés en une seule opération
+    def encrypt_many(self, texts: Iterable[str]) -> List[str]:
+        return self._apply_many([prepare_plaintext(text, self.size) for text in texts], self.key_matrix)
+
+    def decrypt_many(self, texts: Iterable[str]) -> List[str]:
+        return self._apply_many([prepare_ciphertext(text, self.size) for text in texts], self.inverse_matrix)
+
+    def _apply_many(self, prepared: List[List[int]], matrix: np.ndarray) -> List[str]:
+        output = _apply_matrix([n for numbers in prepared for n in numbers], matrix, self.size)
+        results, start = [], 0
+        for numbers in prepared:
+            results.append(numbers_to_text(output[start:start + len(numbers)]))
+            start += len(numbers)
+        return results
+
+    # Déroulé bloc par bloc : produits bruts (avant mod 26) calculés en une seule opération
+    def trace_encrypt(self, text: str) -> registry.Trace:
+        return self._trace(prepare_plaintext(text, self.size), self.key_matrix)
+
+    def trace_decrypt(self, text: str) -> registry.Trace:
+        return self._trace(prepare_ciphertext(text, self.size), self.inverse_matrix)
+
+    def _trace(self, numbers: List[int], matrix: np.ndarray) -> registry.Trace:
+        prepared = numbers_to_text(numbers)
+        blocks = [prepared[i:i + self.size] for i in range(0, len(prepared), self.size)]
+        vectors = np.array(numbers, dtype=np.int64).reshape(-1, self.size)
+        raw = vectors @ matrix.T
+
+        def units() -> Iterator[Dict[str, Any]]:
+            for block, vector, raw_row in zip(blocks, vectors.tolist(), raw.tolist()):
+                result = [n % MODULE for n in raw_row]
+                yield {"input": block, "vector": vector, "raw": raw_row, "result": result,
+                       "output": numbers_to_text(result)}
+
+        return registry.Trace(prepared, blocks, units())
+
+    def encryptor(self) -> "HillStream":
+        return HillStream(self.key_matrix, self.size, pad=True)
+
+    def decryptor(self) -> "HillStream":
+        return HillStream(self.inverse_matrix, self.size, pad=False)
+
+
+class HillStream(registry.StreamTransform):
+    """
+    Multiplication par blocs sur un flux : les lettres d'un bloc incomplet attendent
+    le morceau suivant. À 'finalize', le bloc est complété par des 'X' (chiffrement)
+    ou ignoré (déchiffrement), comme dans 'encrypt_hill' / 'decrypt_hill'.
+    """
+
+    def __init__(self, matrix: np.ndarray, d: int, pad: bool):
+        self._matrix = matrix
+        self._d = d
+        self._pad = pad
+        self._pending: List[int] = []
+
+    def update(self, chunk: str) -> str:
+        numbers = self._pending + text_to_numbers("".join(c for c in chunk.upper() if c.isalpha()))
+        block_end = len(numbers) - len(numbers) % self._d
+        self._pending = numbers[block_end:]
+        return numbers_to_text(_apply_matrix(numbers[:block_end], self._matrix, self._d))
+
+    def finalize(self) -> str:
+        numbers, self._pending = self._pending, []
+        if not numbers or not self._pad:
+            return ""
+        numbers = numbers + [ord('X') - ord('A')] * (self._d - len(numbers))
+        return numbers_to_text(_apply_matrix(numbers, self._matrix, self._d))
+
+
+class HillCipher(registry.Cipher):
+    name = "hill"
+
+    def normalize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = registry.require_str(params, "key", "Hill")
+        size = registry.require_int(params, "size", "Hill")
+        if not 2 <= size <= MAX_SIZE:
+            raise ValueError(f"Size for Hill must be between 2 and {MAX_SIZE}.")
+        return {"key": key, "size": size}
+
+    def build(self, params: Dict[str, Any]) -> CompiledHill:
+        return CompiledHill(params["key"], params["size"])
@@ -1,6 +1,8 @@
 import sys
 import re
-from typing import List, Tuple, Dict
+from typing import Any, Iterable, Iterator, List, Tuple, Dict, Optional
+
+from . import registry
 
 # --- Logique du nouveau fichier ---
 
@@ -67,8 +69,19 @@ def creer_grille(cle: str, taille: int) -> List[str]:
             deja_vu += c
     return grille
 
+# Grille et table des positions (mises en cache avec la clé compilée, voir registry.py)
+def compiler_grille(cle: str, taille: int) -> Tuple[Tuple[str, ...], Dict[str, Tuple[int, int]]]:
+    grille = tuple(creer_grille(cle, taille))
+    positions = {c: divmod(i, taille) for i, c in enumerate(grille)}
+    if taille == 5:
+        positions['J'] = positions['I']
+    return grille, positions
+
 # Trouver position dans la grille
-def position(grille: List[str], lettre: str, taille: int) -> Tuple[int, int]:
+def position(grille: List[str], lettre: str, taille: int, positions: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[int, int]:
+    if positions is not None and lettre in positions:
+        return positions[lettre]
+
     # Gérer le cas où 'J' est dans le texte mais la grille est 5x5
     if lettre == 'J' and taille == 5:
         lettre = 'I'
@@ -97,9 +110,9 @@ def paires(texte: str) -> List[Tuple[str, str]]:
     return resultat
 
 # Chiffrer une paire
-def chiffrer(grille: List[str], a: str, b: str, taille: int) -> str:
-    r1, c1 = position(grille, a, taille)
-    r2, c2 = position(grille, b, taille)
+def chiffrer(grille: List[str], a: str, b: str, taille: int, positions: Optional[Dict[str, Tuple[int, int]]] = None) -> str:
+    r1, c1 = position(grille, a, taille, positions)
+    r2, c2 = position(grille, b, taille, positions)
     if r1 == r2:
         return grille[r1 * taille + (c1 + 1) % taille] + grille[r2 * taille + (c2 + 1) % taille]
     elif c1 == c2:
@@ -108,9 +121,9 @@ def chiffrer(grille: List[str], a: str, b: str, taille: int) -> str:
         return grille[r1 * taille + c2] + grille[r2 * taille + c1]
 
 # Déchiffrer une paire
-def dechiffrer(grille: List[str], a: str, b: str, taille: int) -> str:
-    r1, c1 = position(grille, a, taille)
-    r2, c2 = position(grille, b, taille)
+def dechiffrer(grille: List[str], a: str, b: str, taille: int, positions: Optional[Dict[str, Tuple[int, int]]] = None) -> str:
+    r1, c1 = position(grille, a, taille, positions)
+    r2, c2 = position(grille, b, taille, positions)
     if r1 == r2:
         return grille[r1 * taille + (c1 - 1) % taille] + grille[r2 * taille + (c2 - 1) % taille]
     elif c1 == c2:
@@ -118,6 +131,15 @@ def dechiffrer(grille: List[str], a: str, b: str, taille: int) -> str:
     else:
         return grille[r1 * taille + c2] + grille[r2 * taille + c1]
 
+# Règle appliquée à une paire (sens = 1 pour chiffrer, -1 pour déchiffrer)
+def regle(r1: int, c1: int, r2: int, c2: int, taille: int, sens: int = 1) -> Tuple[str, Tuple[int, int], Tuple[int, int]]:
+    if r1 == r2:
+        return "Same Row", (r1, (c1 + sens) % taille), (r2, (c2 + sens) % taille)
+    elif c1 == c2:
+        return "Same Column", ((r1 + sens) % taille, c1), ((r2 + sens) % taille, c2)
+    else:
+        return "Rectangle", (r1, c2), (r2, c1)
+
 # Analyse pédagogique des failles
 def get_flaws(cle: str, taille: int) -> List[str]:
     cle = cle.upper()
@@ -140,40 +162,132 @@ def encrypt(plain_text: str, key: str, size: int = 5) -> str:
     Wrapper pour le chiffrement Playfair.
     'size' est le nouveau paramètre (5 ou 6).
     """
-    texte_nettoye = nettoyer(plain_text, size)
-    grille = creer_grille(key, size)
-    liste_paires = paires(texte_nettoye)
-
-    chiffre = ""
-    for a, b in liste_paires:
-        chiffre += chiffrer(grille, a, b, size)
-    return chiffre
+    return registry.compile_cipher("playfair", {"key": key, "size": size}).encrypt(plain_text)
 
 def decrypt(cipher_text: str, key: str, size: int = 5) -> str:
     """
     Wrapper pour le déchiffrement Playfair.
     'size' est le nouveau paramètre (5 ou 6).
     """
-    # Le texte chiffré ne doit pas contenir d'espaces
-    texte_chiffre_nettoye = nettoyer(cipher_text, size)
-    grille = creer_grille(key, size)
-    
-    # Doit former des paires du texte chiffré
-    # Note : la fonction 'paires' gère les 'X' pour le chiffrement,
-    # pour le déchiffrement, nous supposons des paires valides.
-    liste_chiffre = []
-    i = 0
-    while i < len(texte_chiffre_nettoye):
-        # S'assurer qu'il y a une paire
-        if i + 1 < len(texte_chiffre_nettoye):
-            liste_chiffre.append((texte_chiffre_nettoye[i], texte_chiffre_nettoye[i+1]))
-            i += 2
-        else:
-            # Caractère isolé à la fin ? Ignorer ou gérer.
-            # Pour la robustesse, nous l'ignorons.
-            i += 1 
-
-    dechiffre = ""
-    for a, b in liste_chiffre:
-        dechiffre += dechiffrer(grille, a, b, size)
-    return dechiffre
+    return registry.compile_cipher("playfair", {"key": key, "size": size}).decrypt(cipher_text)
+
+
+# --- Enregistrement dans le registre des algorithmes ---
+
+class CompiledPlayfair(registry.CompiledCipher):
+    """Grille et table des positions construites une seule fois pour la clé."""
+
+    method = "playfair"
+
+    def __init__(self, key: str, size: int):
+        self.size = size
+        self.grid, self.positions = compiler_grille(key, size)
+
+    def encrypt(self, text: str) -> str:
+        texte_nettoye = nettoyer(text, self.size)
+        return "".join(chiffrer(self.grid, a, b, self.size, self.positions) for a, b in paires(texte_nettoye))
+
+    def decrypt(self, text: str) -> str:
+        # Le texte chiffré ne doit pas contenir d'espaces
+        texte_chiffre_nettoye = nettoyer(text, self.size)
+        # Paires consécutives ; un caractère isolé à la fin est ignoré
+        return "".join(
+            dechiffrer(self.grid, a, b, self.size, self.positions)
+            for a, b in zip(texte_chiffre_nettoye[0::2], texte_chiffre_nettoye[1::2])
+        )
+
+
+    # Déroulé digramme par digramme (positions, règle, nouvelles positions)
+    def trace_encrypt(self, text: str) -> registry.Trace:
+        texte_nettoye = nettoyer(text, self.size)
+        digrammes = paires(texte_nettoye)
+        return registry.Trace(texte_nettoye, [a + b for a, b in digrammes], self._trace(digrammes, 1))
+
+    def trace_decrypt(self, text: str) -> registry.Trace:
+        texte_chiffre_nettoye = nettoyer(text, self.size)
+        digrammes = list(zip(texte_chiffre_nettoye[0::2], texte_chiffre_nettoye[1::2]))
+        return registry.Trace(texte_chiffre_nettoye, [a + b for a, b in digrammes], self._trace(digrammes, -1))
+
+    def _trace(self, digrammes: Iterable[Tuple[str, str]], sens: int) -> Iterator[Dict[str, Any]]:
+        for a, b in digrammes:
+            r1, c1 = position(self.grid, a, self.size, self.positions)
+            r2, c2 = position(self.grid, b, self.size, self.positions)
+            nom, (nr1, nc1), (nr2, nc2) = regle(r1, c1, r2, c2, self.size, sens)
+            yield {
+                "input": a + b,
+                "pos1": [r1, c1],
+                "pos2": [r2, c2],
+                "rule": nom,
+                "new_pos1": [nr1, nc1],
+                "new_pos2": [nr2, nc2],
+                "output": self.grid[nr1 * self.size + nc1] + self.grid[nr2 * self.size + nc2],
+            }
+
+    def encryptor(self) -> "PlayfairEncryptor":
+        return PlayfairEncryptor(self)
+
+    def decryptor(self) -> "PlayfairDecryptor":
+        return PlayfairDecryptor(self)
+
+
+class PlayfairEncryptor(registry.StreamTransform):
+    """Chiffrement par morceaux : la dernière lettre non appariée attend le morceau suivant."""
+
+    def __init__(self, compiled: CompiledPlayfair):
+        self._compiled = compiled
+        self._pending = ""
+
+    def update(self, chunk: str) -> str:
+        c = self._compiled
+        texte = self._pending + nettoyer(chunk, c.size)
+        sortie = []
+        i = 0
+        # Même découpage que 'paires', sans compléter la dernière lettre
+        while i + 1 < len(texte):
+            a, b = texte[i], texte[i + 1]
+            if a == b:
+                sortie.append(chiffrer(c.grid, a, 'X', c.size, c.positions))
+                i += 1
+            else:
+                sortie.append(chiffrer(c.grid, a, b, c.size, c.positions))
+                i += 2
+        self._pending = texte[i:]
+        return "".join(sortie)
+
+    def finalize(self) -> str:
+        c = self._compiled
+        texte, self._pending = self._pending, ""
+        return chiffrer(c.grid, texte, 'X', c.size, c.positions) if texte else ""
+
+
+class PlayfairDecryptor(registry.StreamTransform):
+    """Déchiffrement par morceaux : un caractère isolé est reporté sur le morceau suivant."""
+
+    def __init__(self, compiled: CompiledPlayfair):
+        self._compiled = compiled
+        self._pending = ""
+
+    def update(self, chunk: str) -> str:
+        texte = self._pending + nettoyer(chunk, self._compiled.size)
+        pair_end = len(texte) - len(texte) % 2
+        self._pending = texte[pair_end:]
+        return self._compiled.decrypt(texte[:pair_end])
+
+    def finalize(self) -> str:
+        # Comme 'decrypt', un caractère isolé à la fin est ignoré
+        self._pending = ""
+        return ""
+
+
+class PlayfairCipher(registry.Cipher):
+    name = "playfair"
+
+    def normalize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = registry.require_str(params, "key", "Playfair")
+        size = registry.require_int(params, "size", "Playfair")
+        if size not in [5, 6]:
+            raise ValueError("Size for Playfair must be 5 or 6.")
+        return {"key": key, "size": size}
+
+    def build(self, params: Dict[str, Any]) -> CompiledPlayfair:
+        return CompiledPlayfair(params["key"], params["size"])
@@ -0,0 +1,193 @@
+# backend/app/security/crypto_algorithms/registry.py
+# Registre unique des algorithmes de chiffrement.
+#
+# Chaque algorithme déclare une sous-classe de 'Cipher' (dans son propre module) avec
+# un 'name' : elle est enregistrée automatiquement. 'Cipher.compile(params)' valide les
+# paramètres et retourne un 'CompiledCipher' (clé déjà analysée : grille, matrices...).
+# Les objets compilés sont partagés via un cache LRU borné indexé par (méthode, paramètres),
+# de sorte qu'une clé réutilisée ne coûte qu'une recherche.
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+COMPILED_CACHE_SIZE = 512
+
+
+class StreamTransform:
+    """
+    Chiffrement (ou déchiffrement) incrémental : 'update(morceau)' retourne la sortie
+    déjà calculable, 'finalize()' le reste (bourrage, lettre en attente...).
+    L'état nécessaire entre deux morceaux est conservé par l'objet.
+    """
+
+    def update(self, chunk: str) -> str:
+        raise NotImplementedError
+
+    def finalize(self) -> str:
+        return ""
+
+
+class _BufferedStream(StreamTransform):
+    """Repli pour les algorithmes sans mode flux : tout est traité à 'finalize'."""
+
+    def __init__(self, func):
+        self._func = func
+        self._parts: List[str] = []
+
+    def update(self, chunk: str) -> str:
+        self._parts.append(chunk)
+        return ""
+
+    def finalize(self) -> str:
+        text, self._parts = "".join(self._parts), []
+        return self._func(text)
+
+
+class Trace(NamedTuple):
+    """
+    Déroulé d'un chiffrement, produit par le même calcul que 'encrypt' / 'decrypt' :
+    texte préparé, découpage en blocs (si l'algorithme en a) puis une unité par
+    lettre, digramme ou bloc traité, avec sa sortie ('output').
+    """
+
+    prepared: Optional[str]
+    blocks: Optional[List[str]]
+    units: Iterator[Dict[str, Any]]
+
+
+class CompiledCipher:
+    """Clé compilée d'un algorithme : chiffre et déchiffre sans ré-analyser la clé."""
+
+    method: str = ""
+
+    def encrypt(self, text: str) -> str:
+        raise NotImplementedError
+
+    def decrypt(self, text: str) -> str:
+        raise NotImplementedError
+
+    def encrypt_many(self, texts: Iterable[str]) -> List[str]:
+        return [self.encrypt(text) for text in texts]
+
+    def decrypt_many(self, texts: Iterable[str]) -> List[str]:
+        return [self.decrypt(text) for text in texts]
+
+    def trace_encrypt(self, text: str) -> Trace:
+        raise NotImplementedError
+
+    def trace_decrypt(self, text: str) -> Trace:
+        raise NotImplementedError
+
+    def encryptor(self) -> StreamTransform:
+        return _BufferedStream(self.encrypt)
+
+    def decryptor(self) -> StreamTransform:
+        return _BufferedStream(self.decrypt)
+
+
+class Cipher:
+    """
+    Description d'un algorithme. Les sous-classes définissent 'name', 'normalize'
+    (validation + forme canonique des paramètres) et 'build' (construction de la clé).
+    """
+
+    name: str = ""
+    _registry: Dict[str, "Cipher"] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.name:
+            Cipher._registry[cls.name] = cls()
+
+    def normalize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Valide les paramètres (ValueError sinon) et ne garde que ceux de l'algorithme."""
+        raise NotImplementedError
+
+    def build(self, params: Dict[str, Any]) -> CompiledCipher:
+        """Construit la clé compilée à partir de paramètres déjà normalisés."""
+        raise NotImplementedError
+
+    def compile(self, params: Dict[str, Any]) -> CompiledCipher:
+        return compile_cipher(self.name, params)
+
+
+# --- Helpers de validation partagés par les algorithmes ---
+
+def require_int(params: Dict[str, Any], name: str, label: str) -> int:
+    value = params.get(name)
+    if value is None or isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"The '{name}' parameter (integer) is required for {label}.")
+    return value
+
+
+def require_str(params: Dict[str, Any], name: str, label: str) -> str:
+    value = params.get(name)
+    if value is None or not isinstance(value, str):
+        raise ValueError(f"The '{name}' parameter (string) is required for {label}.")
+    return value
+
+
+def field_params(**fields: Any) -> Dict[str, Any]:
+    """Paramètres issus de champs optionnels d'une requête (les champs absents sont ignorés)."""
+    return {name: value for name, value in fields.items() if value is not None}
+
+
+# --- Registre et cache des clés compilées ---
+
+_cache: "OrderedDict[Tuple[str, Tuple], CompiledCipher]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_builtins_loaded = False
+
+
+def _load_builtin_ciphers():
+    """Importe les modules d'algorithmes fournis pour déclencher leur enregistrement."""
+    global _builtins_loaded
+    if not _builtins_loaded:
+        from . import caesar, playfair, hill  # noqa: F401
+        _builtins_loaded = True
+
+
+def available_methods() -> List[str]:
+    _load_builtin_ciphers()
+    return sorted(Cipher._registry)
+
+
+def get_cipher(method: str) -> Cipher:
+    _load_builtin_ciphers()
+    cipher = Cipher._registry.get(method)
+    if cipher is None:
+        methods = ", ".join(f"'{m}'" for m in available_methods())
+        raise ValueError(f"Encryption method '{method}' not supported. Must be one of {methods}.")
+    return cipher
+
+
+def compile_cipher(method: str, params: Optional[Dict[str, Any]]) -> CompiledCipher:
+    """
+    Retourne la clé compilée pour (méthode, paramètres), depuis le cache si possible.
+    Lève ValueError si la méthode est inconnue ou les paramètres invalides.
+    """
+    cipher = get_cipher(method)
+    normalized = cipher.normalize(params or {})
+    cache_key = (method, tuple(sorted(normalized.items())))
+
+    with _cache_lock:
+        compiled = _cache.get(cache_key)
+        if compiled is not None:
+            _cache.move_to_end(cache_key)
+            _stats["hits"] += 1
+            return compiled
+        _stats["misses"] += 1
+
+    compiled = cipher.build(normalized)
+    with _cache_lock:
+        _cache[cache_key] = compiled
+        while len(_cache) > COMPILED_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def cache_stats() -> Dict[str, int]:
+    with _cache_lock:
+        return {**_stats, "size": len(_cache), "max_size": COMPILED_CACHE_SIZE}
@@ -0,0 +1,223 @@
+# backend/app/security/crypto_algorithms/steps.py
+# Étapes de visualisation construites à partir du déroulé réel d'un chiffrement
+# ('trace_encrypt' / 'trace_decrypt' des objets compilés) : le calcul est fait une
+# seule fois par l'algorithme, ce module ne fait que mettre en forme chaque unité.
+
+from typing import Any, Dict, Iterator, Optional, Type
+
+from . import registry
+
+Step = Dict[str, Any]
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _step(step_title: str, description: str, data: dict) -> Step:
+    return {"step_title": step_title, "description": description, "data": data}
+
+
+class StepBuilder:
+    """
+    Étapes d'un chiffrement (ou déchiffrement) pour un objet compilé.
+    Les étapes sont produites une à une ; 'final_text' et 'prepared_text' sont
+    connus une fois le générateur épuisé. 'matrix' est la matrice commune à toutes
+    les étapes (Playfair / Hill), envoyée une seule fois par le mode flux.
+    """
+
+    algorithm = ""
+
+    def __init__(self, compiled: Optional[registry.CompiledCipher], text: str,
+                 key: Optional[str] = None, shift: Optional[int] = None, decrypt: bool = False):
+        self.compiled = compiled
+        self.text = text
+        self.key = key
+        self.shift = shift
+        self.decrypt = decrypt
+        self.matrix: Optional[list] = None
+        self.final_text = ""
+        self.prepared_text: Optional[str] = None
+
+    @property
+    def verb(self) -> str:
+        return "Decrypt" if self.decrypt else "Encrypt"
+
+    def trace(self) -> registry.Trace:
+        if self.decrypt:
+            return self.compiled.trace_decrypt(self.text)
+        return self.compiled.trace_encrypt(self.text)
+
+    def _steps(self) -> Iterator[Step]:
+        return iter(())
+
+    def steps(self) -> Iterator[Step]:
+        """Toutes les étapes, y compris l'étape finale (le résultat n'est connu qu'à la fin)."""
+        yield from self._steps()
+
+        # --- Final Step ---
+        yield _step(
+            "Final Result",
+            f"The {'decryption' if self.decrypt else 'encryption'} process is complete.",
+            {
+                "original": self.text,
+                "prepared": self.prepared_text,
+                "final": self.final_text
+            }
+        )
+
+
+class CaesarSteps(StepBuilder):
+    algorithm = "caesar"
+
+    def _steps(self) -> Iterator[Step]:
+        shift = self.shift
+        direction = "shifted back" if self.decrypt else "shifted"
+        yield _step(
+            "Start: Input",
+            f"{'Decrypting' if self.decrypt else 'Encrypting'} '{self.text}' with a shift of {shift}.",
+            {"text": self.text, "shift": shift, "alphabet": ALPHABET}
+        )
+
+        output = []
+        for unit in self.trace().units:
+            char, shifted_char = unit["input"], unit["output"]
+            if shifted_char is not None:
+                original_idx = ord(char.upper()) - ord('A')
+                shifted_idx = ord(shifted_char) - ord('A')
+                yield _step(
+                    f"Processing '{char}'",
+                    f"Letter '{char.upper()}' (index {original_idx}) {direction} by {shift} becomes '{shifted_char}' (index {shifted_idx}).",
+                    {"char": char.upper(), "idx": original_idx, "new_char": shifted_char, "new_idx": shifted_idx, "shift": shift, "alphabet": ALPHABET}
+                )
+                output.append(shifted_char)
+            else:
+                yield _step(
+                    f"Ignoring '{char}'",
+                    f"'{char}' is not an alphabet letter and remains unchanged.",
+                    {"char": char, "alphabet": ALPHABET}
+                )
+                output.append(char)
+        self.final_text = "".join(output)
+
+
+class PlayfairSteps(StepBuilder):
+    algorithm = "playfair"
+
+    def _steps(self) -> Iterator[Step]:
+        size = self.compiled.size
+        grid = list(self.compiled.grid)
+        matrix = self.matrix = [grid[i:i+size] for i in range(0, len(grid), size)]
+
+        yield _step(
+            f"Step 1: Generate {size}x{size} Key Matrix",
+            f"Using key '{self.key.upper()}' to generate the {size}x{size} matrix.",
+            {"key": self.key.upper(), "matrix": matrix, "size": size}
+        )
+
+        trace = self.trace()
+        self.prepared_text = trace.prepared
+        if self.decrypt:
+            description = "Ciphertext cleaned and uppercased, then split into digraphs (a trailing single letter is ignored)."
+        else:
+            description = f"Text cleaned, uppercased, 'J' becomes 'I' (if 5x5), split into digraphs. 'X' used for duplicates and padding."
+        yield _step(
+            "Step 2: Prepare Text",
+            description,
+            {"original": self.text, "prepared": trace.prepared, "digraphs": trace.blocks}
+        )
+
+        output = []
+        for i, unit in enumerate(trace.units):
+            (c1, c2), (r1, c1_col), (r2, c2_col) = unit["input"], unit["pos1"], unit["pos2"]
+            yield _step(
+                f"Step {3+i}: {self.verb} Digraph '{unit['input']}'",
+                f"'{c1}' at ({r1},{c1_col}) and '{c2}' at ({r2},{c2_col}). Applying '{unit['rule']}' rule gives '{unit['output']}'.",
+                {
+                    "matrix": matrix,
+                    "size": size,
+                    "digraph": unit["input"],
+                    "pos1": unit["pos1"],
+                    "pos2": unit["pos2"],
+                    "rule": unit["rule"],
+                    "new_pos1": unit["new_pos1"],
+                    "new_pos2": unit["new_pos2"],
+                    "new_digraph": unit["output"]
+                }
+            )
+            output.append(unit["output"])
+        self.final_text = "".join(output)
+
+
+class HillSteps(StepBuilder):
+    algorithm = "hill"
+
+    def _steps(self) -> Iterator[Step]:
+        size = self.compiled.size
+        key_matrix = self.compiled.key_matrix.tolist()
+        if self.decrypt:
+            matrix = self.matrix = self.compiled.inverse_matrix.tolist()
+            yield _step(
+                "Step 1: Compute Inverse Key Matrix (K⁻¹)",
+                f"The key string '{self.key.upper()}' becomes a {size}x{size} matrix K (A=0...); its inverse modulo 26 is used to decrypt.",
+                {"key": self.key.upper(), "matrix": matrix, "key_matrix": key_matrix}
+            )
+        else:
+            matrix = self.matrix = key_matrix
+            yield _step(
+                "Step 1: Generate Key Matrix (K)",
+                f"The key string '{self.key.upper()}' becomes a {size}x{size} matrix (A=0...).",
+                {"key": self.key.upper(), "matrix": matrix}
+            )
+
+        trace = self.trace()
+        self.prepared_text = trace.prepared
+        if self.decrypt:
+            description = f"Ciphertext cleaned and uppercased; an incomplete last block of fewer than {size} letters is ignored."
+        else:
+            description = f"Text cleaned, uppercased, and padded with 'X' to be a multiple of {size}."
+        yield _step(
+            "Step 2: Prepare Text",
+            description,
+            {"original": self.text, "prepared": trace.prepared}
+        )
+
+        if self.decrypt:
+            description = "Block '{block}' (vector C) is multiplied by the inverse key matrix K⁻¹: P = (K⁻¹ * C) mod 26."
+        else:
+            description = "Block '{block}' (vector P) is multiplied by the key matrix K: C = (K * P) mod 26."
+        output = []
+        for b, unit in enumerate(trace.units):
+            block, vector, raw = unit["input"], unit["vector"], unit["raw"]
+            calculation_steps = ["\n".join(
+                f"Row {r}: ({' + '.join(f'{kr}*{pv}' for kr, pv in zip(matrix[r], vector))}) = {raw[r]}"
+                for r in range(size)
+            )]
+            calculation_steps.append(f"Result Vector (Raw): {raw}")
+            calculation_steps.append(f"Result Vector (mod 26): {unit['result']}")
+            calculation_steps.append(f"{'Decrypted' if self.decrypt else 'Encrypted'} Block: '{unit['output']}'")
+
+            yield _step(
+                f"Step {3 + b}: {self.verb} Block '{block}'",
+                description.format(block=block),
+                {
+                    "matrix": matrix,
+                    "block": block,
+                    "vector": vector,
+                    "calculation_steps": calculation_steps,
+                    "result_vector": unit["result"],
+                    "new_block": unit["output"]
+                }
+            )
+            output.append(unit["output"])
+        self.final_text = "".join(output)
+
+
+BUILDERS: Dict[str, Type[StepBuilder]] = {
+    "caesar": CaesarSteps,
+    "playfair": PlayfairSteps,
+    "hill": HillSteps,
+}
+
+
+def builder_for(algorithm: str) -> Type[StepBuilder]:
+    """Constructeur d'étapes de l'algorithme ('StepBuilder' seul : uniquement l'étape finale)."""
+    return BUILDERS.get(algorithm, StepBuilder)
@@ -1,9 +1,17 @@
 # This is a new file you must create: backend/app/security/mitm_tools.py
 
 import hashlib
+from ..core import shared_state
 from ..core.supabase_client import supabase
 from typing import List, Dict, Any
 
+# Registre des écouteurs actifs, gardé dans l'état partagé (commun à tous les workers).
+# Invalidé par /mitm/start et /mitm/stop ; l'expiration couvre les changements faits
+# directement en base.
+LISTENERS_NAMESPACE = "mitm"
+LISTENERS_KEY = "listeners"
+LISTENERS_TTL_SECONDS = 10
+
 def hash_data(data: Any) -> str:
     """
     Simulates hashing for the MiTM demo.
@@ -13,15 +21,26 @@ def hash_data(data: Any) -> str:
 
 def get_listeners() -> List[str]:
     """
-    Fetches all active MiTM attacker usernames.
+    Fetches all active MiTM attacker usernames (from the shared registry when fresh).
     """
+    state = shared_state.get_state()
+    listeners = state.get(LISTENERS_NAMESPACE, LISTENERS_KEY)
+    if listeners is not None:
+        return listeners
     try:
         response = supabase.table("mitm_listeners").select("attacker_username").eq("status", "listening").execute()
-        if response.data:
-            return [row['attacker_username'] for row in response.data]
+        listeners = [row['attacker_username'] for row in response.data or []]
     except Exception as e:
         print(f"Error fetching MiTM listeners: {e}")
-    return []
+        return []
+    state.set(LISTENERS_NAMESPACE, LISTENERS_KEY, listeners, LISTENERS_TTL_SECONDS)
+    return listeners
+
+def invalidate_listeners():
+    """
+    Drops the shared registry so the next capture re-reads 'mitm_listeners'.
+    """
+    shared_state.get_state().delete(LISTENERS_NAMESPACE, LISTENERS_KEY)
 
 def capture_packet(packet_type: str, data: Dict[str, Any], listeners: List[str]):
     """
@@ -45,3 +64,27 @@ def capture_packet(packet_type: str, data: Dict[str, Any], listeners: List[str])
     except Exception as e:
         # We don't want to fail the main request if MiTM capture fails
         print(f"Error capturing MiTM packet: {e}")
+
+def capture_packets(packet_type: str, data_list: List[Dict[str, Any]], listeners: List[str]):
+    """
+    Batch version of capture_packet: one insert for every (packet, listener) pair.
+    """
+    if not listeners or not data_list:
+        return
+
+    try:
+        rows_to_insert = [
+            {
+                "target_attacker": listener_username,
+                "packet_type": packet_type,
+                "data": data
+            }
+            for data in data_list
+            for listener_username in listeners
+        ]
+
+        supabase.table("intercepted_packets").insert(rows_to_insert).execute()
+
+    except Exception as e:
+        # We don't want to fail the main request if MiTM capture fails
+        print(f"Error capturing MiTM packets: {e}")
@@ -2,7 +2,6 @@ import os
 import hashlib  # <-- IMPORTED
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
 from dotenv import load_dotenv
 
 from fastapi import Depends, HTTPException, status
@@ -50,6 +49,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     if 'id' in to_encode:
         to_encode['sub'] = str(to_encode['id'])
     
+    from jose import jwt  # Import différé : 'jose' (et 'cryptography') est long à charger
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -64,6 +64,23 @@ credentials_exception = HTTPException(
 
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_KEY")
 
+def decode_user_id(token: str) -> str:
+    """
+    Validates a token and returns the user ID it was issued for.
+    Used directly where no Authorization header is available (e.g. WebSockets).
+    """
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+
+    user_id: Optional[str] = payload.get("sub")
+    if user_id is None:
+        raise credentials_exception
+    return user_id
+
 def get_current_user_id(creds: HTTPAuthorizationCredentials = Depends(oauth2_scheme)) -> str:
     """
     Dependency to get the current user's ID from their token.
@@ -75,16 +92,7 @@ def get_current_user_id(creds: HTTPAuthorizationCredentials = Depends(oauth2_sch
     
     try:
         supabase.postgrest.auth(token)
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        
-        if user_id is None:
-            raise credentials_exception
-            
-        return user_id
-        
-    except JWTError:
-        raise credentials_exception
+        return decode_user_id(token)
     
     finally:
         supabase.postgrest.auth(original_auth)
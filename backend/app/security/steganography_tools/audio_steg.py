@@ -2,7 +2,7 @@
 import io
 from scipy.io import wavfile
 import numpy as np
-from typing import List
+from typing import Any, Dict, List, Tuple
 from ...models.schemas import StegoVisualizationStep
 
 # --- Utility Functions for LSB ---
@@ -21,33 +21,49 @@ def get_binary_repr_16bit(val: int) -> str:
         return format(val & 0xFFFF, '016b')
 
 
-# --- Steganography Functional Implementations (Existing/Unchanged) ---
+def _message_bits(encoded_message: str) -> np.ndarray:
+    """Bits (0/1) du message, dans l'ordre d'insertion."""
+    binary_message = ''.join(format(ord(char), '08b') for char in encoded_message)
+    return np.frombuffer(binary_message.encode('ascii'), dtype=np.uint8) - 48
 
-def encode_message(audio_bytes: bytes, secret_message: str) -> bytes:
-    """Hides a secret message within a WAV audio file using LSB."""
+
+def _bits_before_delimiter(lsb: np.ndarray, binary_delimiter: str) -> str:
+    """Flux de LSB (en texte) jusqu'à la première occurrence du délimiteur, lu par blocs croissants."""
+    binary_data = ""
+    position, step = 0, 4096
+    while position < len(lsb):
+        search_from = max(0, len(binary_data) - len(binary_delimiter) + 1)
+        binary_data += (lsb[position:position + step] + 48).tobytes().decode('ascii')
+        found = binary_data.find(binary_delimiter, search_from)
+        if found != -1:
+            return binary_data[:found]
+        position += step
+        step *= 2
+    return binary_data
+
+
+# --- Steganography Functional Implementations ---
+
+def load_samples(audio_bytes: bytes) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Décode le WAV : échantillons et fréquence d'échantillonnage (réutilisables)."""
     try:
         samplerate, data = wavfile.read(io.BytesIO(audio_bytes))
     except Exception as e:
         raise ValueError(f"Could not read WAV file. Is it a valid .wav format? Error: {e}")
+    return data, {"samplerate": int(samplerate)}
 
-    encoded_message = secret_message + "####"
-    binary_message = ''.join(format(ord(char), '08b') for char in encoded_message)
 
-    if len(binary_message) > data.size:
+def encode_samples(data: np.ndarray, samplerate: int, secret_message: str) -> bytes:
+    """Hides a secret message in already decoded WAV samples and returns the WAV bytes."""
+    bits = _message_bits(secret_message + "####")
+
+    if len(bits) > data.size:
         raise ValueError("Message is too long to be hidden in this audio file.")
 
-    flat_data = data.flatten().copy()
-    data_index = 0
+    flat_data = np.array(data).reshape(-1)
+    head = flat_data[:len(bits)]
+    flat_data[:len(bits)] = (head & ~np.ones(1, dtype=head.dtype)) | bits.astype(head.dtype)
 
-    for i in range(len(flat_data)):
-        if data_index < len(binary_message):
-            sample = flat_data[i]
-            new_sample = get_new_sample(sample, int(binary_message[data_index]))
-            flat_data[i] = new_sample
-            data_index += 1
-        else:
-            break
-    
     encoded_data = flat_data.reshape(data.shape)
 
     byte_io = io.BytesIO()
@@ -55,39 +71,34 @@ def encode_message(audio_bytes: bytes, secret_message: str) -> bytes:
     return byte_io.getvalue()
 
 
-def decode_message(audio_bytes: bytes) -> str:
-    """Reveals a secret message from a WAV audio file."""
-    try:
-        samplerate, data = wavfile.read(io.BytesIO(audio_bytes))
-    except Exception:
-        raise ValueError("Could not read WAV file or it's not a valid format.")
+def encode_message(audio_bytes: bytes, secret_message: str) -> bytes:
+    """Hides a secret message within a WAV audio file using LSB."""
+    data, meta = load_samples(audio_bytes)
+    return encode_samples(data, meta["samplerate"], secret_message)
 
-    flat_data = data.flatten()
-    binary_data = ""
+
+def decode_samples(data: np.ndarray) -> str:
+    """Reveals a secret message from decoded WAV samples."""
     delimiter = "####"
     binary_delimiter = ''.join(format(ord(char), '08b') for char in delimiter)
+    lsb = (data.reshape(-1) & 1).astype(np.uint8)
+    message_part = _bits_before_delimiter(lsb, binary_delimiter)
 
-    for sample in flat_data:
-        binary_data += str(sample & 1)
-        
-        if binary_data.endswith(binary_delimiter):
-            break
-            
-    message_part = binary_data.split(binary_delimiter, 1)[0]
-    
     if not message_part:
         return ""
 
-    secret_message = ""
-    for i in range(0, len(message_part), 8):
-        byte = message_part[i:i+8]
-        if len(byte) == 8:
-            try:
-                secret_message += chr(int(byte, 2))
-            except ValueError:
-                pass
-            
-    return secret_message
+    usable = len(message_part) // 8 * 8
+    bits = np.frombuffer(message_part[:usable].encode('ascii'), dtype=np.uint8) - 48
+    return np.packbits(bits).tobytes().decode('latin-1')
+
+
+def decode_message(audio_bytes: bytes) -> str:
+    """Reveals a secret message from a WAV audio file."""
+    try:
+        samplerate, data = wavfile.read(io.BytesIO(audio_bytes))
+    except Exception:
+        raise ValueError("Could not read WAV file or it's not a valid format.")
+    return decode_samples(data)
 
 
 # --- [MODIFIED] Steganography Visualization Logic ---
@@ -141,16 +152,17 @@ def _generate_lsb_sample_step(sample_index: int, sample_val: int, bit_index: int
 
 
 def visualize_encode_lsb_audio(audio_bytes: bytes, secret_message: str) -> List[StegoVisualizationStep]:
-    """[MODIFIED] Generates a step-by-step visualization for LSB audio encoding."""
+    """Generates a step-by-step visualization for LSB audio encoding."""
+    data, _ = load_samples(audio_bytes)
+    return visualize_encode_samples(data, secret_message)
+
+
+def visualize_encode_samples(data: np.ndarray, secret_message: str) -> List[StegoVisualizationStep]:
+    """[MODIFIED] Visualization of LSB audio encoding from decoded samples (only the samples shown are read)."""
     steps = []
-    
-    try:
-        samplerate, data = wavfile.read(io.BytesIO(audio_bytes))
-    except Exception as e:
-        raise ValueError(f"Could not read audio file: {e}")
 
-    flat_data = data.flatten().copy()
-    total_samples = len(flat_data)
+    flat_data = data.reshape(-1)[:8].tolist()
+    total_samples = int(data.size)
     delimiter = "####"
     
     encoded_message = secret_message + delimiter
@@ -238,16 +250,23 @@ def visualize_encode_lsb_audio(audio_bytes: bytes, secret_message: str) -> List[
     return steps
 
 def visualize_decode_lsb_audio(audio_bytes: bytes) -> List[StegoVisualizationStep]:
-    """[MODIFIED] Generates a step-by-step visualization for LSB audio decoding."""
-    steps = []
-    
+    """Generates a step-by-step visualization for LSB audio decoding."""
     try:
         samplerate, data = wavfile.read(io.BytesIO(audio_bytes))
     except Exception as e:
         raise ValueError(f"Could not read audio file: {e}")
+    return visualize_decode_samples(data, decode_samples(data))
+
+
+def visualize_decode_samples(data: np.ndarray, final_message_from_decode: str) -> List[StegoVisualizationStep]:
+    """
+    [MODIFIED] Visualization of LSB audio decoding from decoded samples and the message
+    already extracted by 'decode_samples' (the codec is not run a second time).
+    """
+    steps = []
 
-    flat_data = data.flatten()
-    total_samples = len(flat_data)
+    flat_data = data.reshape(-1)[:8].tolist()
+    total_samples = int(data.size)
     delimiter = "####"
     binary_delimiter = ''.join(format(ord(char), '08b') for char in delimiter)
 
@@ -304,7 +323,6 @@ def visualize_decode_lsb_audio(audio_bytes: bytes) -> List[StegoVisualizationSte
     ))
     
     # --- [MODIFIED] Step 6: Continuous Search ---
-    final_message_from_decode = decode_message(audio_bytes)
     message_bits_count = len(final_message_from_decode + delimiter) * 8 if final_message_from_decode else 0
     samples_checked_for_viz = min(message_bits_count, total_samples, 1000) # Clamp
     
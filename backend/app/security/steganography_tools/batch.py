@@ -0,0 +1,97 @@
+# backend/app/security/steganography_tools/batch.py
+# Stéganographie par lots : plusieurs messages dans un même support (ex. un filigrane
+# par destinataire) ou un même message dans plusieurs supports.
+# Chaque support n'est décodé qu'une fois ; les encodages sont répartis sur un pool
+# de threads (numpy et la compression PNG / zlib libèrent le GIL, et le support
+# décodé est partagé sans copie entre les tâches). Les résultats sont produits dans
+# l'ordre où ils se terminent, avec un nombre borné de résultats en attente.
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from . import image_steg, audio_steg, video_steg
+
+MAX_WORKERS = int(os.environ.get("STEGO_BATCH_WORKERS", os.cpu_count() or 1))
+
+# (indice du support, indice du message)
+Job = Tuple[int, int]
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="stego-batch")
+    return _pool
+
+
+def pair_jobs(carrier_count: int, message_count: int) -> List[Job]:
+    """
+    Un support et N messages, N supports et un message, ou autant de supports que de
+    messages (associés deux à deux).
+    """
+    if carrier_count == 1:
+        return [(0, m) for m in range(message_count)]
+    if message_count == 1:
+        return [(c, 0) for c in range(carrier_count)]
+    if carrier_count == message_count:
+        return [(i, i) for i in range(carrier_count)]
+    raise ValueError("Send one file with many messages, one message with many files, or as many files as messages.")
+
+
+def capacity(media_type: str, carrier: Any) -> Optional[int]:
+    """Nombre de bits disponibles (None : pas de limite, ajout en fin de fichier)."""
+    if media_type in ("image", "audio"):
+        return int(carrier.size)
+    return None
+
+
+def message_bit_count(secret_message: str) -> int:
+    return sum(len(format(ord(char), '08b')) for char in secret_message + "####")
+
+
+def check_capacity(media_type: str, carriers: List[Any], messages: List[str], jobs: List[Job]):
+    """Vérifie tous les couples avant de commencer (une erreur en cours de flux ne peut plus être signalée)."""
+    for carrier_index, message_index in jobs:
+        available = capacity(media_type, carriers[carrier_index])
+        if available is not None and message_bit_count(messages[message_index]) > available:
+            raise ValueError(
+                f"Message {message_index + 1} is too long to be hidden in file {carrier_index + 1}."
+            )
+
+
+def encode(media_type: str, carrier: Any, meta: Dict[str, Any], secret_message: str) -> bytes:
+    """Encode un message dans un support déjà décodé."""
+    if media_type == "image":
+        return image_steg.encode_pixels(carrier, secret_message)
+    if media_type == "audio":
+        return audio_steg.encode_samples(carrier, meta["samplerate"], secret_message)
+    if media_type == "video":
+        return video_steg.encode_message(carrier, secret_message)
+    raise ValueError("Invalid media type.")
+
+
+async def run(tasks: List[Callable[[], bytes]], window: Optional[int] = None) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Exécute les tâches sur le pool et produit (indice, résultat) à mesure qu'elles se
+    terminent ; au plus 'window' résultats sont en cours ou en attente d'être consommés.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    window = window or MAX_WORKERS * 2
+    pending: Dict["asyncio.Future[bytes]", int] = {}
+    next_task = 0
+    try:
+        while next_task < len(tasks) or pending:
+            while next_task < len(tasks) and len(pending) < window:
+                pending[loop.run_in_executor(pool, tasks[next_task])] = next_task
+                next_task += 1
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -1,6 +1,7 @@
 # backend/app/security/steganography_tools/image_steg.py
 from PIL import Image
 import io
+import numpy as np
 from typing import List, Tuple, Dict, Any
 from ...models.schemas import StegoVisualizationStep
 
@@ -14,88 +15,81 @@ def get_binary_repr(val: int) -> str:
     """Helper to get 8-bit binary representation."""
     return format(val, '08b')
 
+def _message_bits(encoded_message: str) -> np.ndarray:
+    """Bits (0/1) du message, dans l'ordre d'insertion."""
+    binary_message = ''.join(get_binary_repr(ord(char)) for char in encoded_message)
+    return np.frombuffer(binary_message.encode('ascii'), dtype=np.uint8) - 48
+
+
+def _bits_before_delimiter(lsb: np.ndarray, binary_delimiter: str) -> str:
+    """Flux de LSB (en texte) jusqu'à la première occurrence du délimiteur, lu par blocs croissants."""
+    binary_data = ""
+    position, step = 0, 3 * 1024
+    while position < len(lsb):
+        search_from = max(0, len(binary_data) - len(binary_delimiter) + 1)
+        binary_data += (lsb[position:position + step] + 48).tobytes().decode('ascii')
+        found = binary_data.find(binary_delimiter, search_from)
+        if found != -1:
+            return binary_data[:found]
+        position += step
+        step *= 2
+    return binary_data
+
+
+def _bits_to_text(message_part: str) -> str:
+    usable = len(message_part) // 8 * 8
+    bits = np.frombuffer(message_part[:usable].encode('ascii'), dtype=np.uint8) - 48
+    return np.packbits(bits).tobytes().decode('latin-1')
+
 # --- Steganography Functional Implementations ---
 
-def encode_message(image_bytes: bytes, secret_message: str) -> bytes:
-    """Hides a secret message within an image using LSB steganography."""
+def load_pixels(image_bytes: bytes) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Décode l'image en tableau RGB (hauteur, largeur, 3) ; réutilisable par plusieurs encodages."""
     try:
         img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
     except Exception as e:
         raise ValueError(f"Could not open image. Is it a valid image format? Error: {e}")
+    return np.asarray(img, dtype=np.uint8), {}
 
-    encoded_message = secret_message + "####"
-    binary_message = ''.join(get_binary_repr(ord(char)) for char in encoded_message)
-    
-    width, height = img.size
-    total_pixels = width * height
-    total_capacity = total_pixels * 3
-    
-    if len(binary_message) > total_capacity:
+
+def encode_pixels(pixels: np.ndarray, secret_message: str) -> bytes:
+    """Hides a secret message in already decoded RGB pixels and returns the PNG bytes."""
+    bits = _message_bits(secret_message + "####")
+
+    if len(bits) > pixels.size:
         raise ValueError("Message is too long to be hidden in this image.")
 
-    data_index = 0
-    img_data = iter(list(img.getdata()))
-    new_pixels = []
-    
-    for pixel in img_data:
-        r, g, b = pixel
+    # Les canaux R, G, B des pixels successifs reçoivent les bits dans l'ordre
+    flat = np.array(pixels, dtype=np.uint8).reshape(-1)
+    flat[:len(bits)] = (flat[:len(bits)] & 0b11111110) | bits
 
-        if data_index < len(binary_message):
-            r = get_new_channel(r, int(binary_message[data_index]))
-            data_index += 1
-        
-        if data_index < len(binary_message):
-            g = get_new_channel(g, int(binary_message[data_index]))
-            data_index += 1
-
-        if data_index < len(binary_message):
-            b = get_new_channel(b, int(binary_message[data_index]))
-            data_index += 1
-            
-        new_pixels.append((r, g, b))
-
-        if data_index >= len(binary_message):
-            new_pixels.extend(list(img_data))
-            break
-            
-    new_img = Image.new("RGB", (width, height))
-    new_img.putdata(new_pixels)
-    
+    new_img = Image.fromarray(flat.reshape(pixels.shape), "RGB")
     byte_arr = io.BytesIO()
     new_img.save(byte_arr, format='PNG') 
     return byte_arr.getvalue()
 
 
+def encode_message(image_bytes: bytes, secret_message: str) -> bytes:
+    """Hides a secret message within an image using LSB steganography."""
+    pixels, _ = load_pixels(image_bytes)
+    return encode_pixels(pixels, secret_message)
+
+
+def decode_pixels(pixels: np.ndarray) -> str:
+    """Reveals a secret message from decoded RGB pixels."""
+    delimiter = "####"
+    binary_delimiter = ''.join(get_binary_repr(ord(char)) for char in delimiter)
+    lsb = (pixels.reshape(-1) & 1).astype(np.uint8)
+    return _bits_to_text(_bits_before_delimiter(lsb, binary_delimiter))
+
+
 def decode_message(image_bytes: bytes) -> str:
     """Reveals a secret message from an image."""
     try:
         img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
     except Exception:
         raise ValueError("Could not open image or it's not a valid format.")
-
-    binary_data = ""
-    delimiter = "####"
-    binary_delimiter = ''.join(get_binary_repr(ord(char)) for char in delimiter)
-
-    for pixel in img.getdata():
-        r, g, b = pixel
-        
-        binary_data += str(r & 1)
-        binary_data += str(g & 1)
-        binary_data += str(b & 1)
-
-        if binary_delimiter in binary_data:
-            break
-            
-    message_part = binary_data.split(binary_delimiter, 1)[0]
-    
-    secret_message = ""
-    for i in range(0, len(message_part), 8):
-        byte = message_part[i:i+8]
-        if len(byte) == 8:
-            secret_message += chr(int(byte, 2))
-            
-    return secret_message
+    return decode_pixels(np.asarray(img, dtype=np.uint8))
 
 # --- [NEW] Steganography Visualization Logic ---
 
@@ -165,16 +159,17 @@ def _generate_pixel_step(pixel_index: int, bit_index: int, pixels: List[Tuple[in
 
 
 def visualize_encode_lsb_image(image_bytes: bytes, secret_message: str) -> List[StegoVisualizationStep]:
-    """[MODIFIED] Generates a step-by-step visualization for LSB image encoding."""
+    """Generates a step-by-step visualization for LSB image encoding."""
+    pixels, _ = load_pixels(image_bytes)
+    return visualize_encode_pixels(pixels, secret_message)
+
+
+def visualize_encode_pixels(image_pixels: np.ndarray, secret_message: str) -> List[StegoVisualizationStep]:
+    """[MODIFIED] Visualization of LSB image encoding from decoded pixels (only the pixels shown are read)."""
     steps = []
-    
-    try:
-        img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    except Exception as e:
-        raise ValueError(f"Could not open image: {e}")
 
-    width, height = img.size
-    pixels = list(img.getdata())
+    height, width = image_pixels.shape[:2]
+    pixels = image_pixels.reshape(-1, 3)[:3].tolist()
     total_pixels = width * height
     total_capacity_bits = total_pixels * 3
     delimiter = "####"
@@ -271,18 +266,26 @@ def visualize_encode_lsb_image(image_bytes: bytes, secret_message: str) -> List[
     return steps
 
 def visualize_decode_lsb_image(image_bytes: bytes) -> List[StegoVisualizationStep]:
-    """[MODIFIED] Generates a step-by-step visualization for LSB image decoding."""
-    steps = []
-    
+    """Generates a step-by-step visualization for LSB image decoding."""
     try:
         img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
     except Exception:
         raise ValueError("Could not open image or it's not a valid format.")
+    pixels = np.asarray(img, dtype=np.uint8)
+    return visualize_decode_pixels(pixels, decode_pixels(pixels))
+
+
+def visualize_decode_pixels(image_pixels: np.ndarray, final_message_from_decode: str) -> List[StegoVisualizationStep]:
+    """
+    [MODIFIED] Visualization of LSB image decoding from decoded pixels and the message
+    already extracted by 'decode_pixels' (the codec is not run a second time).
+    """
+    steps = []
 
-    pixels = list(img.getdata())
+    pixels = image_pixels.reshape(-1, 3)[:3].tolist()
     delimiter = "####"
     binary_delimiter = ''.join(get_binary_repr(ord(char)) for char in delimiter)
-    total_pixels = len(pixels)
+    total_pixels = image_pixels.shape[0] * image_pixels.shape[1]
 
     # --- Step 1: Start Decoding ---
     steps.append(StegoVisualizationStep(
@@ -334,7 +337,6 @@ def visualize_decode_lsb_image(image_bytes: bytes) -> List[StegoVisualizationSte
     ))
     
     # --- [MODIFIED] Step 6: Continuous Search ---
-    final_message_from_decode = decode_message(image_bytes)
     message_bits_count = len(final_message_from_decode + delimiter) * 8 if final_message_from_decode else 0
     pixels_checked_for_viz = (message_bits_count + 2) // 3
     pixels_checked_for_viz = min(pixels_checked_for_viz, total_pixels) 
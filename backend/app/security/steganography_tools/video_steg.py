@@ -1,5 +1,5 @@
 # backend/app/security/steganography_tools/video_steg.py
-from typing import List
+from typing import List, Optional
 from ...models.schemas import StegoVisualizationStep
 import base64 # Import base64 for http-safe tranfer
 
@@ -28,15 +28,12 @@ def encode_message(video_bytes: bytes, secret_message: str) -> bytes:
 
 def decode_message(video_bytes: bytes) -> str:
     """Extracts a secret message from the end of a video file."""
+    # Dernière occurrence du délimiteur : seul le message est copié, pas le fichier
+    position = video_bytes.rfind(DELIMITER)
+    if position == -1:
+        return ""
     try:
-        parts = video_bytes.split(DELIMITER)
-        
-        if len(parts) > 1:
-            message_bytes = parts[-1]
-            return message_bytes.decode('utf-8')
-        else:
-            return ""
-            
+        return video_bytes[position + len(DELIMITER):].decode('utf-8')
     except Exception:
         return ""
 
@@ -127,8 +124,11 @@ def visualize_encode_append_video(video_bytes: bytes, secret_message: str) -> Li
     
     return steps
 
-def visualize_decode_append_video(video_bytes: bytes) -> List[StegoVisualizationStep]:
-    """[MODIFIED] Generates a step-by-step visualization for Append video decoding."""
+def visualize_decode_append_video(video_bytes: bytes, final_message: Optional[str] = None) -> List[StegoVisualizationStep]:
+    """
+    [MODIFIED] Generates a step-by-step visualization for Append video decoding.
+    'final_message' : message déjà extrait par decode_message (sinon extrait ici).
+    """
     steps = []
     
     file_size = len(video_bytes)
@@ -148,14 +148,15 @@ def visualize_decode_append_video(video_bytes: bytes) -> List[StegoVisualization
         }
     ))
     
-    # Simulate split
-    parts = video_bytes.split(DELIMITER)
-    is_found = len(parts) > 1
+    # Locate the last delimiter (same result as split()[-1], without copying the file)
+    position = video_bytes.rfind(DELIMITER)
+    is_found = position != -1
     
     if is_found:
-        message_bytes = parts[-1]
+        message_bytes = video_bytes[position + len(DELIMITER):]
         message_size = len(message_bytes)
-        final_message = decode_message(video_bytes)
+        if final_message is None:
+            final_message = decode_message(video_bytes)
         
         # --- [MODIFIED] Step 2: Delimiter Found ---
         steps.append(StegoVisualizationStep(
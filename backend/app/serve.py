@@ -0,0 +1,69 @@
+# backend/app/serve.py
+# Lanceur de production : un worker uvicorn par CPU disponible.
+#
+# Avec plusieurs workers, l'état qui doit être commun (limiteur de connexion, cache du
+# CAPTCHA et des demandes de chat, hub des WebSockets, écouteurs MiTM) passe par un
+# broker local démarré ici (core/shared_state.py) ; son adresse est transmise aux
+# workers par SHARED_STATE_ADDRESS / SHARED_STATE_AUTHKEY. Avec un seul worker, tout
+# reste en mémoire comme avec 'uvicorn app.main:app'.
+#
+# Usage :
+#   python -m backend.app.serve --host 0.0.0.0 --port 8080   (depuis la racine, cf. Dockerfile)
+#   python -m app.serve --port 8000 --workers 2              (depuis backend/)
+
+import argparse
+import os
+import secrets
+import tempfile
+
+import uvicorn
+
+from .core import shared_state
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY si défini, sinon le nombre de CPU utilisables par ce processus."""
+    if os.environ.get("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with one uvicorn worker per CPU.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    broker = None
+    address = None
+    if args.workers > 1:
+        address = os.path.join(tempfile.gettempdir(), f"seko-state-{os.getpid()}.sock")
+        authkey = secrets.token_bytes(32)
+        broker = shared_state.start_broker(address, authkey)
+        # Hérité par les workers
+        os.environ["SHARED_STATE_ADDRESS"] = address
+        os.environ["SHARED_STATE_AUTHKEY"] = authkey.hex()
+
+    try:
+        uvicorn.run(
+            f"{__package__}.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level,
+        )
+    finally:
+        if broker is not None:
+            broker.terminate()
+            broker.join()
+            if os.path.exists(address):
+                os.remove(address)
+
+
+if __name__ == "__main__":
+    main()
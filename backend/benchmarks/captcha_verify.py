@@ -0,0 +1,116 @@
+# backend/benchmarks/captcha_verify.py
+# Vérification reCAPTCHA contre un vérificateur local (RECAPTCHA_VERIFY_URL) :
+#  1. un client httpx par vérification (ancien comportement) contre le pool partagé
+#     (auth.verify_captcha) : durée et nombre de connexions TCP ouvertes ;
+#  2. usage unique : un jeton accepté ne l'est qu'une fois (nouvelle tentative ou
+#     requêtes simultanées), un jeton refusé n'est demandé qu'une fois au vérificateur.
+# Le vérificateur local accepte une seule fois les jetons commençant par "ok" (comme
+# reCAPTCHA, qui refuse un jeton déjà vérifié) et ajoute --delay ms.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/captcha_verify.py --verifications 200 --delay 5
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class StandInVerifier(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # connexions persistantes
+    disable_nagle_algorithm = True
+    delay = 0.0
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        self.server.requests += 1
+        time.sleep(self.delay)
+        token = form.get("response", [""])[0]
+        with self.server.lock:
+            success = token.startswith("ok") and token not in self.server.used
+            self.server.used.add(token)
+        body = json.dumps({"success": success}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_verifier(delay: float) -> ThreadingHTTPServer:
+    StandInVerifier.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInVerifier)
+    server.connections = server.requests = 0
+    server.used, server.lock = set(), threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def one_client_per_call(url: str, token: str) -> bool:
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, data={"secret": "bench", "response": token})
+        response.raise_for_status()
+        return response.json().get("success", False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="reCAPTCHA verification against a local stand-in.")
+    parser.add_argument("--verifications", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=5.0, help="Stand-in response delay (ms)")
+    args = parser.parse_args()
+
+    server = start_verifier(args.delay / 1000)
+    os.environ["RECAPTCHA_SECRET_KEY"] = "bench"
+    os.environ["RECAPTCHA_VERIFY_URL"] = f"http://127.0.0.1:{server.server_address[1]}/siteverify"
+
+    from app.api import auth
+    from app.core import http_client, metrics
+
+    async def run():
+        url = auth.CAPTCHA_VERIFY_URL
+        print(f"{'client':<22}{'verifications':>14}{'connections':>13}{'requests':>10}{'ms/verify':>11}")
+        for label, verify in (("one per verification", lambda token: one_client_per_call(url, token)),
+                              ("shared pool", auth.verify_captcha)):
+            server.connections = server.requests = 0
+            start = time.perf_counter()
+            for i in range(args.verifications):
+                assert await verify(f"ok-{label}-{i}")
+            elapsed = (time.perf_counter() - start) / args.verifications * 1000
+            print(f"{label:<22}{args.verifications:>14}{server.connections:>13}{server.requests:>10}{elapsed:>11.2f}")
+
+        # Même jeton : tentative répétée, 20 requêtes simultanées, jeton refusé deux fois
+        server.requests = 0
+        sequential = [await auth.verify_captcha("ok-retry") for _ in range(2)]
+        concurrent = await asyncio.gather(*(auth.verify_captcha("ok-concurrent") for _ in range(20)))
+        rejected = [await auth.verify_captcha("bad-token") for _ in range(2)]
+        print(f"\nSame valid token, 2 sequential: {sequential.count(True)} accepted")
+        print(f"Same valid token, 20 concurrent: {concurrent.count(True)} accepted")
+        print(f"Rejected token, 2 sequential: {rejected.count(True)} accepted")
+        print(f"verifier requests: {server.requests} (2 + 1 + 1)")
+
+        histogram = metrics.snapshot("captcha_verify_seconds")["captcha_verify_seconds"]
+        print(f"captcha_verify_seconds: count={histogram['count']} p50={histogram['p50']} p99={histogram['p99']}")
+        await http_client.close_async_client()
+
+    asyncio.run(run())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
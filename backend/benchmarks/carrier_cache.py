@@ -0,0 +1,101 @@
+# backend/benchmarks/carrier_cache.py
+# Encodage LSB répété sur le même support : décodage PIL / scipy à chaque appel
+# contre relecture du tableau depuis le cache .npy (mémoire mappée).
+# Affiche le coût de l'étape de décodage seule, puis celui de l'encodage complet
+# (qui comprend l'écriture du PNG / WAV résultat).
+#
+# Usage :
+#   python benchmarks/carrier_cache.py --width 1920 --height 1080 --seconds 30 --runs 10
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+from scipy.io import wavfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_image(width: int, height: int, image_format: str) -> bytes:
+    """Dégradés (proche d'une photo, contrairement à du bruit qui ne se compresse pas)."""
+    y, x = np.mgrid[0:height, 0:width]
+    pixels = np.stack([x * 255 // width, y * 255 // height, (x + y) % 256], axis=-1).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_wav(seconds: float) -> bytes:
+    rng = np.random.default_rng(0)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, 44100, rng.integers(-8000, 8000, (int(44100 * seconds), 2), dtype=np.int16))
+    return buffer.getvalue()
+
+
+def timed(func, runs: int) -> float:
+    start = time.perf_counter()
+    for i in range(runs):
+        func(f"watermark for recipient {i}")
+    return (time.perf_counter() - start) / runs
+
+
+def report(label: str, decoder, data: bytes, plain, cached, runs: int):
+    from app.core import carrier_cache
+
+    decode_time = timed(lambda _: decoder(data), runs)
+    carrier_cache.load(label, data, decoder)  # Premier passage : décodage et écriture du .npy
+    load_time = timed(lambda _: carrier_cache.load(label, data, decoder), runs)
+    plain_time, cached_time = timed(plain, runs), timed(cached, runs)
+    print(f"{label:<24} carrier: decode {decode_time * 1000:7.1f} ms -> cache {load_time * 1000:6.1f} ms   "
+          f"full encode: {plain_time * 1000:7.1f} ms -> {cached_time * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeated stego encodes with and without the carrier cache.")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="carrier-bench-")
+    os.environ["CARRIER_CACHE_DIR"] = cache_dir
+    from app.core import carrier_cache
+    from app.security.steganography_tools import audio_steg, image_steg
+
+    try:
+        audio = make_wav(args.seconds)
+        for image_format in ("JPEG", "PNG"):
+            image = make_image(args.width, args.height, image_format)
+
+            def image_cached(message, image=image):
+                pixels, _ = carrier_cache.load("image", image, image_steg.load_pixels)
+                return image_steg.encode_pixels(pixels, message)
+
+            assert image_cached("check") == image_steg.encode_message(image, "check")
+            report(
+                f"{image_format} {args.width}x{args.height}", image_steg.load_pixels, image,
+                lambda m, image=image: image_steg.encode_message(image, m), image_cached, args.runs,
+            )
+
+        def audio_cached(message):
+            samples, meta = carrier_cache.load("audio", audio, audio_steg.load_samples)
+            return audio_steg.encode_samples(samples, meta["samplerate"], message)
+
+        assert audio_cached("check") == audio_steg.encode_message(audio, "check")
+        report(
+            f"WAV {args.seconds:g}s stereo", audio_steg.load_samples, audio,
+            lambda m: audio_steg.encode_message(audio, m), audio_cached, args.runs,
+        )
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# backend/benchmarks/crypto_batch.py
+# N appels unitaires POST /crypto/encrypt contre un seul POST /crypto/batch/encrypt
+# portant les mêmes N éléments (méthodes et clés mélangées). Les résultats des deux
+# chemins sont comparés élément par élément.
+# Par défaut l'API tourne dans le processus (TestClient) : seul le travail de l'API
+# et de la pile ASGI est mesuré. Avec --url, les requêtes partent vers un serveur
+# lancé à part (connexion keep-alive), ce qui ajoute les allers-retours réseau.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/crypto_batch.py --items 1000 --runs 3
+#   python benchmarks/crypto_batch.py --items 1000 --url http://127.0.0.1:8000
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from typing import List
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# (method, key, shift, size) : quelques clés réutilisées, comme dans une conversation
+KEYS = [
+    ("caesar", None, 3, None),
+    ("caesar", None, 11, None),
+    ("hill", "HILL", None, 2),
+    ("hill", "GYBNQKURP", None, 3),
+    ("playfair", "MONARCHY", None, 5),
+    ("playfair", "SECRET2025", None, 6),
+]
+
+
+def make_items(count: int, length: int) -> List[dict]:
+    rng = random.Random(0)
+    items = []
+    for i in range(count):
+        method, key, shift, size = KEYS[i % len(KEYS)]
+        text = "".join(rng.choice(string.ascii_uppercase + " ") for _ in range(length))
+        items.append({"text": text, "method": method, "key": key, "shift": shift, "size": size})
+    return items
+
+
+def single_calls(client, items: List[dict]) -> List[str]:
+    results = []
+    for item in items:
+        response = client.post("/crypto/encrypt", json=item)
+        response.raise_for_status()
+        results.append(response.json()["result_text"])
+    return results
+
+
+def one_batch(client, items: List[dict]) -> List[str]:
+    response = client.post("/crypto/batch/encrypt", json={"items": items})
+    response.raise_for_status()
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    errors = [line for line in lines if "error" in line]
+    if errors:
+        raise RuntimeError(f"batch item failed: {errors[0]}")
+    return [line["result_text"] for line in sorted(lines, key=lambda line: line["index"])]
+
+
+def timed(func, runs: int) -> tuple:
+    """(meilleure durée en secondes, résultat du dernier essai)."""
+    best, result = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N single /crypto/encrypt calls vs one /crypto/batch/encrypt.")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--length", type=int, default=120, help="Letters per text")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--url", default=None, help="Running server (default: in-process TestClient)")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.Client(base_url=args.url, timeout=60.0)
+    else:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        client = TestClient(app)
+
+    items = make_items(args.items, args.length)
+    with client:
+        one_batch(client, items[:10])  # échauffement (imports, clés compilées)
+        single_time, single_results = timed(lambda: single_calls(client, items), args.runs)
+        batch_time, batch_results = timed(lambda: one_batch(client, items), args.runs)
+
+    if single_results != batch_results:
+        print("FAILED: batch results differ from single calls")
+        sys.exit(1)
+
+    where = args.url or "in-process"
+    print(f"{args.items} items of {args.length} letters, {len(KEYS)} distinct keys ({where}, best of {args.runs})")
+    print(f"{'path':<26}{'total s':>10}{'ms / item':>12}")
+    print(f"{'single /crypto/encrypt':<26}{single_time:>10.3f}{single_time / args.items * 1000:>12.3f}")
+    print(f"{'one /crypto/batch/encrypt':<26}{batch_time:>10.3f}{batch_time / args.items * 1000:>12.3f}")
+    print(f"speedup: {single_time / batch_time:.1f}x, results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# backend/benchmarks/json_responses.py
+# Coût de sérialisation des longues listes de messages.
+#  1. Sérialisation seule : chemin 'response_model' de FastAPI (validation en
+#     schemas.Message, dump en mode JSON puis json.dumps) contre core.responses.dumps
+#     sur les lignes brutes (pydantic_core, et orjson s'il est installé).
+#  2. Requête complète GET /chats/{chat_id}/messages, PostgREST simulé en mémoire
+#     (httpx.MockTransport) : seul le travail de l'API est mesuré.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/json_responses.py --counts 100 1000 5000 --runs 20
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import httpx
+import pydantic_core
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_rows(count: int) -> List[dict]:
+    """Lignes telles que PostgREST les renvoie (UUID et dates en chaînes)."""
+    chat_id, sender_id = str(uuid.uuid4()), str(uuid.uuid4())
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i + 1,
+            "chat_id": chat_id,
+            "sender_id": sender_id,
+            "encrypted_content": f"KHOOR ZRUOG {i} " * 4,
+            "content_type": "text",
+            "created_at": (start + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def timed(func, runs: int) -> float:
+    func()  # échauffement
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON serialization cost of large message lists.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.main import app
+    from app.core import responses
+    from app.core.supabase_client import supabase
+    from app.models import schemas
+    from app.security.security import create_access_token
+
+    adapter = TypeAdapter(List[schemas.Message])
+
+    def legacy(rows):
+        content = adapter.dump_python(adapter.validate_python(rows), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    rows_by_count = {count: make_rows(count) for count in args.counts}
+    print(f"Serialization only (ms per response; orjson {'available' if responses.orjson else 'not installed'})")
+    print(f"{'messages':>9}  {'response_model':>14}  {'pydantic_core':>13}  {'orjson':>8}")
+    for count, rows in rows_by_count.items():
+        line = f"{count:>9}  {timed(lambda: legacy(rows), args.runs):>14.2f}  "
+        line += f"{timed(lambda: pydantic_core.to_json(rows), args.runs):>13.2f}  "
+        line += f"{timed(lambda: responses.orjson.dumps(rows), args.runs):>8.2f}" if responses.orjson else f"{'-':>8}"
+        print(line)
+
+    # --- Requête complète avec PostgREST simulé ---
+    current = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=current["body"], headers={"Content-Type": "application/json"})
+
+    supabase.postgrest.session._transport = httpx.MockTransport(handler)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'id': str(uuid.uuid4())})}"}
+
+    print("\nGET /chats/{chat_id}/messages (ms per request, PostgREST mocked)")
+    for count, rows in rows_by_count.items():
+        current["body"] = json.dumps(rows).encode()
+        url = f"/chats/{rows[0]['chat_id']}/messages"
+        assert len(client.get(url, headers=headers).json()) == count
+
+        def request():
+            client.get(url, headers=headers).raise_for_status()
+
+        print(f"{count:>9}  {timed(request, args.runs):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
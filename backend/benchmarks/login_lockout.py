@@ -0,0 +1,106 @@
+# backend/benchmarks/login_lockout.py
+# Écritures en base provoquées par une rafale de connexions échouées (POST /auth/login).
+#  1. « spray » : un mauvais mot de passe sur chacun de N comptes (IP variées) ;
+#  2. « stuffing » : N tentatives sur un seul compte depuis des IP variées.
+# PostgREST est simulé en mémoire (httpx.MockTransport) : la table 'users' y est
+# tenue à jour et chaque requête sur 'users' est comptée (lectures GET, écritures
+# PATCH) ; la lecture des écouteurs MiTM, faite à chaque connexion, est comptée à part.
+# Le vidage différé est forcé à la fin pour compter toutes les écritures.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/login_lockout.py --attempts 1000
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class FakeUsers:
+    """Table 'users' minimale derrière PostgREST : sélection par nom, mise à jour par id."""
+
+    def __init__(self, count: int):
+        self.rows = {}
+        for i in range(count):
+            row = {"id": str(uuid.uuid4()), "username": f"user{i}", "password_hash": "0" * 64,
+                   "failed_login_attempts": 0, "lockout_until": None}
+            self.rows[row["id"]] = row
+        self.by_name = {row["username"]: row for row in self.rows.values()}
+        self.requests = Counter()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        table = request.url.path.rsplit("/", 1)[-1]
+        self.requests[(table, request.method)] += 1
+        if table != "users":
+            return httpx.Response(200, json=[])
+        if request.method == "GET":
+            row = self.by_name.get(request.url.params.get("username", "")[len("eq."):])
+            return httpx.Response(200, json=[row] if row else [])
+        if request.method == "PATCH":
+            selector = request.url.params["id"]
+            ids = selector[len("in.("):-1].split(",") if selector.startswith("in.") else [selector[len("eq."):]]
+            changes = json.loads(request.content)
+            for user_id in ids:
+                self.rows[user_id].update(changes)
+            return httpx.Response(200, json=[])
+        return httpx.Response(405)
+
+
+def run(client: TestClient, table: FakeUsers, attempts, limiter) -> dict:
+    table.requests.clear()
+    statuses = Counter()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # avertissement CAPTCHA non configuré
+        for i, username in enumerate(attempts):
+            response = client.post(
+                "/auth/login",
+                json={"username": username, "password": "wrong", "captcha_token": "x"},
+                headers={"Fly-Client-IP": f"10.0.{i // 250}.{i % 250}"},
+            )
+            statuses[response.status_code] += 1
+        elapsed = time.perf_counter() - start
+        limiter.flush()
+    return {"reads": table.requests[("users", "GET")], "writes": table.requests[("users", "PATCH")],
+            "other": sum(n for (name, _), n in table.requests.items() if name != "users"),
+            "statuses": dict(statuses), "ms": elapsed / len(attempts) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB writes per burst of failed logins.")
+    parser.add_argument("--attempts", type=int, default=1000)
+    args = parser.parse_args()
+
+    from app.main import app
+    from app.core.supabase_client import supabase
+    from app.core.login_limiter import limiter
+
+    table = FakeUsers(args.attempts)
+    supabase.postgrest.session._transport = httpx.MockTransport(table.handler)
+    client = TestClient(app)
+
+    scenarios = [
+        ("spray", [f"user{i}" for i in range(args.attempts)]),
+        ("stuffing", ["user0"] * args.attempts),
+    ]
+    print(f"{'scenario':<10}{'attempts':>9}{'DB reads':>10}{'DB writes':>11}{'other reads':>13}{'ms/attempt':>12}  statuses")
+    for label, attempts in scenarios:
+        result = run(client, table, attempts, limiter)
+        print(f"{label:<10}{len(attempts):>9}{result['reads']:>10}{result['writes']:>11}{result['other']:>13}"
+              f"{result['ms']:>12.3f}  {result['statuses']}")
+
+    locked = sum(1 for row in table.rows.values() if row["lockout_until"])
+    print(f"\nAccounts with a persisted lockout: {locked}/{len(table.rows)}")
+
+
+if __name__ == "__main__":
+    main()
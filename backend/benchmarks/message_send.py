@@ -0,0 +1,47 @@
+# backend/benchmarks/message_send.py
+# Débit d'envoi de messages : N appels à POST /chats/{chat_id}/messages
+# contre un seul appel à POST /chats/{chat_id}/messages/batch.
+#
+# Usage (le chat doit être accepté, les messages sont réellement insérés) :
+#   python benchmarks/message_send.py --api-url http://127.0.0.1:8080 \
+#       --token <access token> --chat-id <chat uuid> --count 100
+
+import argparse
+import time
+
+import httpx
+
+
+def bench_single(client: httpx.Client, chat_id: str, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        response = client.post(f"/chats/{chat_id}/messages", json={"encrypted_content": f"BENCHSINGLE{i}"})
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def bench_batch(client: httpx.Client, chat_id: str, count: int) -> float:
+    messages = [{"encrypted_content": f"BENCHBATCH{i}"} for i in range(count)]
+    start = time.perf_counter()
+    response = client.post(f"/chats/{chat_id}/messages/batch", json={"messages": messages})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single vs batch message send throughput.")
+    parser.add_argument("--api-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--chat-id", required=True)
+    parser.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    with httpx.Client(base_url=args.api_url, headers=headers, timeout=60) as client:
+        for label, bench in (("single", bench_single), ("batch", bench_batch)):
+            elapsed = bench(client, args.chat_id, args.count)
+            print(f"{label:>6}: {args.count} messages in {elapsed:.3f}s -> {args.count / elapsed:.1f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# backend/benchmarks/shared_state.py
+# État partagé entre workers (core/shared_state.py), tel que le démarre app/serve.py.
+#  1. Coût d'une opération : MemoryState (un worker) contre BrokerState (aller-retour
+#     vers le broker sur un socket Unix), pour get / set / take_token / update.
+#  2. Cohérence du limiteur de connexion : --workers processus tentent chacun
+#     --attempts connexions sur le même compte. En mémoire, chaque worker a son propre
+#     seau (rafale acceptée une fois par worker) ; avec le broker, une seule fois au total.
+#  3. Diffusion du hub de chat entre processus : aller-retour publish -> abonné d'un
+#     autre worker -> réponse, via le sujet pub/sub du broker.
+#
+# Usage :
+#   python benchmarks/shared_state.py --ops 5000 --workers 4 --attempts 20
+
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.core import shared_state  # noqa: E402
+
+
+def op_costs(state, ops: int) -> dict:
+    """Microsecondes par opération."""
+    costs = {}
+    start = time.perf_counter()
+    for i in range(ops):
+        state.set("bench", i % 100, {"value": i}, 60)
+    costs["set"] = (time.perf_counter() - start) / ops * 1e6
+    start = time.perf_counter()
+    for i in range(ops):
+        state.get("bench", i % 100)
+    costs["get"] = (time.perf_counter() - start) / ops * 1e6
+    start = time.perf_counter()
+    for i in range(ops):
+        state.take_token("bench-bucket", i % 100, 10, 1.0)
+    costs["take_token"] = (time.perf_counter() - start) / ops * 1e6
+    start = time.perf_counter()
+    for i in range(ops):
+        state.update("bench-record", i % 100, increments={"attempts": 1}, ttl=60)
+    costs["update"] = (time.perf_counter() - start) / ops * 1e6
+    return costs
+
+
+def login_worker(attempts: int, results):
+    """Processus worker : 'attempts' passages par le limiteur pour le même compte."""
+    from app.core.login_limiter import limiter
+
+    accepted = sum(1 for _ in range(attempts) if limiter.throttle_username("alice") == 0)
+    results.put(accepted)
+
+
+def echo_worker(ready):
+    """Processus worker : renvoie chaque message du sujet 'ping' sur 'pong'."""
+    state = shared_state.get_state()
+    state.subscribe("ping", lambda message: state.publish("pong", message))
+    ready.set()
+    time.sleep(3600)
+
+
+def accepted_logins(ctx, workers: int, attempts: int) -> int:
+    results = ctx.Queue()
+    processes = [ctx.Process(target=login_worker, args=(attempts, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    total = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared state: per-op cost, limiter consistency, cross-worker pub/sub.")
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--pings", type=int, default=500)
+    args = parser.parse_args()
+
+    import multiprocessing
+
+    from app.core.login_limiter import USERNAME_BURST
+
+    ctx = multiprocessing.get_context("spawn")
+    address = os.path.join(tempfile.gettempdir(), f"seko-state-bench-{os.getpid()}.sock")
+    authkey = secrets.token_bytes(32)
+    broker = shared_state.start_broker(address, authkey)
+    try:
+        memory = op_costs(shared_state.MemoryState(), args.ops)
+        remote = op_costs(shared_state.BrokerState(address, authkey), args.ops)
+        print(f"{'operation':<12}{'memory us':>12}{'broker us':>12}")
+        for name in memory:
+            print(f"{name:<12}{memory[name]:>12.1f}{remote[name]:>12.1f}")
+
+        # Sans broker : chaque worker tient ses propres seaux
+        separate = accepted_logins(ctx, args.workers, args.attempts)
+        os.environ["SHARED_STATE_ADDRESS"] = address
+        os.environ["SHARED_STATE_AUTHKEY"] = authkey.hex()
+        shared = accepted_logins(ctx, args.workers, args.attempts)
+        print(f"\nlogin attempts on one account: {args.workers} workers x {args.attempts} "
+              f"(burst {USERNAME_BURST})")
+        print(f"  accepted, per-worker memory: {separate}")
+        print(f"  accepted, shared broker:     {shared}")
+
+        ready = ctx.Event()
+        echo = ctx.Process(target=echo_worker, args=(ready,), daemon=True)
+        echo.start()
+        ready.wait(30)
+        state = shared_state.get_state()
+        received = threading.Event()
+        state.subscribe("pong", lambda message: received.set())
+        rtts = []
+        for i in range(args.pings):
+            received.clear()
+            start = time.perf_counter()
+            state.publish("ping", i)
+            if not received.wait(5):
+                raise RuntimeError("no reply from the echo worker")
+            rtts.append((time.perf_counter() - start) * 1000)
+        echo.terminate()
+        rtts.sort()
+        print(f"\ncross-worker publish round trip: p50 {rtts[len(rtts) // 2]:.2f} ms, "
+              f"p99 {rtts[int(len(rtts) * 0.99)]:.2f} ms")
+    finally:
+        broker.terminate()
+        broker.join()
+        if os.path.exists(address):
+            os.remove(address)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# backend/benchmarks/signup_concurrency.py
+# N inscriptions simultanées (POST /auth/signup) : latence p50 / p99, requêtes vers
+# la base et codes de réponse. Une partie des noms est envoyée deux fois en même
+# temps pour exercer la course « vérification puis insertion ».
+# PostgREST est simulé en mémoire (httpx.MockTransport) avec --db-latency ms par
+# requête et une contrainte d'unicité sur 'username' (erreur 23505, HTTP 409).
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/signup_concurrency.py --signups 1000 --duplicates 100 --db-latency 5
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class FakeDatabase:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.usernames = set()
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        table = request.url.path.rsplit("/", 1)[-1]
+        with self.lock:
+            self.requests[(table, request.method)] += 1
+        time.sleep(self.latency)  # client Supabase synchrone : le thread appelant attend
+        if table != "users":
+            return httpx.Response(200 if request.method == "GET" else 201, json=[])
+        if request.method == "GET":
+            username = request.url.params.get("username", "")[len("eq."):]
+            with self.lock:
+                exists = username in self.usernames
+            return httpx.Response(200, json=[{"id": str(uuid.uuid4())}] if exists else [])
+        row = httpx.Response(200, content=request.content).json()
+        with self.lock:
+            if row["username"] in self.usernames:
+                return httpx.Response(409, json={
+                    "code": "23505", "details": f"Key (username)=({row['username']}) already exists.", "hint": None,
+                    "message": 'duplicate key value violates unique constraint "users_username_key"'})
+            self.usernames.add(row["username"])
+        return httpx.Response(201, json=[{**row, "id": str(uuid.uuid4())}])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of concurrent signups.")
+    parser.add_argument("--signups", type=int, default=1000)
+    parser.add_argument("--duplicates", type=int, default=100, help="Usernames sent twice concurrently")
+    parser.add_argument("--db-latency", type=float, default=5.0, help="Simulated PostgREST latency (ms)")
+    args = parser.parse_args()
+
+    from app.main import app
+    from app.core.supabase_client import supabase
+
+    database = FakeDatabase(args.db_latency / 1000)
+    supabase.postgrest.session._transport = httpx.MockTransport(database.handler)
+
+    names = [f"user_{i}" for i in range(args.signups - args.duplicates)]
+    names += names[:args.duplicates]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Latence vue par le client : depuis le lancement commun de la rafale
+            start = time.perf_counter()
+
+            async def signup(username):
+                response = await client.post("/auth/signup", json={"username": username, "password": "secret"})
+                return response.status_code, time.perf_counter() - start
+
+            results = await asyncio.gather(*(signup(name) for name in names))
+            return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    latencies = np.array([latency for _, latency in results]) * 1000
+    print(f"{len(names)} concurrent signups ({args.duplicates} usernames sent twice), "
+          f"DB latency {args.db_latency} ms")
+    print(f"  wall time      {elapsed:.2f} s")
+    print(f"  latency p50    {np.percentile(latencies, 50):.1f} ms")
+    print(f"  latency p99    {np.percentile(latencies, 99):.1f} ms")
+    print(f"  statuses       {dict(Counter(status for status, _ in results))}")
+    print(f"  DB requests    {dict(database.requests)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# backend/benchmarks/startup_time.py
+# Coût du démarrage à froid de l'API.
+#  1. Budget d'import : 'python -X importtime -c "import app.main"' (meilleur de
+#     --runs essais) doit rester sous --budget-ms, et les modules lourds chargés à la
+#     demande (numpy, scipy, PIL, jose, supabase) ne doivent pas être importés.
+#     Code de sortie 1 si le budget est dépassé : utilisable comme vérification en CI.
+#  2. Démarrage à froid réel : uvicorn est lancé dans un nouveau processus ; durée
+#     jusqu'à la première réponse de GET /, puis jusqu'à la fin du chargement en
+#     arrière-plan (jauge lazy_warm_up_ms de GET /metrics).
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/startup_time.py --runs 3 --budget-ms 2500
+
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Modules qui ne doivent pas être importés au démarrage
+DEFERRED = ("numpy", "scipy", "PIL", "jose", "supabase", "postgrest", "realtime", "storage3")
+
+
+def import_time_ms() -> tuple:
+    """(durée cumulée de 'import app.main' en ms, modules de DEFERRED importés)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    total, loaded = None, set()
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if not match:
+            continue
+        name = match.group(3)
+        if name == "app.main":
+            total = int(match.group(1)) / 1000
+        if name.split(".")[0] in DEFERRED:
+            loaded.add(name.split(".")[0])
+    return total, sorted(loaded)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cold_start() -> tuple:
+    """(ms jusqu'à la première réponse de GET /, ms jusqu'à la fin du préchargement ou None)."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5.0) as client:
+            while True:
+                try:
+                    client.get("/").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError("uvicorn exited before answering")
+                    time.sleep(0.005)
+            first_response = (time.perf_counter() - start) * 1000
+
+            warm = None
+            deadline = time.perf_counter() + 30
+            while time.perf_counter() < deadline:
+                metric = client.get("/metrics").json().get("lazy_warm_up_ms")
+                if metric is None:
+                    break  # version sans préchargement
+                if metric["value"]:
+                    warm = (time.perf_counter() - start) * 1000
+                    break
+                time.sleep(0.02)
+        return first_response, warm
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import budget and cold-start-to-first-response time.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=2500.0, help="Maximum 'import app.main' time")
+    args = parser.parse_args()
+
+    imports = [import_time_ms() for _ in range(args.runs)]
+    best = min(total for total, _ in imports)
+    loaded = imports[0][1]
+    print(f"import app.main: best {best:.0f} ms of {args.runs} (budget {args.budget_ms:.0f} ms)")
+    print(f"deferred modules imported at startup: {', '.join(loaded) or 'none'}")
+
+    starts = [cold_start() for _ in range(args.runs)]
+    firsts = sorted(first for first, _ in starts)
+    print(f"cold start -> first response (GET /): median {firsts[len(firsts) // 2]:.0f} ms, "
+          f"min {firsts[0]:.0f} ms")
+    warms = sorted(warm for _, warm in starts if warm is not None)
+    if warms:
+        print(f"cold start -> background warm-up done: median {warms[len(warms) // 2]:.0f} ms")
+
+    if best > args.budget_ms or loaded:
+        print("FAILED: import budget exceeded or deferred modules imported at startup")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
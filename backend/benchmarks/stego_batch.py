@@ -0,0 +1,92 @@
+# backend/benchmarks/stego_batch.py
+# Filigranes par destinataire : N appels à POST /storage/steganography/{type}/encode
+# contre un seul appel à POST /storage/steganography/{type}/encode/batch (archive ZIP).
+# Vérifie aussi que chaque fichier de l'archive contient le bon message.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/stego_batch.py --count 32 --width 1920 --height 1080
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import uuid
+import zipfile
+
+import numpy as np
+from PIL import Image
+from scipy.io import wavfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_image(width: int, height: int) -> bytes:
+    y, x = np.mgrid[0:height, 0:width]
+    pixels = np.stack([x * 255 // width, y * 255 // height, (x + y) % 256], axis=-1).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def make_wav(seconds: float) -> bytes:
+    rng = np.random.default_rng(0)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, 44100, rng.integers(-8000, 8000, (int(44100 * seconds), 2), dtype=np.int16))
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs batch steganography encoding.")
+    parser.add_argument("--count", type=int, default=32)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--seconds", type=float, default=30)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.security.security import create_access_token
+    from app.security.steganography_tools import audio_steg, image_steg
+
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'id': str(uuid.uuid4())})}"
+    messages = [f"watermark:recipient-{i}:{uuid.uuid4()}" for i in range(args.count)]
+
+    for media_type, filename, content_type, data, decode in (
+        ("image", "cover.jpg", "image/jpeg", make_image(args.width, args.height), image_steg.decode_message),
+        ("audio", "cover.wav", "audio/wav", make_wav(args.seconds), audio_steg.decode_message),
+    ):
+        start = time.perf_counter()
+        for message in messages:
+            response = client.post(
+                f"/storage/steganography/{media_type}/encode",
+                data={"secret_message": message},
+                files={"file": (filename, data, content_type)},
+            )
+            response.raise_for_status()
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.post(
+            f"/storage/steganography/{media_type}/encode/batch",
+            data={"secret_messages": messages},
+            files={"files": (filename, data, content_type)},
+        )
+        response.raise_for_status()
+        batched = time.perf_counter() - start
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        manifest = json.loads(archive.read("manifest.json"))
+        ok = len(manifest) == len(messages) and all(
+            decode(archive.read(entry["file"])) == messages[entry["message_index"]] for entry in manifest
+        )
+        print(
+            f"{media_type:<6} {args.count} messages  sequential {sequential:6.2f} s  "
+            f"batch {batched:6.2f} s  x{sequential / batched:.2f}  contents={'OK' if ok else 'MISMATCH'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
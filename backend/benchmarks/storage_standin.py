@@ -0,0 +1,216 @@
+# backend/benchmarks/storage_standin.py
+# Vérifie POST /storage/upload contre un faux Supabase Storage local.
+#
+# Le faux stockage (Starlette + uvicorn, même processus) implémente :
+#  - POST /object/{bucket}/{chemin} (envoi direct) ;
+#  - POST /upload/resumable, PATCH / HEAD /upload/resumable/{id} (TUS, longueur différée),
+#    avec un PATCH volontairement interrompu pour exercer la reprise.
+# Le script envoie des fichiers de plusieurs tailles à travers l'API, compare les
+# empreintes SHA-256 reçues par le stockage et mesure le pic de mémoire du processus
+# (stockage factice compris), puis renvoie chaque fichier pour vérifier la déduplication.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/storage_standin.py --sizes 1 20 100 --chunk-mb 6
+
+import argparse
+import base64
+import hashlib
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class StandInStorage:
+    def __init__(self, fail_every: int = 0):
+        self.objects = {}   # nom -> (sha256, taille)
+        self.uploads = {}   # id TUS -> {"name", "hash", "offset", "length"}
+        self.fail_every = fail_every
+        self.patches = 0
+
+    async def put_object(self, request: Request):
+        digest, size = hashlib.sha256(), 0
+        async for data in request.stream():
+            digest.update(data)
+            size += len(data)
+        name = request.path_params["path"]
+        self.objects[name] = (digest.hexdigest(), size)
+        return Response(status_code=200)
+
+    async def create(self, request: Request):
+        metadata = dict(
+            item.split(" ", 1) for item in request.headers["upload-metadata"].split(",")
+        )
+        name = "/".join(
+            base64.b64decode(metadata[key]).decode() for key in ("bucketName", "objectName")
+        )
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {"name": name, "hash": hashlib.sha256(), "offset": 0, "length": None}
+        return Response(status_code=201, headers={"Location": f"/upload/resumable/{upload_id}"})
+
+    async def head(self, request: Request):
+        upload = self.uploads[request.path_params["upload_id"]]
+        return Response(status_code=200, headers={"Upload-Offset": str(upload["offset"])})
+
+    async def patch(self, request: Request):
+        upload = self.uploads[request.path_params["upload_id"]]
+        if int(request.headers["upload-offset"]) != upload["offset"]:
+            return Response(status_code=409)
+        if "upload-length" in request.headers:
+            upload["length"] = int(request.headers["upload-length"])
+
+        self.patches += 1
+        fail = self.fail_every and self.patches % self.fail_every == 0
+        received = 0
+        async for data in request.stream():
+            if fail and received + len(data) > 1024:
+                # Coupure simulée : une partie seulement du morceau est enregistrée
+                keep = max(0, 1024 - received)
+                upload["hash"].update(data[:keep])
+                upload["offset"] += keep
+                return Response(status_code=503)
+            upload["hash"].update(data)
+            upload["offset"] += len(data)
+            received += len(data)
+
+        if upload["length"] is not None and upload["offset"] == upload["length"]:
+            self.objects[upload["name"]] = (upload["hash"].hexdigest(), upload["offset"])
+        return Response(status_code=204, headers={"Upload-Offset": str(upload["offset"])})
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/object/{path:path}", self.put_object, methods=["POST"]),
+            Route("/upload/resumable", self.create, methods=["POST"]),
+            Route("/upload/resumable/{upload_id}", self.head, methods=["HEAD"]),
+            Route("/upload/resumable/{upload_id}", self.patch, methods=["PATCH"]),
+        ])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def body_stream(size: int, seed: bytes):
+    """Fichier pseudo-aléatoire généré à la volée (jamais entièrement en mémoire)."""
+    block = hashlib.sha256(seed).digest() * 2048  # 64 Ko
+    sent = 0
+    while sent < size:
+        data = block[:min(len(block), size - sent)]
+        sent += len(data)
+        yield data
+
+
+def expected_hash(size: int, seed: bytes) -> str:
+    digest = hashlib.sha256()
+    for data in body_stream(size, seed):
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def multipart(size: int, seed: bytes, boundary: str):
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="bench-{size}.mp4"\r\n'
+        f"Content-Type: video/mp4\r\n\r\n"
+    ).encode()
+    yield from body_stream(size, seed)
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamed /storage/upload against a local storage stand-in.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 20, 100], help="File sizes in MB")
+    parser.add_argument("--chunk-mb", type=float, default=6)
+    parser.add_argument("--fail-every", type=int, default=3, help="Interrupt every Nth TUS PATCH (0: never)")
+    args = parser.parse_args()
+
+    storage = StandInStorage(fail_every=args.fail_every)
+    storage_port, api_port = free_port(), free_port()
+    os.environ["SUPABASE_STORAGE_URL"] = f"http://127.0.0.1:{storage_port}"
+    os.environ["STORAGE_UPLOAD_CHUNK_SIZE"] = str(int(args.chunk_mb * 1024 * 1024))
+
+    from app.main import app
+    from app.security.security import create_access_token
+
+    serve(storage.app(), storage_port)
+    serve(app, api_port)
+
+    user_id = str(uuid.uuid4())
+    token = create_access_token({"id": user_id})
+    boundary = uuid.uuid4().hex
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    with httpx.Client(base_url=f"http://127.0.0.1:{api_port}", timeout=300) as client:
+        for size_mb in args.sizes:
+            size = int(size_mb * 1024 * 1024)
+            seed = str(size).encode()
+            body = b"".join(multipart(0, seed, boundary))  # taille de l'enveloppe multipart
+            start = time.perf_counter()
+            response = client.post(
+                "/storage/upload",
+                content=multipart(size, seed, boundary),
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": f"multipart/form-data; boundary={boundary}",
+                    "Content-Length": str(size + len(body) + len(f"bench-{size}.mp4") - len("bench-0.mp4")),
+                },
+            )
+            elapsed = time.perf_counter() - start
+            response.raise_for_status()
+
+            name = response.json()["file_url"].split("/object/public/", 1)[1]
+            digest, stored = storage.objects[name]
+            ok = digest == expected_hash(size, seed) and stored == size
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            # Même contenu, empreinte annoncée : rien n'est renvoyé au stockage
+            patches, objects = storage.patches, len(storage.objects)
+            start = time.perf_counter()
+            again = client.post(
+                "/storage/upload",
+                content=multipart(size, seed, boundary),
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": f"multipart/form-data; boundary={boundary}",
+                    "X-Content-SHA256": expected_hash(size, seed),
+                },
+            )
+            dedup_elapsed = time.perf_counter() - start
+            again.raise_for_status()
+            dedup = (
+                again.headers.get("X-Deduplicated") == "true"
+                and again.json()["file_url"] == response.json()["file_url"]
+                and (storage.patches, len(storage.objects)) == (patches, objects)
+            )
+            print(
+                f"{size_mb:>7.1f} MB  {elapsed:6.2f} s  {size / elapsed / 1024 / 1024:7.1f} MB/s  "
+                f"integrity={'OK' if ok else 'MISMATCH'}  peak RSS +{peak - baseline:.0f} MB  "
+                f"re-upload={'deduplicated' if dedup else 'UPLOADED AGAIN'} in {dedup_elapsed:.3f} s"
+            )
+
+    print(f"TUS PATCH requests: {storage.patches} (every {args.fail_every or '-'}th interrupted)")
+
+
+if __name__ == "__main__":
+    main()
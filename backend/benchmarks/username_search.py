@@ -0,0 +1,75 @@
+# backend/benchmarks/username_search.py
+# Temps de construction et de recherche de l'index des noms d'utilisateur
+# (app.core.username_index) sur des utilisateurs synthétiques.
+#
+# Usage (depuis backend/) :
+#   python benchmarks/username_search.py --sizes 10000 1000000
+
+import argparse
+import random
+import string
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.username_index import UsernameIndex  # noqa: E402
+
+SYLLABLES = ["ka", "ri", "mo", "el", "an", "to", "sa", "lu", "ne", "vi", "or", "di", "ja", "be", "zo"]
+
+
+def fake_users(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.5:
+            name += str(rng.randint(0, 9999))
+        if rng.random() < 0.2:
+            name = name.capitalize() + rng.choice(string.ascii_uppercase)
+        yield str(uuid.UUID(int=rng.getrandbits(128))), f"{name}_{i}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Username index build and search benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        users = list(fake_users(size))
+        start = time.perf_counter()
+        index = UsernameIndex(users)
+        build = time.perf_counter() - start
+
+        rng = random.Random(1)
+        queries = []
+        for _ in range(args.queries):
+            name = rng.choice(users)[1].lower()
+            i = rng.randrange(len(name))
+            queries.append(name[i:i + rng.randint(1, 6)])
+
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query)
+        cold = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query)
+        cached = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for i in range(100):
+            index.add(str(uuid.uuid4()), f"newuser{i}")
+        add = (time.perf_counter() - start) / 100
+
+        print(
+            f"{size:>9} users: build {build:.2f}s | search {cold * 1e6:.1f} us (uncached), "
+            f"{cached * 1e6:.1f} us (cached) | add {add * 1e6:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# backend/benchmarks/viz_payload.py
+# Taille des réponses de visualisation : JSON actuel contre format par colonnes
+# (Accept: application/vnd.seko.columnar+json), brut puis compressé (gzip, et Brotli
+# si le module est installé). Vérifie aussi que le format compact redonne exactement
+# les mêmes étapes, puis mesure les octets réellement envoyés par le middleware de
+# compression selon l'Accept-Encoding du client.
+#
+# Usage (variables SUPABASE_URL / SUPABASE_KEY / JWT_SECRET_KEY définies) :
+#   python benchmarks/viz_payload.py --text-length 2000
+
+import argparse
+import gzip
+import io
+import os
+import sys
+import uuid
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def sizes(body: bytes) -> str:
+    parts = [f"{len(body):>9,}", f"{len(gzip.compress(body, 6)):>8,}"]
+    parts.append(f"{len(brotli.compress(body, quality=5)):>8,}" if brotli else f"{'-':>8}")
+    return "  ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visualization payload sizes: JSON vs columnar.")
+    parser.add_argument("--text-length", type=int, default=2000, help="Characters of plaintext")
+    parser.add_argument("--image-size", type=int, default=64, help="Side of the stego carrier image (pixels)")
+    args = parser.parse_args()
+
+    from app.main import app
+    from app.core import columnar
+    from app.security.security import create_access_token
+
+    client = TestClient(app)
+    # Texte non périodique (une répétition exacte favoriserait artificiellement gzip)
+    words = ["attack", "at", "dawn", "hold", "the", "bridge", "north", "gate", "send", "more",
+             "troops", "retreat", "by", "night", "river", "crossing", "enemy", "camp", "signal", "fire"]
+    rng = np.random.default_rng(0)
+    text = ""
+    while len(text) < args.text_length:
+        text += rng.choice(words) + rng.choice([" ", " ", " ", ", ", ". "])
+    text = text[:args.text_length]
+    cases = [
+        ("caesar encrypt", "/visualize/encrypt", {"text": text, "shift": 3}),
+        ("playfair encrypt", "/visualize/encrypt", {"text": text, "key": "PLAYFAIREXAMPLE", "size": 5}),
+        ("hill encrypt", "/visualize/encrypt", {"text": text, "key": "GYBNQKURP", "size": 3}),
+        ("hill decrypt", "/visualize/decrypt", {"text": text, "key": "GYBNQKURP", "size": 3}),
+    ]
+
+    print(f"{'payload':<22}{'format':<10}{'raw':>9}  {'gzip':>8}  {'brotli':>8}")
+    for label, path, payload in cases:
+        plain = client.post(path, json=payload, headers={"Accept-Encoding": "identity"})
+        compact = client.post(path, json=payload, headers={"Accept": columnar.MEDIA_TYPE, "Accept-Encoding": "identity"})
+        plain.raise_for_status(), compact.raise_for_status()
+        assert columnar.decode_steps(compact.json()["steps"]) == plain.json()["steps"], label
+        print(f"{label:<22}{'json':<10}{sizes(plain.content)}")
+        print(f"{'':<22}{'columnar':<10}{sizes(compact.content)}")
+
+    # Stéganographie (image) : authentification requise
+    buffer = io.BytesIO()
+    Image.fromarray(rng.integers(0, 256, (args.image_size, args.image_size, 3), dtype=np.uint8)).save(buffer, "PNG")
+    headers = {"Authorization": f"Bearer {create_access_token({'id': str(uuid.uuid4())})}", "Accept-Encoding": "identity"}
+    request = {"files": {"file": ("carrier.png", buffer.getvalue(), "image/png")}, "data": {"secret_message": text[:200]}}
+    plain = client.post("/storage/steganography/visualize/image/encode", headers=headers, **request)
+    compact = client.post("/storage/steganography/visualize/image/encode",
+                          headers={**headers, "Accept": columnar.MEDIA_TYPE}, **request)
+    plain.raise_for_status(), compact.raise_for_status()
+    assert columnar.decode_steps(compact.json()["steps"]) == plain.json()["steps"], "stego"
+    print(f"{'stego image encode':<22}{'json':<10}{sizes(plain.content)}")
+    print(f"{'':<22}{'columnar':<10}{sizes(compact.content)}")
+
+    # Octets envoyés par le middleware (Content-Length de la réponse compressée)
+    print(f"\n{'sent (middleware)':<22}{'format':<10}{'identity':>9}  {'gzip':>8}  {'br':>8}")
+    for label, path, payload in cases:
+        for name, accept in (("json", "application/json"), ("columnar", columnar.MEDIA_TYPE)):
+            sent = []
+            for encoding in ("identity", "gzip", "br"):
+                response = client.post(path, json=payload, headers={"Accept": accept, "Accept-Encoding": encoding})
+                response.raise_for_status()
+                negotiated = response.headers.get("content-encoding", "identity")
+                sent.append(f"{int(response.headers['content-length']):,}" if negotiated == encoding else "-")
+            print(f"{label if name == 'json' else '':<22}{name:<10}{sent[0]:>9}  {sent[1]:>8}  {sent[2]:>8}")
+
+    response = client.post(cases[0][1], json=cases[0][2], headers={"Accept-Encoding": "gzip, br"})
+    print(f"\nContent-Encoding negotiated for 'gzip, br': {response.headers.get('content-encoding')}"
+          f"{'' if brotli else ' (brotli module not installed)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# backend/tests/conftest.py
+# Lancer depuis backend/ : python -m pytest -q
+# Les tests n'appellent aucun service réel : Supabase est remplacé par des faux locaux
+# (httpx.MockTransport, faux stockage des benchmarks). Des valeurs factices suffisent
+# donc pour les variables vérifiées à l'import de l'application.
+
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+# Pas de préchargement en arrière-plan pendant les tests
+os.environ.setdefault("WARM_UP", "0")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
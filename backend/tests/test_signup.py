@@ -0,0 +1,73 @@
+# backend/tests/test_signup.py
+# Inscriptions simultanées avec des noms en double, contre le faux PostgREST des
+# benchmarks (contrainte d'unicité sur 'username' : HTTP 409, code 23505).
+
+import asyncio
+from collections import defaultdict
+
+import httpx
+import pytest
+
+from app.core.supabase_client import get_client
+from app.main import app
+from benchmarks.signup_concurrency import FakeDatabase
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def database():
+    # Latence de quelques ms : les inscriptions d'un même nom se chevauchent
+    database = FakeDatabase(latency=0.005)
+    session = get_client().postgrest.session
+    transport = session._transport
+    session._transport = httpx.MockTransport(database.handler)
+    yield database
+    session._transport = transport
+
+
+async def signup_all(usernames):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def signup(username):
+            response = await client.post("/auth/signup", json={"username": username, "password": "secret"})
+            return username, response
+
+        return await asyncio.gather(*(signup(username) for username in usernames))
+
+
+async def test_concurrent_duplicates_get_one_success_per_name(database):
+    names = [f"user_{i}" for i in range(10)]
+    results = await signup_all(names * 3)
+
+    by_name = defaultdict(list)
+    for username, response in results:
+        by_name[username].append(response)
+
+    for username, responses in by_name.items():
+        succeeded = [r for r in responses if r.status_code == 200]
+        rejected = [r for r in responses if r.status_code != 200]
+        assert len(succeeded) == 1, username
+        assert succeeded[0].json()["username"] == username
+        assert [r.status_code for r in rejected] == [400, 400]
+        assert all(r.json()["detail"] == "Username already registered" for r in rejected)
+
+    assert database.usernames == set(names)
+    # Une seule requête par inscription : pas de lecture préalable du nom
+    assert database.requests[("users", "GET")] == 0
+    assert database.requests[("users", "POST")] == len(names) * 3
+
+
+async def test_other_database_errors_are_not_reported_as_duplicates(database):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/users"):
+            return httpx.Response(400, json={
+                "code": "23514", "details": None, "hint": None,
+                "message": 'new row for relation "users" violates check constraint "some_other_check"'})
+        return httpx.Response(200, json=[])
+
+    get_client().postgrest.session._transport = httpx.MockTransport(handler)
+    [(_, response)] = await signup_all(["user_x"])
+
+    assert response.status_code == 500
+    assert response.json()["detail"] != "Username already registered"
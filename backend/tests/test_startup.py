@@ -0,0 +1,41 @@
+# backend/tests/test_startup.py
+# Budget de démarrage : 'import app.main' dans un nouveau processus ne doit charger
+# aucun des modules différés (core/lazy.py, client Supabase construit au premier
+# usage) et doit rester sous IMPORT_BUDGET_MS (variable d'environnement, 2500 ms par
+# défaut ; voir aussi benchmarks/startup_time.py pour le détail par module).
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.startup_time import BACKEND_DIR, DEFERRED
+
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 2500))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+loaded = sorted({name.split(".")[0] for name in sys.modules} & set(json.loads(sys.argv[1])))
+print(json.dumps({"ms": elapsed, "loaded": loaded}))
+"""
+
+
+def import_app_main() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(DEFERRED)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True, env=os.environ.copy(),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_deferred_modules_are_not_imported():
+    assert import_app_main()["loaded"] == []
+
+
+def test_import_time_budget():
+    # Meilleur de trois : le premier essai paie aussi le cache disque des .pyc
+    best = min(import_app_main()["ms"] for _ in range(3))
+    assert best < IMPORT_BUDGET_MS, f"import app.main took {best:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
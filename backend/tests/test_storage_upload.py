@@ -0,0 +1,158 @@
+# backend/tests/test_storage_upload.py
+# Lecture en flux du multipart et envoi vers le faux Supabase Storage des benchmarks
+# (benchmarks/storage_standin.py), lancé sur un port local.
+
+import hashlib
+import uuid
+
+import pytest
+
+from app.core import http_client, storage_upload
+from app.core.storage_upload import MultipartFileStream
+from benchmarks.storage_standin import StandInStorage, free_port, serve
+
+pytestmark = pytest.mark.anyio
+
+KB = 1024
+
+
+def multipart_body(content: bytes, boundary: str, with_file: bool = True) -> bytes:
+    parts = [
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="caption"\r\n\r\n'
+        f"a text field before the file\r\n".encode()
+    ]
+    if with_file:
+        parts.append(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="clip.mp4"\r\n'
+            f"Content-Type: video/mp4\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts)
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def content_of(size: int) -> bytes:
+    # Contient des fragments de délimiteur pour piéger le parseur
+    return (b"\r\n--not-the-boundary" + hashlib.sha256(b"x").digest()) * (size // 51 + 1)
+
+
+# --- MultipartFileStream ---
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+async def test_boundaries_split_across_chunks(chunk_size):
+    boundary = uuid.uuid4().hex
+    content = content_of(10 * KB)
+    stream = await MultipartFileStream(
+        chunked(multipart_body(content, boundary), chunk_size),
+        f"multipart/form-data; boundary={boundary}",
+    ).open()
+
+    received = b"".join([data async for data in stream])
+
+    assert stream.filename == "clip.mp4"
+    assert stream.content_type == "video/mp4"
+    assert received == content
+    assert stream.size == len(content)
+
+
+async def test_missing_file_part():
+    boundary = uuid.uuid4().hex
+    stream = MultipartFileStream(
+        chunked(multipart_body(b"", boundary, with_file=False), 16),
+        f"multipart/form-data; boundary={boundary}",
+    )
+    with pytest.raises(ValueError, match="No file found"):
+        await stream.open()
+
+
+async def test_truncated_body():
+    boundary = uuid.uuid4().hex
+    body = multipart_body(content_of(4 * KB), boundary)
+    stream = await MultipartFileStream(
+        chunked(body[:len(body) // 2], 256), f"multipart/form-data; boundary={boundary}"
+    ).open()
+    with pytest.raises(ValueError, match="Incomplete multipart body"):
+        async for _ in stream:
+            pass
+
+
+async def test_not_multipart():
+    with pytest.raises(ValueError):
+        MultipartFileStream(chunked(b"", 1), "application/json")
+
+
+# --- Envoi vers le faux stockage ---
+
+@pytest.fixture(scope="module")
+def standin_server():
+    storage = StandInStorage()
+    port = free_port()
+    server = serve(storage.app(), port)
+    yield storage, f"http://127.0.0.1:{port}"
+    server.should_exit = True
+
+
+@pytest.fixture
+async def storage(standin_server, monkeypatch):
+    standin, url = standin_server
+    standin.objects.clear()
+    standin.uploads.clear()
+    standin.patches = 0
+    standin.fail_every = 0
+    monkeypatch.setenv("SUPABASE_STORAGE_URL", url)
+    monkeypatch.setattr(storage_upload, "CHUNK_SIZE", 16 * KB)
+    monkeypatch.setattr(storage_upload, "RESUMABLE_THRESHOLD", 32 * KB)
+    monkeypatch.setattr(storage_upload, "_semaphore", None)
+    yield standin
+    # Le client partagé est lié à la boucle d'événements du test
+    await http_client.close_async_client()
+
+
+async def upload(content: bytes, expected_size, piece: int = 5000) -> str:
+    name = f"user/{uuid.uuid4().hex}.bin"
+    await storage_upload.upload_stream(
+        "token", "media", name, "application/octet-stream", chunked(content, piece), expected_size
+    )
+    return f"media/{name}"
+
+
+async def test_small_file_uses_a_single_post(storage):
+    content = content_of(20 * KB)[:20 * KB]
+    name = await upload(content, expected_size=len(content))
+
+    assert storage.objects[name] == (hashlib.sha256(content).hexdigest(), len(content))
+    assert storage.uploads == {}
+    assert storage.patches == 0
+
+
+@pytest.mark.parametrize("expected_size", [100 * KB, None])
+async def test_large_or_unknown_size_is_resumable(storage, expected_size):
+    content = content_of(100 * KB)[:100 * KB]
+    name = await upload(content, expected_size=expected_size)
+
+    assert storage.objects[name] == (hashlib.sha256(content).hexdigest(), len(content))
+    assert len(storage.uploads) == 1
+    # Morceaux de CHUNK_SIZE exactement, le dernier portant la taille totale
+    assert storage.patches == -(-len(content) // (16 * KB))
+
+
+async def test_threshold_is_inclusive(storage):
+    content = content_of(32 * KB)[:32 * KB]
+    await upload(content, expected_size=32 * KB)
+    assert storage.uploads == {}
+
+
+async def test_resume_after_dropped_patch(storage):
+    storage.fail_every = 2  # un PATCH sur deux est coupé après 1 Ko
+    content = content_of(100 * KB)[:100 * KB]
+    name = await upload(content, expected_size=None)
+
+    assert storage.objects[name] == (hashlib.sha256(content).hexdigest(), len(content))
+    chunks = -(-len(content) // (16 * KB))
+    assert storage.patches > chunks  # des morceaux ont été repris à l'offset du serveur
@@ -11,6 +11,8 @@ document.addEventListener('DOMContentLoaded', () => {
     let searchDebounceTimer = null;
     let activeChatState = { id: null, isDecrypted: false };
     let messagePollInterval = null;
+    let lastMessageId = null; // Curseur pour le polling incrémental (?after=)
+    let messageSocket = null; // WebSocket temps réel du chat actif (le polling reste en secours)
     let currentUserId = '';
     
     try {
@@ -80,13 +82,45 @@ document.addEventListener('DOMContentLoaded', () => {
     function stopMessagePolling() {
         if (messagePollInterval) clearInterval(messagePollInterval);
         messagePollInterval = null;
+        closeMessageSocket();
+    }
+
+    function closeMessageSocket() {
+        if (messageSocket) {
+            const socket = messageSocket;
+            messageSocket = null;
+            socket.close();
+        }
+    }
+
+    function openMessageSocket(chatId) {
+        closeMessageSocket();
+        if (!('WebSocket' in window)) return;
+        const socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/chats/${chatId}/ws`);
+        socket.subscribed = false;
+        socket.onopen = () => socket.send(JSON.stringify({ token: TOKEN }));
+        socket.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            if (data.type === 'subscribed') {
+                socket.subscribed = true;
+                fetchMessages(chatId, true); // Rattrape les messages envoyés avant l'abonnement
+            } else if (data.type === 'message' && activeChatData && activeChatData.id === chatId) {
+                appendNewMessages([data.message]);
+            }
+        };
+        socket.onclose = () => { if (messageSocket === socket) messageSocket = null; };
+        messageSocket = socket;
     }
     
     function startMessagePolling(chatId) {
         stopMessagePolling(); 
+        lastMessageId = null;
         fetchMessages(chatId, false);
+        openMessageSocket(chatId);
         messagePollInterval = setInterval(() => {
             if (activeChatData && activeChatData.id === chatId) {
+                // Messages déjà reçus en temps réel : pas de polling tant que le WebSocket est abonné
+                if (messageSocket && messageSocket.subscribed) return;
                 fetchMessages(chatId, true); 
             } else {
                 stopMessagePolling();
@@ -136,11 +170,18 @@ document.addEventListener('DOMContentLoaded', () => {
     async function fetchMessages(chatId, isPoll = false) {
         if (!chatId) return;
         try {
-            const response = await secureFetch(`/chats/${chatId}/messages`);
+            // Polling : seuls les messages plus récents que le dernier affiché sont demandés
+            const incremental = isPoll && lastMessageId !== null;
+            const url = incremental ? `/chats/${chatId}/messages?after=${lastMessageId}` : `/chats/${chatId}/messages`;
+            const response = await secureFetch(url);
             if (!response.ok) throw new Error('Failed to fetch messages.');
             const messages = await response.json();
-            const existingMessageCount = msgContainer.querySelectorAll('.chat-message').length;
-            if (isPoll && messages.length === existingMessageCount) return;
+            if (!activeChatData || activeChatData.id !== chatId) return;
+            if (incremental) {
+                appendNewMessages(messages);
+                return;
+            }
+            lastMessageId = null;
             renderMessages(messages, activeChatData);
         } catch (error) {
             if (!isPoll) showNotification(error.message, 'error');
@@ -148,6 +189,19 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    function appendNewMessages(messages) {
+        messages.forEach(msg => {
+            // Un message envoyé depuis cet onglet est déjà affiché
+            if (msgContainer.querySelector(`.chat-message[data-message-id="${msg.id}"]`)) {
+                lastMessageId = Math.max(lastMessageId, msg.id);
+                return;
+            }
+            const placeholder = msgContainer.querySelector('.chat-list-placeholder');
+            if (placeholder) placeholder.remove();
+            renderSingleMessage(msg, activeChatData, true);
+        });
+    }
+
     // --- UI RENDERING (Fonctions de rendu inchangées) ---
     
     function switchPanel(panelName) {
@@ -303,6 +357,10 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         const msgEl = document.createElement('div');
         msgEl.className = `chat-message ${messageType}`;
+        if (message.id !== undefined) {
+            msgEl.dataset.messageId = message.id;
+            lastMessageId = lastMessageId === null ? message.id : Math.max(lastMessageId, message.id);
+        }
         msgEl.innerHTML = `<div class="chat-message-content ${isDecrypted ? 'decrypted' : 'encrypted'}" data-encrypted-text="${message.encrypted_content}" data-content-type="${message.content_type}">${contentHtml}</div>`;
         msgContainer.appendChild(msgEl);
         if (isNew) {
@@ -316,6 +374,7 @@ document.addEventListener('DOMContentLoaded', () => {
         if (!activeChatData) return;
         const allMessageElements = Array.from(msgContainer.querySelectorAll('.chat-message-content'));
         const reconstructedMessages = allMessageElements.map(el => ({
+            id: el.parentElement.dataset.messageId !== undefined ? Number(el.parentElement.dataset.messageId) : undefined,
             sender_id: el.parentElement.classList.contains('sent') ? currentUserId : 'other', 
             encrypted_content: el.dataset.encryptedText,
             content_type: el.dataset.contentType
@@ -434,6 +493,16 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
     
+    async function sha256Hex(file) {
+        if (!window.crypto || !window.crypto.subtle) return null; // Contexte non sécurisé (http)
+        try {
+            const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+            return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+        } catch (e) {
+            return null;
+        }
+    }
+
     async function handleSendFile() {
         if (!activeChatData) return;
         const file = msgFileInput.files[0];
@@ -448,7 +517,11 @@ document.addEventListener('DOMContentLoaded', () => {
         showNotification('Uploading file... this may take a moment.', 'success');
         setButtonLoading(msgSendBtn, true); 
         try {
-            const storageResponse = await secureFetch('/storage/upload', { method: 'POST', body: formData, headers: { 'Content-Type': undefined } });
+            // Empreinte du fichier : un fichier déjà envoyé n'est pas renvoyé par le serveur
+            const uploadHeaders = { 'Content-Type': undefined };
+            const contentHash = await sha256Hex(file);
+            if (contentHash) uploadHeaders['X-Content-SHA256'] = contentHash;
+            const storageResponse = await secureFetch('/storage/upload', { method: 'POST', body: formData, headers: uploadHeaders });
             if (!storageResponse.ok) { const errData = await storageResponse.json(); throw new Error(errData.detail || 'Failed to upload file to storage.'); }
             const storageData = await storageResponse.json();
             const fileUrl = storageData.file_url;
@@ -88,7 +88,7 @@ document.addEventListener('DOMContentLoaded', () => {
                  if (method === 'playfair' && (!payload.key || payload.size === undefined)) throw new Error("Key and Size are required for Playfair.");
                  if (method === 'hill' && (!payload.key || payload.size === undefined)) throw new Error("Key and size are required for Hill.");
                  if (method === 'playfair' && payload.size && ![5, 6].includes(payload.size)) throw new Error("Playfair size must be 5 or 6.");
-                 if (method === 'hill' && payload.size && ![2, 3].includes(payload.size)) throw new Error("Hill size must be 2 or 3.");
+                 if (method === 'hill' && payload.size && !(payload.size >= 2 && payload.size <= 10)) throw new Error("Hill size must be between 2 and 10.");
                  
                  const endpoint = `/crypto/${action}`;
                  const response = await secureFetch(endpoint, { method: 'POST', body: JSON.stringify(payload) });
@@ -112,8 +112,16 @@ document.addEventListener('DOMContentLoaded', () => {
         let animationSteps = [];
         let currentStepIndex = 0;
         let activeAlgorithm = '';
+        let activeMode = 'encrypt';
+        // Les étapes sont reçues en flux, par pages : totalSteps vient de la trame de fin
+        const ANIM_PAGE_SIZE = 200;
+        let animPayload = null;
+        let totalSteps = 0;
+        let animPageLoading = false;
         
         const animMethodSelect = document.getElementById('anim-method');
+        const animModeSelect = document.getElementById('anim-mode');
+        const animTextLabel = document.getElementById('anim-text-label');
         const animStartBtn = document.getElementById('start-anim-btn');
         const animPlayer = document.getElementById('anim-player');
         const animPlaceholder = document.getElementById('anim-player-placeholder');
@@ -155,6 +163,11 @@ document.addEventListener('DOMContentLoaded', () => {
              }
         }
         if (animMethodSelect) { animMethodSelect.addEventListener('change', toggleAnimParamInputs); toggleAnimParamInputs(); }
+        if (animModeSelect) {
+            animModeSelect.addEventListener('change', () => {
+                if (animTextLabel) animTextLabel.textContent = animModeSelect.value === 'decrypt' ? 'Text to Decrypt' : 'Text to Encrypt';
+            });
+        }
 
         // [MODIFIÉ] Gérer la soumission d'animation
         animForm.addEventListener('submit', async (e) => {
@@ -168,6 +181,7 @@ document.addEventListener('DOMContentLoaded', () => {
              
              try {
                  activeAlgorithm = animMethodSelect.value;
+                 activeMode = animModeSelect ? animModeSelect.value : 'encrypt';
                  const shiftValue = activeAlgorithm === 'caesar' && animShiftInput && animShiftInput.value !== '' ? parseInt(animShiftInput.value) : undefined;
                  
                  const keyValue = activeAlgorithm === 'playfair' ? (animKeyInput ? animKeyInput.value : undefined)
@@ -190,11 +204,9 @@ document.addEventListener('DOMContentLoaded', () => {
                  if (activeAlgorithm === 'playfair' && payload.size && ![5, 6].includes(payload.size)) throw new Error("Playfair size must be 5 or 6.");
                  if (activeAlgorithm === 'hill' && payload.size && ![2, 3].includes(payload.size)) throw new Error("Hill key length must be " + (payload.size*payload.size));
 
-                 const response = await secureFetch('/visualize/encrypt', { method: 'POST', body: JSON.stringify(payload) });
-                 const data = await response.json();
-                 if (!response.ok) throw new Error(data.detail || 'Failed to get visualization data.');
-                 
-                 animationSteps = data.steps;
+                 animPayload = payload;
+                 totalSteps = 0;
+                 await loadStepPage(0);
                  if (animationSteps.length > 0) {
                      if (animPlayer) animPlayer.style.display = 'flex';
                      if (animPlaceholder) animPlaceholder.style.display = 'none';
@@ -207,6 +219,63 @@ document.addEventListener('DOMContentLoaded', () => {
              } finally { setButtonLoading(animStartBtn, false); }
          });
 
+        // --- Helper: Load a page of steps from the NDJSON stream ---
+        async function loadStepPage(offset) {
+            const response = await secureFetch(`/visualize/${activeMode}/stream?offset=${offset}&limit=${ANIM_PAGE_SIZE}`, {
+                method: 'POST', body: JSON.stringify(animPayload), headers: { 'Accept': 'application/x-ndjson' }
+            });
+            if (!response.ok) {
+                const data = await response.json();
+                throw new Error(data.detail || 'Failed to get visualization data.');
+            }
+
+            let shared = {};
+            const handleFrame = (line) => {
+                if (!line.trim()) return;
+                const frame = JSON.parse(line);
+                if (frame.type === 'header') {
+                    shared = frame.shared || {};
+                } else if (frame.type === 'step') {
+                    const step = frame.step;
+                    // Réattache la matrice envoyée une seule fois dans l'en-tête
+                    (step.shared || []).forEach(key => { step.data[key] = shared[key]; });
+                    delete step.shared;
+                    animationSteps[frame.index] = step;
+                } else if (frame.type === 'end') {
+                    totalSteps = frame.total_steps;
+                } else if (frame.type === 'error') {
+                    throw new Error(frame.detail || 'Failed to get visualization data.');
+                }
+            };
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(handleFrame);
+            }
+            handleFrame(buffer + decoder.decode());
+        }
+
+        async function showNextStep() {
+            const nextIndex = currentStepIndex + 1;
+            if (nextIndex >= animationSteps.length && nextIndex < totalSteps) {
+                if (animPageLoading) return;
+                animPageLoading = true;
+                if (animNextBtn) animNextBtn.disabled = true;
+                try { await loadStepPage(animationSteps.length); }
+                catch (error) { showNotification(error.message, 'error'); }
+                finally { animPageLoading = false; }
+            }
+            if (nextIndex < animationSteps.length) renderAnimationStep(nextIndex);
+            else renderAnimationStep(currentStepIndex);
+        }
+
         // --- [MODIFIÉ] Helper: Render Matrix ---
         function renderMatrix(matrixData, highlightPos = [], outputPos = [], highlightRows = [], highlightCols = []) {
             if (!matrixData) return '';
@@ -277,9 +346,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
             if (animStepTitle) animStepTitle.textContent = step.step_title;
             if (animStepDescription) animStepDescription.innerHTML = step.description;
-            if (animStepCounter) animStepCounter.textContent = `Step ${stepIndex + 1} / ${animationSteps.length}`;
+            if (animStepCounter) animStepCounter.textContent = `Step ${stepIndex + 1} / ${totalSteps}`;
             if (animPrevBtn) animPrevBtn.disabled = (stepIndex === 0);
-            if (animNextBtn) animNextBtn.disabled = (stepIndex === animationSteps.length - 1);
+            if (animNextBtn) animNextBtn.disabled = (stepIndex === totalSteps - 1);
 
             animStepStage.innerHTML = '';
             anime.remove('.viz-matrix-cell, .viz-vector-cell, .viz-alphabet-marker, .calc-step, #caesar-output, #new-digraph, #hill-output, .final-summary > *');
@@ -292,7 +361,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         <div class="viz-text-block">${step.data.original || ''}</div>
                         ${step.data.prepared ? `<h4>Prepared Text:</h4><div class="viz-text-block">${step.data.prepared}</div>` : ''}
                         <i data-lucide="arrow-down"></i>
-                        <h4>Final Encrypted Text:</h4>
+                        <h4>Final ${activeMode === 'decrypt' ? 'Decrypted' : 'Encrypted'} Text:</h4>
                         <div class="viz-text-block final-output">${step.data.final || ''}</div>
                     </div>`;
                     if (typeof lucide !== 'undefined') lucide.createIcons();
@@ -345,7 +414,7 @@ document.addEventListener('DOMContentLoaded', () => {
                  }
 
                  if (step.data.new_digraph && step.data.rule && highlightPos.length === 2 && outputPos.length === 2) {
-                     animStepStage.innerHTML += `<h4>Encrypted Digraph: <span class="viz-text-block highlight" style="opacity: 0;" id="new-digraph">${step.data.new_digraph}</span></h4>`;
+                     animStepStage.innerHTML += `<h4>${activeMode === 'decrypt' ? 'Decrypted' : 'Encrypted'} Digraph: <span class="viz-text-block highlight" style="opacity: 0;" id="new-digraph">${step.data.new_digraph}</span></h4>`;
                      animStepStage.innerHTML += `<pre class="viz-code">Rule Applied: ${step.data.rule}</pre>`;
 
                     const matrixEl = animStepStage.querySelector('.viz-matrix');
@@ -458,7 +527,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         // --- Add Nav Button Listeners ---
-        if (animNextBtn) { animNextBtn.addEventListener('click', () => { renderAnimationStep(currentStepIndex + 1); }); }
+        if (animNextBtn) { animNextBtn.addEventListener('click', showNextStep); }
         if (animPrevBtn) { animPrevBtn.addEventListener('click', () => { renderAnimationStep(currentStepIndex - 1); }); }
 
     } else { console.warn('Animated visualization form not found.'); }
@@ -260,39 +260,36 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
     
-    // Download Handler (Unchanged)
-    function handleDownloadEncodedFile() {
-        if (!finalDownloadData?.data_url) {
+    // Download Handler: the encoded file is fetched from its short-lived link
+    async function handleDownloadEncodedFile() {
+        if (!finalDownloadData?.download_url) {
             showStatus('Encoded file data not available for download.', 'error');
             return;
         }
-        const dataUrl = finalDownloadData.data_url;
-        const mimeType = finalDownloadData.mime_type || 'application/octet-stream';
-        const base64Index = dataUrl.indexOf(';base64,');
-        if (base64Index === -1) {
-             showStatus('Error: Invalid Base64 data URL format.', 'error');
-             return;
-        }
-        const byteCharacters = atob(dataUrl.substring(base64Index + 8));
-        const byteNumbers = new Array(byteCharacters.length);
-        for (let i = 0; i < byteCharacters.length; i++) {
-            byteNumbers[i] = byteCharacters.charCodeAt(i);
-        }
-        const byteArray = new Uint8Array(byteNumbers);
-        const blob = new Blob([byteArray], { type: mimeType });
-        const link = document.createElement('a');
-        link.href = URL.createObjectURL(blob);
-        const originalName = finalDownloadData.original_filename.split('.').slice(0, -1).join('.') || 'encoded_file';
-        let extension = currentFileType === 'image' ? 'png' : finalDownloadData.original_filename.split('.').pop() || 'bin';
-        if (currentFileType === 'video' && finalDownloadData.original_filename?.includes('.')) {
-             extension = finalDownloadData.original_filename.split('.').pop();
+        try {
+            const response = await secureFetch(finalDownloadData.download_url);
+            if (!response.ok) {
+                throw new Error(response.status === 404
+                    ? 'The download link has expired. Please run the visualization again.'
+                    : `Download failed (${response.status})`);
+            }
+            const blob = await response.blob();
+            const link = document.createElement('a');
+            link.href = URL.createObjectURL(blob);
+            const originalName = finalDownloadData.original_filename.split('.').slice(0, -1).join('.') || 'encoded_file';
+            let extension = currentFileType === 'image' ? 'png' : finalDownloadData.original_filename.split('.').pop() || 'bin';
+            if (currentFileType === 'video' && finalDownloadData.original_filename?.includes('.')) {
+                 extension = finalDownloadData.original_filename.split('.').pop();
+            }
+            link.download = `${originalName}_stego.${extension}`;
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+            URL.revokeObjectURL(link.href);
+            showStatus('Encoded file downloaded!', 'success');
+        } catch (error) {
+            showStatus(error.message, 'error');
         }
-        link.download = `${originalName}_stego.${extension}`;
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
-        URL.revokeObjectURL(link.href);
-        showStatus('Encoded file downloaded!', 'success');
     }
     
     // --- 6. Helper Renderers (Detailed Visuals) ---